@@ -0,0 +1 @@
+"""Performance benchmarks for TimeTrac; run ``python -m benchmarks.run --help``."""
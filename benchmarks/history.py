@@ -0,0 +1,150 @@
+"""Deterministic synthetic time-tracking histories for benchmarks.
+
+A history looks like a consultant's real bookings: five working days a
+week minus some vacation, about eight hours a day split over a handful of
+entries, a few projects active per month next to a couple of evergreen
+internal PSPs, and a long-tailed set of recurring descriptions. The same
+parameters always produce the same entries.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Iterator
+
+from timetrac.database import DATE_FORMAT, Database
+from timetrac.models import Preset, TimeEntry, TimeMode, format_time_of_day
+
+ACTIVITY_TYPES = ["Entwicklung", "Beratung", "Meeting", "Test", "Dokumentation", "Support"]
+_VERBS = ["Implementierung", "Abstimmung", "Review", "Analyse", "Workshop", "Bugfix", "Planung", "Betrieb"]
+_TOPICS = ["Schnittstelle", "Reporting", "Berechtigungen", "Migration", "Oberfläche", "Datenmodell", "Abrechnung"]
+
+
+@dataclass(frozen=True)
+class HistorySpec:
+    """Shape of a generated history."""
+
+    years: int = 1
+    psp_count: int = 60
+    description_count: int = 2000
+    active_psps_per_month: int = 6
+    end: date = date(2025, 12, 31)
+    seed: int = 0
+
+    @property
+    def start(self) -> date:
+        return date(self.end.year - self.years + 1, 1, 1)
+
+    @property
+    def label(self) -> str:
+        return f"{self.years}y"
+
+
+def psp_values(spec: HistorySpec) -> list[str]:
+    return [f"P-{1000 + i:04d}.{i % 7 + 1:02d}" for i in range(spec.psp_count)]
+
+
+def description_values(spec: HistorySpec) -> list[str]:
+    return [
+        f"{_VERBS[i % len(_VERBS)]} {_TOPICS[i // len(_VERBS) % len(_TOPICS)]} {i // (len(_VERBS) * len(_TOPICS)) + 1}"
+        for i in range(spec.description_count)
+    ]
+
+
+def generate_history(spec: HistorySpec) -> Iterator[TimeEntry]:
+    """Yield the entries of ``spec`` in date order."""
+    rng = random.Random(spec.seed)
+    psps = psp_values(spec)
+    descriptions = description_values(spec)
+    evergreen = psps[:2]
+    day = spec.start
+    month_psps: list[str] = []
+    month = None
+    vacation: set[date] = set()
+    while day <= spec.end:
+        if day.month != month:
+            month = day.month
+            month_psps = evergreen + rng.sample(psps[2:], min(spec.active_psps_per_month, len(psps) - 2))
+        if day.month == 1 and day.day == 1:
+            vacation = _vacation_days(rng, day.year)
+        if day.weekday() < 5 and day not in vacation:
+            yield from _day_entries(rng, day, month_psps, descriptions)
+        day += timedelta(days=1)
+
+
+def _vacation_days(rng: random.Random, year: int) -> set[date]:
+    days: set[date] = set()
+    for _ in range(3):
+        start = date(year, 1, 1) + timedelta(days=rng.randrange(350))
+        days.update(start + timedelta(days=i) for i in range(rng.randint(5, 12)))
+    return days
+
+
+def _day_entries(rng: random.Random, day: date, psps: list[str], descriptions: list[str]) -> Iterator[TimeEntry]:
+    quarters = rng.randint(28, 38)  # 7 to 9.5 hours in quarter hours
+    count = rng.randint(3, 7)
+    cuts = sorted(rng.sample(range(1, quarters), count - 1))
+    minute = 8 * 60
+    for length in (b - a for a, b in zip([0, *cuts], [*cuts, quarters])):
+        # Long-tailed: a few descriptions recur constantly, most are rare
+        if rng.random() < 0.7:
+            index = min(int(rng.paretovariate(1.2)) - 1, len(descriptions) - 1)
+        else:
+            index = rng.randrange(len(descriptions))
+        ranged = rng.random() < 0.6
+        yield TimeEntry(
+            id=None,
+            date=day,
+            psp=rng.choice(psps),
+            activity_type=rng.choice(ACTIVITY_TYPES),
+            description=descriptions[index],
+            hours=length / 4,
+            start_time=format_time_of_day(minute) if ranged else "",
+            end_time=format_time_of_day(minute + length * 15) if ranged else "",
+            mode=TimeMode.RANGE if ranged else TimeMode.DURATION,
+        )
+        minute += length * 15
+
+
+def generate_presets(spec: HistorySpec) -> list[Preset]:
+    return [
+        Preset(id=None, name=f"Vorlage {psp}", psp=psp, activity_type=ACTIVITY_TYPES[i % len(ACTIVITY_TYPES)],
+               notes="", billable=i >= 2)
+        for i, psp in enumerate(psp_values(spec)[:20])
+    ]
+
+
+def build_database(path: Path, spec: HistorySpec) -> Database:
+    """Create a database at ``path`` holding the history of ``spec``."""
+    db = Database(path)
+    for preset in generate_presets(spec):
+        db.add_preset(preset)
+    batch: list[TimeEntry] = []
+    for entry in generate_history(spec):
+        batch.append(entry)
+        if len(batch) >= 5000:
+            db.add_entries(batch)
+            batch.clear()
+    db.add_entries(batch)
+    return db
+
+
+def write_legacy_json(path: Path, spec: HistorySpec):
+    """Write the history of ``spec`` in the old ``time_entries.json`` format."""
+    entries: dict[str, list[dict]] = {}
+    for entry in generate_history(spec):
+        entries.setdefault(entry.date.strftime(DATE_FORMAT), []).append({
+            "psp": entry.psp,
+            "type": entry.activity_type,
+            "desc": entry.description,
+            "hours": entry.hours,
+            "start": entry.start_time,
+            "end": entry.end_time,
+            "mode": entry.mode.value,
+        })
+    presets = [{"name": p.name, "psp": p.psp, "type": p.activity_type} for p in generate_presets(spec)]
+    path.write_text(json.dumps({"entries": entries, "presets": presets}), encoding="utf-8")
@@ -0,0 +1,324 @@
+"""Time every ``Database`` method against generated histories.
+
+    python -m benchmarks.run --years 1 5 20 --output results.json
+    python -m benchmarks.run --baseline results.json --threshold 0.25
+
+Each benchmark is repeated and reported by its median and minimum in
+milliseconds. With ``--baseline`` the medians are compared against an
+earlier results file and the exit status is 1 if any benchmark got slower
+by more than the threshold.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable
+
+from timetrac.database import LEGACY_JSON_CHECKED, Database
+from timetrac.models import Preset, TimeEntry, TimeMode
+
+from .history import HistorySpec, build_database, generate_history, write_legacy_json
+
+# Differences below this are timer noise, whatever the ratio
+MIN_DELTA_MS = 0.05
+
+
+@dataclass
+class Benchmark:
+    """One timed call of ``method``; ``setup`` and ``teardown`` run untimed around each call."""
+
+    name: str
+    method: str
+    run: Callable[[], object]
+    setup: Callable[[], None] | None = None
+    teardown: Callable[[], None] | None = None
+    repeat: int | None = None  # overrides the suite's repeat count
+
+
+@dataclass(frozen=True)
+class Regression:
+    name: str
+    baseline_ms: float
+    current_ms: float
+    metric: str = "median_ms"
+
+    @property
+    def ratio(self) -> float:
+        return self.current_ms / self.baseline_ms if self.baseline_ms else float("inf")
+
+
+def time_benchmark(bench: Benchmark, repeat: int) -> dict:
+    samples = []
+    for _ in range(bench.repeat or repeat):
+        if bench.setup:
+            bench.setup()
+        started = time.perf_counter()
+        bench.run()
+        samples.append((time.perf_counter() - started) * 1000)
+        if bench.teardown:
+            bench.teardown()
+    return {
+        "method": bench.method,
+        "runs": len(samples),
+        "median_ms": round(statistics.median(samples), 4),
+        "min_ms": round(min(samples), 4),
+    }
+
+
+def _probe_entry(day: date, description: str = "Benchmark") -> TimeEntry:
+    return TimeEntry(
+        id=None, date=day, psp="P-BENCH", activity_type="Test", description=description,
+        hours=0.5, start_time="", end_time="", mode=TimeMode.DURATION,
+    )
+
+
+def sample_day(spec: HistorySpec) -> date:
+    """A Wednesday well inside the history."""
+    day = spec.end - timedelta(days=120)
+    return day - timedelta(days=day.weekday() - 2)
+
+
+def database_benchmarks(db: Database, spec: HistorySpec) -> list[Benchmark]:
+    """Benchmarks for every query method of ``db``, which holds ``spec``'s history.
+
+    Cached aggregate reads are timed cold. Writes leave the database as
+    they found it.
+    """
+    day = sample_day(spec)
+    cold = db.aggregate_cache.clear
+    week = [e for entries in db.get_entries_for_week(day).values() for e in entries]
+    year = (date(day.year, 1, 1), date(day.year, 12, 31))
+    first_hits = db.search_entries("workshop", 50)
+    batch = [_probe_entry(day, f"Benchmark {i}") for i in range(500)]
+    preset = db.get_presets()[0]
+    pending: list[int] = []  # ids created untimed for the delete benchmarks
+
+    def probe_ids() -> list[int]:
+        return [e.id for entries in db.iter_entries(day, day, {"psp": "P-BENCH"}) for e in entries]
+
+    def remove_probes():
+        db.delete_entries(probe_ids())
+
+    def add_probes(entries: list[TimeEntry]):
+        db.add_entries(entries)
+        pending[:] = probe_ids()
+
+    def toggle_hours(entries: list[TimeEntry]) -> list[TimeEntry]:
+        for e in entries:
+            e.hours = 0.25 if e.hours != 0.25 else 0.5
+        return entries
+
+    def add_preset():
+        pending.append(db.add_preset(Preset(
+            id=None, name=f"Benchmark {len(pending)}", psp="P-BENCH", activity_type="Test", notes="", billable=True,
+        )))
+
+    def drain(delete: Callable[[int], None]):
+        while pending:
+            delete(pending.pop())
+
+    return [
+        Benchmark("get_entries_for_date", "get_entries_for_date", lambda: db.get_entries_for_date(day)),
+        Benchmark("get_entries_for_week", "get_entries_for_week", lambda: db.get_entries_for_week(day)),
+        Benchmark("iter_entries[year]", "iter_entries", lambda: sum(map(len, db.iter_entries(*year)))),
+        Benchmark("iter_entries[all,psp]", "iter_entries",
+                  lambda: sum(map(len, db.iter_entries(spec.start, spec.end, {"psp": week[0].psp})))),
+        Benchmark("search_entries[common]", "search_entries", lambda: db.search_entries("workshop", 50)),
+        Benchmark("search_entries[page2]", "search_entries",
+                  lambda: db.search_entries("workshop", 50, first_hits[-1] if first_hits else None)),
+        Benchmark("search_entries[rare]", "search_entries", lambda: db.search_entries("betrieb abrechnung 9")),
+        Benchmark("get_recent_values", "get_recent_values", lambda: db.get_recent_values("description", 200)),
+        Benchmark("iter_matching_values[first]", "iter_matching_values",
+                  lambda: next(db.iter_matching_values("description", "Rev"), None)),
+        Benchmark("iter_matching_values[all]", "iter_matching_values",
+                  lambda: list(db.iter_matching_values("description", "ung"))),
+        Benchmark("get_day_total", "get_day_total", lambda: db.get_day_total(day), setup=cold),
+        Benchmark("get_week_total", "get_week_total", lambda: db.get_week_total(day), setup=cold),
+        Benchmark("get_week_summary", "get_week_summary", lambda: db.get_week_summary(day), setup=cold),
+        Benchmark("get_statistics[month]", "get_statistics",
+                  lambda: db.get_statistics(date(day.year, day.month, 1), day), setup=cold),
+        Benchmark("get_statistics[year]", "get_statistics", lambda: db.get_statistics(*year), setup=cold),
+        Benchmark("get_statistics[all]", "get_statistics",
+                  lambda: db.get_statistics(spec.start + timedelta(days=17), spec.end - timedelta(days=9)),
+                  setup=cold),
+        Benchmark("get_hours_by_psp", "get_hours_by_psp", lambda: db.get_hours_by_psp(*year), setup=cold),
+        Benchmark("get_hours_by_psp_merged", "get_hours_by_psp_merged",
+                  lambda: db.get_hours_by_psp_merged(*year), setup=cold),
+        Benchmark("get_daily_hours[year]", "get_daily_hours", lambda: db.get_daily_hours(*year), setup=cold),
+        Benchmark("add_entry", "add_entry", lambda: db.add_entry(batch[0]), teardown=remove_probes),
+        Benchmark("add_entries[500]", "add_entries", lambda: db.add_entries(batch), teardown=remove_probes),
+        Benchmark("update_entry", "update_entry", lambda: db.update_entry(toggle_hours(week[:1])[0])),
+        Benchmark("update_entries[week]", "update_entries", lambda: db.update_entries(toggle_hours(week))),
+        Benchmark("delete_entry", "delete_entry", lambda: db.delete_entry(pending.pop()),
+                  setup=lambda: add_probes(batch[:1])),
+        Benchmark("delete_entries[500]", "delete_entries", lambda: db.delete_entries(pending),
+                  setup=lambda: add_probes(batch), teardown=pending.clear),
+        Benchmark("get_presets", "get_presets", db.get_presets),
+        Benchmark("add_preset", "add_preset", add_preset, teardown=lambda: drain(db.delete_preset)),
+        Benchmark("update_preset", "update_preset", lambda: db.update_preset(preset)),
+        Benchmark("delete_preset", "delete_preset", lambda: db.delete_preset(pending.pop()), setup=add_preset),
+        Benchmark("get_meta", "get_meta", lambda: db.get_meta(LEGACY_JSON_CHECKED)),
+        Benchmark("set_meta", "set_meta", lambda: db.set_meta("benchmark", "1")),
+    ]
+
+
+def import_benchmark(spec: HistorySpec, workdir: Path) -> Benchmark:
+    """Time ``import_from_json`` of ``spec``'s history into a fresh database."""
+    legacy = workdir / f"legacy-{spec.label}.json"
+    write_legacy_json(legacy, spec)
+    target = workdir / f"import-{spec.label}.db"
+    opened: list[Database] = []
+
+    def fresh():
+        for path in workdir.glob(f"{target.name}*"):
+            path.unlink()
+        opened.append(Database(target))
+
+    def close():
+        opened.pop().close()
+
+    return Benchmark("import_from_json", "import_from_json", lambda: opened[-1].import_from_json(legacy),
+                     setup=fresh, teardown=close, repeat=3)
+
+
+def new_document(repeat: int) -> dict:
+    """An empty results document."""
+    return {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "repeat": repeat,
+        },
+        "histories": {},
+        "results": {},
+    }
+
+
+def build_history(document: dict, path: Path, spec: HistorySpec, log: Callable[[str], None]) -> Database:
+    """Build ``spec``'s database at ``path`` and describe it in ``document``."""
+    for old in path.parent.glob(f"{path.name}*"):
+        old.unlink()
+    started = time.perf_counter()
+    db = build_database(path, spec)
+    document["histories"][spec.label] = {
+        "years": spec.years,
+        "psp_count": spec.psp_count,
+        "description_count": spec.description_count,
+        "seed": spec.seed,
+        "entries": sum(1 for _ in generate_history(spec)),
+        "build_s": round(time.perf_counter() - started, 3),
+    }
+    log(f"{spec.label}: {document['histories'][spec.label]['entries']} entries")
+    return db
+
+
+def run_benchmarks(
+    specs: list[HistorySpec],
+    repeat: int = 7,
+    only: str = "",
+    workdir: Path | None = None,
+    log: Callable[[str], None] = print,
+) -> dict:
+    """Build each history, time all benchmarks on it; returns the results document."""
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = workdir or Path(tmp)
+        document = new_document(repeat)
+        for spec in specs:
+            path = workdir / f"history-{spec.label}.db"
+            db = build_history(document, path, spec, log)
+            benches = [
+                Benchmark("open", "__init__", lambda: Database(path).close()),
+                *database_benchmarks(db, spec),
+                import_benchmark(spec, workdir),
+            ]
+            for bench in benches:
+                if only and only not in bench.name:
+                    continue
+                result = time_benchmark(bench, repeat)
+                document["results"][f"{spec.label}/{bench.name}"] = result
+                log(f"  {bench.name:<32} {result['median_ms']:>10.3f} ms  (min {result['min_ms']:.3f})")
+            db.close()
+        return document
+
+
+def compare(
+    current: dict,
+    baseline: dict,
+    threshold: float,
+    metrics: tuple[str, ...] = ("median_ms",),
+    min_delta_ms: float = MIN_DELTA_MS,
+) -> list[Regression]:
+    """Benchmarks whose ``metrics`` exceed the baseline's by more than ``threshold`` (0.25 = 25 %)."""
+    regressions = []
+    for name, result in current["results"].items():
+        before = baseline.get("results", {}).get(name, {})
+        for metric in metrics:
+            if metric not in before:
+                continue
+            if (result[metric] > before[metric] * (1 + threshold)
+                    and result[metric] - before[metric] > min_delta_ms):
+                regressions.append(Regression(name, before[metric], result[metric], metric))
+    return regressions
+
+
+def report_regressions(document: dict, baseline_path: Path, threshold: float, **options) -> int:
+    """Print the regressions of ``document`` against a baseline file; returns the exit status."""
+    regressions = compare(document, json.loads(baseline_path.read_text(encoding="utf-8")), threshold, **options)
+    for r in regressions:
+        print(f"REGRESSION {r.name} [{r.metric}]: {r.baseline_ms:.3f} ms -> {r.current_ms:.3f} ms ({r.ratio:.2f}x)")
+    if regressions:
+        return 1
+    print(f"No regressions beyond {threshold:.0%} against {baseline_path}")
+    return 0
+
+
+def argument_parser(prog: str, description: str) -> argparse.ArgumentParser:
+    """Options shared by the benchmark runners: histories, repetitions and baseline comparison."""
+    parser = argparse.ArgumentParser(prog=prog, description=description)
+    parser.add_argument("--years", type=int, nargs="+", default=[1, 5, 20], help="history lengths to build")
+    parser.add_argument("--psps", type=int, default=HistorySpec.psp_count, help="distinct PSP elements")
+    parser.add_argument("--descriptions", type=int, default=HistorySpec.description_count,
+                        help="distinct descriptions")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=7, help="timed runs per benchmark")
+    parser.add_argument("--only", default="", help="run benchmarks whose name contains this")
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    parser.add_argument("--baseline", type=Path, help="results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown against the baseline (default: 0.25 = 25%%)")
+    return parser
+
+
+def history_specs(args: argparse.Namespace) -> list[HistorySpec]:
+    return [HistorySpec(years=y, psp_count=args.psps, description_count=args.descriptions, seed=args.seed)
+            for y in args.years]
+
+
+def finish(document: dict, args: argparse.Namespace, **options) -> int:
+    """Write and compare ``document`` as the options ask; returns the exit status."""
+    if args.output:
+        args.output.write_text(json.dumps(document, indent=2), encoding="utf-8")
+    if args.baseline:
+        return report_regressions(document, args.baseline, args.threshold, **options)
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = argument_parser("python -m benchmarks.run", __doc__.splitlines()[0]).parse_args(argv)
+    return finish(run_benchmarks(history_specs(args), args.repeat, args.only), args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,281 @@
+"""Time scripted UI interactions on generated histories, headless.
+
+    python -m benchmarks.ui --years 1 20 --output ui.json
+    python -m benchmarks.ui --baseline ui.json --threshold 0.25
+
+Runs on Qt's offscreen platform with a themed ``MainWindow`` opened on each
+generated history. An interaction is timed from the moment it is triggered
+until the window has settled again (no refresh, prefetch, write or
+statistics job outstanding, pending repaints flushed). Next to this wall
+time the run records how long the event loop was stalled, i.e. could not
+react to input. The results document has the shape of
+``benchmarks.run``'s; ``--baseline`` gates on wall and stall time.
+"""
+
+from __future__ import annotations
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from pathlib import Path
+from typing import Callable
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QEventLoop, QModelIndex, QObject, Qt, QTimer
+from PySide6.QtWidgets import QApplication, QDialog
+
+from timetrac.database import Database
+from timetrac.main_window import MainWindow
+from timetrac.sap_export_dialog import SapExportDialog
+from timetrac.statistics_dialog import StatisticsDialog
+from timetrac.theme import apply_theme
+
+from .history import HistorySpec
+from .run import argument_parser, build_history, finish, history_specs, new_document, sample_day
+
+TIMEOUT_MS = 60_000
+
+
+class StallMonitor(QObject):
+    """Records how long the event loop could not dispatch events.
+
+    While monitoring, a precise timer ticks every ``TICK_MS``; a gap between
+    two ticks longer than ``STALL_MS`` is a stall of that length.
+    """
+
+    TICK_MS = 1
+    STALL_MS = 16  # one frame at 60 Hz
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.stalls: list[float] = []
+        self._last_tick = 0.0
+        self._timer = QTimer(self)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.setInterval(self.TICK_MS)
+        self._timer.timeout.connect(self._tick)
+
+    def start(self):
+        self.stalls = []
+        self._last_tick = time.perf_counter()
+        self._timer.start()
+
+    def stop(self):
+        self._tick()
+        self._timer.stop()
+
+    @property
+    def total_ms(self) -> float:
+        return sum(self.stalls)
+
+    @property
+    def longest_ms(self) -> float:
+        return max(self.stalls, default=0.0)
+
+    def _tick(self):
+        now = time.perf_counter()
+        gap = (now - self._last_tick) * 1000
+        self._last_tick = now
+        if gap > self.STALL_MS:
+            self.stalls.append(gap)
+
+
+@dataclass
+class Interaction:
+    """A scripted user action, finished once ``settled()`` holds.
+
+    ``setup`` and ``teardown`` run untimed around each repetition.
+    """
+
+    name: str
+    run: Callable[[], object]
+    settled: Callable[[], bool] = lambda: True
+    setup: Callable[[], None] | None = None
+    teardown: Callable[[], None] | None = None
+
+
+def wait_until(condition: Callable[[], bool], timeout_ms: int = TIMEOUT_MS):
+    """Run the event loop until ``condition()`` holds, then flush posted events."""
+    if not condition():
+        loop = QEventLoop()
+
+        def check():
+            if condition():
+                loop.quit()
+
+        poll = QTimer()
+        poll.setInterval(1)
+        poll.timeout.connect(check)
+        poll.start()
+        QTimer.singleShot(timeout_ms, loop.quit)
+        loop.exec()
+        poll.stop()
+        if not condition():
+            raise TimeoutError(f"not settled within {timeout_ms} ms")
+    QApplication.processEvents()
+
+
+def measure(interaction: Interaction, monitor: StallMonitor) -> tuple[float, float, float]:
+    """Trigger ``interaction`` and wait for it to settle.
+
+    Returns the wall time, the total stall time and the longest stall, in
+    milliseconds.
+    """
+    monitor.start()
+    started = time.perf_counter()
+    interaction.run()
+    wait_until(interaction.settled)
+    wall_ms = (time.perf_counter() - started) * 1000
+    monitor.stop()
+    return wall_ms, monitor.total_ms, monitor.longest_ms
+
+
+def time_interaction(interaction: Interaction, monitor: StallMonitor, repeat: int) -> dict:
+    walls, stalls, longest = [], [], 0.0
+    for _ in range(repeat):
+        if interaction.setup:
+            interaction.setup()
+            wait_until(interaction.settled)
+        wall_ms, stall_ms, longest_ms = measure(interaction, monitor)
+        walls.append(wall_ms)
+        stalls.append(stall_ms)
+        longest = max(longest, longest_ms)
+        if interaction.teardown:
+            interaction.teardown()
+    return {
+        "method": interaction.name,
+        "runs": len(walls),
+        "median_ms": round(statistics.median(walls), 4),
+        "min_ms": round(min(walls), 4),
+        "stall_ms": round(statistics.median(stalls), 4),
+        "max_stall_ms": round(longest, 4),
+    }
+
+
+def window_interactions(db: Database, spec: HistorySpec) -> tuple[list[Interaction], Callable[[], None]]:
+    """Interactions on a ``MainWindow`` over ``db``, which holds ``spec``'s history.
+
+    Returns them with a function that closes the window.
+    """
+    day = sample_day(spec)
+    windows: list[MainWindow] = []
+    dialogs: list[QDialog] = []
+
+    def open_window():
+        windows.append(MainWindow(db))
+        windows[-1].show()
+
+    def close_window():
+        window = windows.pop()
+        window.close()
+        window.deleteLater()
+
+    open_window()
+    window = windows[0]
+
+    def go_to(target):
+        window.date_nav.selected_date = target
+        wait_until(window.is_settled)
+
+    def fill_form():
+        go_to(day)
+        window.duration_seg_btn.click()
+        window.psp_combo.text = "P-UI"
+        window.type_combo.text = "Test"
+        window.desc_combo.text = "UI Benchmark"
+        window.hours_spin.setValue(0.25)
+
+    edited: list[QModelIndex] = []
+
+    def pick_entry():
+        go_to(day)
+        model = window.day_model
+        edited[:] = [
+            index for index in (model.index(row, 0) for row in range(model.rowCount()))
+            if (model.entry_id(index) or 0) > 0
+        ][:1]
+
+    def edit_entry():
+        window.day_tree.doubleClicked.emit(edited[0])
+        window.hours_spin.setValue(window.hours_spin.value() + 0.25)
+        window.update_btn.click()
+
+    def open_dialog(dialog: QDialog):
+        dialogs.append(dialog)
+        dialog.show()
+
+    def close_dialog():
+        dialog = dialogs.pop()
+        dialog.done(0)
+        dialog.deleteLater()
+
+    def open_statistics():
+        open_dialog(StatisticsDialog(db, window.date_nav.selected_date, window))
+
+    def cold_statistics():
+        db.aggregate_cache.clear()
+        open_statistics()
+
+    stats_idle = lambda: not dialogs or not dialogs[-1].is_refreshing()
+
+    interactions = [
+        Interaction("startup", open_window, lambda: windows[-1].is_settled(), teardown=close_window),
+        Interaction("step_day", window.date_nav.next_btn.click, window.is_settled, setup=lambda: go_to(day)),
+        Interaction("step_week", lambda: setattr(window.date_nav, "selected_date", day + timedelta(days=7)),
+                    window.is_settled, setup=lambda: go_to(day)),
+        Interaction("save_entry", window.save_btn.click, window.is_settled, setup=fill_form),
+        Interaction("edit_entry", edit_entry, window.is_settled, setup=pick_entry),
+        Interaction("search", lambda: window.search_panel.search("workshop"),
+                    lambda: not window.search_panel.is_searching()),
+        Interaction("open_statistics", cold_statistics, stats_idle, teardown=close_dialog),
+        Interaction("statistics[year]",
+                    lambda: dialogs[-1].period_combo.setCurrentIndex(StatisticsDialog.PERIOD_YEAR), stats_idle,
+                    setup=lambda: (db.aggregate_cache.clear(), open_statistics()), teardown=close_dialog),
+        Interaction("open_export", lambda: open_dialog(SapExportDialog(db, day, window)), teardown=close_dialog),
+    ]
+    return interactions, close_window
+
+
+def run_ui_benchmarks(
+    specs: list[HistorySpec],
+    repeat: int = 7,
+    only: str = "",
+    workdir: Path | None = None,
+    log: Callable[[str], None] = print,
+) -> dict:
+    """Build each history, time all interactions on it; returns the results document."""
+    monitor = StallMonitor()
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = workdir or Path(tmp)
+        document = new_document(repeat)
+        for spec in specs:
+            db = build_history(document, workdir / f"ui-{spec.label}.db", spec, log)
+            interactions, close_window = window_interactions(db, spec)
+            for interaction in interactions:
+                if only and only not in interaction.name:
+                    continue
+                result = time_interaction(interaction, monitor, repeat)
+                document["results"][f"{spec.label}/{interaction.name}"] = result
+                log(f"  {interaction.name:<20} {result['median_ms']:>10.3f} ms  "
+                    f"(stalled {result['stall_ms']:.1f} ms, longest {result['max_stall_ms']:.1f} ms)")
+            close_window()
+            db.close()
+        return document
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = argument_parser("python -m benchmarks.ui", __doc__.splitlines()[0]).parse_args(argv)
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    apply_theme(app)
+    document = run_ui_benchmarks(history_specs(args), args.repeat, args.only)
+    # Differences below one frame go unnoticed
+    return finish(document, args, metrics=("median_ms", "stall_ms"), min_delta_ms=StallMonitor.STALL_MS)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
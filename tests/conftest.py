@@ -0,0 +1,55 @@
+"""Shared test setup: import path, headless Qt, entry factory and event-loop polling."""
+
+import os
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QCoreApplication
+from PySide6.QtWidgets import QApplication
+
+from timetrac.models import TimeEntry, TimeMode
+
+
+@pytest.fixture
+def make_entry():
+    """Build a one-hour duration entry for PSP "A"; keyword arguments override fields."""
+
+    def make(day: date = date(2024, 6, 10), **fields) -> TimeEntry:
+        defaults = dict(
+            id=None, date=day, psp="A", activity_type="Dev", description="",
+            hours=1.0, start_time="", end_time="", mode=TimeMode.DURATION,
+        )
+        return TimeEntry(**{**defaults, **fields})
+
+    return make
+
+
+@pytest.fixture(scope="session")
+def qapp() -> QApplication:
+    """The process-wide ``QApplication``, on Qt's offscreen platform."""
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def wait_for(qapp):
+    """Process Qt events until ``predicate()`` holds; fails after ``timeout`` seconds."""
+
+    def wait(predicate, timeout: float = 5.0):
+        deadline = time.monotonic() + timeout
+        while not predicate():
+            if time.monotonic() > deadline:
+                raise AssertionError("timed out waiting for the event loop")
+            QCoreApplication.processEvents()
+            time.sleep(0.001)
+
+    return wait
@@ -0,0 +1,75 @@
+"""Tests for the benchmark suite's history generator and baseline comparison."""
+
+import inspect
+import json
+import time
+from datetime import date
+
+from PySide6.QtCore import QTimer
+
+from benchmarks import run
+from benchmarks.history import HistorySpec, generate_history
+from benchmarks.run import compare, main, run_benchmarks
+from benchmarks.ui import Interaction, StallMonitor, measure
+from timetrac.database import _UNINSTRUMENTED, Database
+
+
+def test_generated_history_is_deterministic_and_realistic():
+    spec = HistorySpec(years=1, psp_count=10, description_count=50, end=date(2024, 12, 31))
+    entries = list(generate_history(spec))
+    assert entries == list(generate_history(spec))
+    assert entries != list(generate_history(HistorySpec(years=1, psp_count=10, description_count=50,
+                                                        end=date(2024, 12, 31), seed=1)))
+    days = {e.date for e in entries}
+    assert all(d.weekday() < 5 and d.year == 2024 for d in days)
+    assert 200 < len(days) < 262
+    assert {e.psp for e in entries} <= {f"P-{1000 + i:04d}.{i % 7 + 1:02d}" for i in range(10)}
+    assert len({e.description for e in entries}) <= 50
+    daily = {}
+    for e in entries:
+        daily[e.date] = daily.get(e.date, 0) + e.hours
+    assert all(7.0 <= h <= 9.5 for h in daily.values())
+
+
+def test_benchmarks_cover_every_query_and_detect_regressions(tmp_path):
+    spec = HistorySpec(years=1, psp_count=10, description_count=50)
+    document = run_benchmarks([spec], repeat=1, workdir=tmp_path, log=lambda line: None)
+    methods = {result["method"] for result in document["results"].values()}
+    public = {name for name, _ in inspect.getmembers(Database, inspect.isfunction) if not name.startswith("_")}
+    assert public - _UNINSTRUMENTED <= methods
+    assert document["histories"]["1y"]["entries"] > 1000
+
+    baseline = {"results": {"1y/a": {"median_ms": 1.0}, "1y/b": {"median_ms": 1.0}, "1y/c": {"median_ms": 0.01}}}
+    current = {"results": {"1y/a": {"median_ms": 1.2}, "1y/b": {"median_ms": 1.5},
+                           "1y/c": {"median_ms": 0.03}, "1y/new": {"median_ms": 9.0}}}
+    assert [r.name for r in compare(current, baseline, threshold=0.25)] == ["1y/b"]
+    assert compare(current, baseline, threshold=0.6) == []
+
+
+def test_benchmark_cli_writes_results_and_fails_on_regression(tmp_path, capsys, monkeypatch):
+    monkeypatch.setattr(run, "MIN_DELTA_MS", 0.0)
+    output = tmp_path / "results.json"
+    args = ["--years", "1", "--psps", "5", "--descriptions", "20", "--repeat", "1", "--only", "get_presets"]
+    assert main([*args, "--output", str(output)]) == 0
+    document = json.loads(output.read_text())
+    document["results"]["1y/get_presets"]["median_ms"] /= 100
+    output.write_text(json.dumps(document))
+    assert main([*args, "--baseline", str(output), "--threshold", "0.1"]) == 1
+    assert "REGRESSION 1y/get_presets" in capsys.readouterr().out
+
+
+def test_ui_measurement_separates_waiting_from_stalls(qapp):
+    monitor = StallMonitor()
+    done = []
+
+    def start_timer(block_ms=0):
+        QTimer.singleShot(60, lambda: done.append(True))
+        time.sleep(block_ms / 1000)
+
+    # Only lower bounds: a busy machine can add stalls and wall time to either run
+    wall_ms, stall_ms, longest_ms = measure(Interaction("wait", start_timer, lambda: bool(done)), monitor)
+    assert wall_ms >= 55 and stall_ms >= longest_ms
+
+    done.clear()
+    wall_ms, stall_ms, longest_ms = measure(Interaction("block", lambda: start_timer(80), lambda: bool(done)), monitor)
+    assert wall_ms >= 80 and stall_ms >= longest_ms >= 80
@@ -0,0 +1,125 @@
+"""Tests for the week-keyed entry cache."""
+
+from datetime import date
+
+from timetrac.cache import WeekCache
+from timetrac.database import Database
+from timetrac.models import TimeEntry
+
+
+class CountingDatabase(Database):
+    def __init__(self, db_path):
+        super().__init__(db_path)
+        self.week_fetches = 0
+
+    def get_entries_for_week(self, day):
+        self.week_fetches += 1
+        return super().get_entries_for_week(day)
+
+
+def _hours(cache, day):
+    return [e.hours for e in cache.week(day)[day]]
+
+
+def test_week_cache_serves_day_reads_from_one_fetch(tmp_path, make_entry):
+    db = CountingDatabase(tmp_path / "test.db")
+    monday = date(2024, 6, 10)
+    wednesday = date(2024, 6, 12)
+    db.add_entry(make_entry(monday, hours=4.0))
+    db.add_entry(make_entry(wednesday, hours=2.0))
+
+    cache = WeekCache(db)
+    assert _hours(cache, monday) == [4.0]
+    assert _hours(cache, wednesday) == [2.0]
+    assert db.week_fetches == 1
+    assert cache.misses == 1 and cache.hits == 1
+    db.close()
+
+
+def test_week_cache_invalidates_only_affected_week(tmp_path, make_entry):
+    db = CountingDatabase(tmp_path / "test.db")
+    monday = date(2024, 6, 10)
+    cache = WeekCache(db)
+    cache.week(monday)
+    assert cache.prefetch(monday) == 2
+    assert db.week_fetches == 3
+
+    db.add_entry(make_entry(monday, hours=1.0))
+    cache.invalidate(monday)
+    assert _hours(cache, monday) == [1.0]
+    assert db.week_fetches == 4
+
+    # Neighbours are still cached, so stepping across the week boundary is free
+    cache.week(date(2024, 6, 3))
+    cache.week(date(2024, 6, 17))
+    assert db.week_fetches == 4
+    db.close()
+
+
+def test_week_cache_evicts_least_recently_used(tmp_path):
+    db = CountingDatabase(tmp_path / "test.db")
+    cache = WeekCache(db, capacity=2)
+    cache.week(date(2024, 6, 3))
+    cache.week(date(2024, 6, 10))
+    cache.week(date(2024, 6, 3))
+    cache.week(date(2024, 6, 17))
+    assert db.week_fetches == 3
+    cache.week(date(2024, 6, 3))
+    assert db.week_fetches == 3
+    cache.week(date(2024, 6, 10))
+    assert db.week_fetches == 4
+    db.close()
+
+
+def test_week_cache_overlays_pending_writes_until_resolved(tmp_path, make_entry):
+    from timetrac.cache import PendingWrite
+
+    db = CountingDatabase(tmp_path / "test.db")
+    monday = date(2024, 6, 10)
+    tuesday = date(2024, 6, 11)
+    existing_id = db.add_entry(make_entry(monday, hours=2.0))
+    cache = WeekCache(db)
+    existing = cache.week(monday)[monday][0]
+
+    add_token = cache.add_pending(PendingWrite("add", make_entry(monday, hours=1.0)))
+    assert add_token < 0
+    assert [(e.id, e.hours) for e in cache.week(monday)[monday]] == [(existing_id, 2.0), (add_token, 1.0)]
+
+    moved = TimeEntry(**{**existing.__dict__, "date": tuesday, "hours": 5.0})
+    update_token = cache.add_pending(PendingWrite("update", moved, old_date=monday))
+    assert _hours(cache, monday) == [1.0]
+    assert _hours(cache, tuesday) == [5.0]
+
+    # Overlays survive a reload of the week while the writes are in flight
+    cache.invalidate(monday)
+    assert _hours(cache, monday) == [1.0]
+    assert _hours(cache, tuesday) == [5.0]
+
+    db.add_entry(make_entry(monday, hours=1.0))
+    cache.resolve_pending(add_token)
+    assert _hours(cache, monday) == [1.0]
+    assert _hours(cache, tuesday) == [5.0]
+    assert cache.has_pending()
+
+    db.update_entry(moved)
+    cache.resolve_pending(update_token)
+    assert not cache.has_pending()
+    assert _hours(cache, tuesday) == [5.0]
+    db.close()
+
+
+def test_week_cache_skips_committed_add_when_reloading(tmp_path, make_entry):
+    from timetrac.cache import PendingWrite
+
+    db = CountingDatabase(tmp_path / "test.db")
+    monday = date(2024, 6, 10)
+    cache = WeekCache(db)
+    cache.week(monday)
+    token = cache.add_pending(PendingWrite("add", make_entry(monday, hours=1.0)))
+
+    # The worker committed the row; the week reloads before the write is resolved
+    cache.mark_committed(token, db.add_entry(make_entry(monday, hours=1.0)))
+    cache.invalidate(monday)
+    assert _hours(cache, monday) == [1.0]
+    assert cache.week(monday)[monday][0].id > 0
+    db.close()
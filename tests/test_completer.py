@@ -0,0 +1,37 @@
+"""Tests for the history completer of the entry combo boxes."""
+
+from timetrac import completer
+from timetrac.database import Database
+from timetrac.widgets import EditableComboBox
+
+
+def test_completer_streams_latest_search_in_pages(tmp_path, monkeypatch, make_entry, wait_for):
+    monkeypatch.setattr(completer, "PAGE_SIZE", 10)
+    db = Database(tmp_path / "test.db")
+    db.add_entries(
+        [make_entry(description=f"Review {i:03d}") for i in range(120)] + [make_entry(description="Code review")]
+    )
+    combo = EditableComboBox()
+    combo.enable_history(db, "description")
+    history = combo.history_completer
+    pages = []
+    history.source.rowsInserted.connect(lambda *args: pages.append(args[2]))
+    searched = []
+    history.searched.connect(searched.append)
+
+    # Only the text typed last is searched
+    combo.lineEdit().textEdited.emit("Rev")
+    combo.lineEdit().textEdited.emit("revi")
+    assert history.is_searching()
+    wait_for(lambda: not history.is_searching())
+    assert searched == ["revi"]
+    values = history.source.values()
+    assert len(values) == 121 and values[-1] == "Code review"
+    assert len(pages) == 12  # first page resets the model, the rest are appended
+
+    combo.lineEdit().textEdited.emit("nothing like it")
+    wait_for(lambda: not history.is_searching())
+    assert history.source.values() == []
+
+    history.shutdown()
+    db.close()
@@ -0,0 +1,39 @@
+"""Tests for the background database writer."""
+
+from datetime import date
+
+from PySide6.QtCore import QThread
+
+from timetrac.database import Database
+from timetrac.db_worker import DatabaseWorker
+
+
+def test_worker_runs_writes_in_order_and_calls_back_on_gui_thread(tmp_path, qapp, make_entry, wait_for):
+    db = Database(tmp_path / "test.db")
+    worker = DatabaseWorker(db)
+    day = date(2024, 6, 10)
+    results = []
+
+    def on_done(future):
+        results.append((QThread.currentThread() == qapp.thread(), future.result()))
+
+    first = worker.submit("add_entry", make_entry(day, hours=1.0), callback=on_done)
+    worker.submit("add_entry", make_entry(day, hours=2.0), callback=on_done)
+    worker.submit("delete_entry", first.result(timeout=5))
+    wait_for(lambda: len(results) == 2)
+    worker.close()
+
+    assert all(on_gui for on_gui, _ in results)
+    assert [e.hours for e in db.get_entries_for_date(day)] == [2.0]
+    db.close()
+
+
+def test_worker_reports_errors_through_future(tmp_path, wait_for):
+    db = Database(tmp_path / "test.db")
+    worker = DatabaseWorker(db)
+    errors = []
+    worker.submit("no_such_method", callback=lambda f: errors.append(f.exception()))
+    wait_for(lambda: errors)
+    worker.close()
+    assert isinstance(errors[0], AttributeError)
+    db.close()
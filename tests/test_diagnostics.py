@@ -0,0 +1,51 @@
+"""Tests for the event-loop stall watchdog and the performance HUD."""
+
+import time
+from datetime import datetime
+
+import pytest
+from PySide6.QtCore import QEventLoop, QTimer
+
+from timetrac.diagnostics import PerformanceHud, Stall, StallWatchdog
+
+pytestmark = pytest.mark.usefixtures("qapp")
+
+
+def _run_loop(ms):
+    loop = QEventLoop()
+    QTimer.singleShot(ms, loop.quit)
+    loop.exec()
+
+
+def _slow_handler():
+    time.sleep(0.2)
+
+
+def test_watchdog_records_stalls_with_the_gui_stack(tmp_path):
+    log_path = tmp_path / "stalls.log"
+    watchdog = StallWatchdog(threshold_ms=80, log_path=log_path)
+    stalls = []
+    watchdog.stalled.connect(stalls.append)
+    watchdog.start()
+    QTimer.singleShot(0, _slow_handler)
+    _run_loop(100)
+    watchdog.stop()
+
+    # A loaded machine may stall elsewhere too; only the handler's stall is certain
+    caught = [stall for stall in stalls if "_slow_handler" in stall.stack]
+    assert len(caught) == 1 and watchdog.last_stall is stalls[-1]
+    assert caught[0].duration_ms >= watchdog.threshold_ms
+    log = log_path.read_text(encoding="utf-8")
+    assert "event loop stalled for" in log and "_slow_handler" in log
+
+
+def test_hud_shows_refresh_figures_and_last_stall():
+    hud = PerformanceHud()
+    hud.show_refresh(2.345, None, (9, 1), (0, 0))
+    assert hud.text() == "Refresh 2.3 ms  ·  Wochen-Cache 90%  ·  Summen-Cache –"
+    hud.show_refresh(1.0, 4, (1, 1), (3, 1))
+    hud.show_stall(Stall(at=datetime(2025, 1, 1, 9, 30, 5), duration_ms=120.4, stack="  File x\n"))
+    assert hud.text() == (
+        "Refresh 1.0 ms  ·  4 Abfragen  ·  Wochen-Cache 50%  ·  Summen-Cache 75%  ·  Hänger 120 ms um 09:30:05"
+    )
+    assert hud.toolTip() == "  File x\n"
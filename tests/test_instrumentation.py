@@ -0,0 +1,70 @@
+"""Tests for the opt-in query instrumentation of ``Database``."""
+
+import sqlite3
+import threading
+from datetime import date
+
+import pytest
+
+from timetrac.database import Database
+from timetrac.instrumentation import normalize_sql
+
+
+def test_normalize_sql_merges_executions_of_one_statement():
+    assert normalize_sql("SELECT * FROM t\n  WHERE a = 'it''s' AND b = 12.5 AND c IN (1, 2, 3) LIMIT 50") == (
+        "SELECT * FROM t WHERE a = ? AND b = ? AND c IN (?, ...) LIMIT ?"
+    )
+    assert normalize_sql("SELECT id FROM idx_2 WHERE x = -3") == "SELECT id FROM idx_2 WHERE x = -?"
+
+
+def test_stats_count_calls_rows_and_statements(tmp_path, make_entry):
+    db = Database(tmp_path / "test.db")
+    db.add_entries(make_entry(date(2024, 3, d), description="Workshop") for d in range(4, 9))
+    assert set(db.stats()) == {"aggregate_cache"}
+
+    db.enable_instrumentation(slow_query_ms=1000)
+    assert db.enable_instrumentation() is db.instrumentation
+    assert len(db.get_entries_for_week(date(2024, 3, 6))) == 7
+    assert sum(map(len, db.iter_entries(date(2024, 3, 1), date(2024, 3, 31), batch_size=2))) == 5
+    db.add_entry(make_entry(date(2024, 3, 11), description="Workshop"))
+    thread = threading.Thread(target=lambda: db.get_week_total(date(2024, 3, 6)))
+    thread.start()
+    thread.join()
+
+    stats = db.stats()
+    methods = stats["methods"]
+    assert methods["get_entries_for_week"]["calls"] == 1 and methods["get_entries_for_week"]["rows"] == 5
+    # Called directly once and once by get_entries_for_week; three keyset pages
+    assert methods["iter_entries"]["calls"] == 2 and methods["iter_entries"]["rows"] == 10
+    assert methods["add_entry"]["calls"] == 1 and methods["get_week_total"]["calls"] == 1
+    for figures in methods.values():
+        assert 0 <= figures["p50_ms"] <= figures["p95_ms"] <= figures["max_ms"] <= figures["total_ms"]
+    selects = [figures for sql, figures in stats["statements"].items() if sql.startswith("SELECT e.id")]
+    assert sum(f["calls"] for f in selects) == 4 and sum(f["rows"] for f in selects) == 10
+    assert stats["statements"]["COMMIT"]["calls"] >= 1
+    assert stats["slow"]["count"] == 0
+    db.close()
+
+
+def test_slow_queries_are_logged_to_a_rotating_file(tmp_path, make_entry):
+    db = Database(tmp_path / "test.db")
+    db.add_entries(make_entry(date(2024, 1, 1 + i % 28), description=f"Workshop {i}") for i in range(200))
+    log_path = tmp_path / "slow.log"
+    db.enable_instrumentation(slow_query_ms=0, log_path=log_path)
+    db.search_entries("workshop")
+    slow = db.stats()["slow"]
+    assert slow["count"] >= 2
+    assert {e["kind"] for e in slow["recent"]} == {"method", "statement"}
+    db.close()
+    log = log_path.read_text(encoding="utf-8")
+    assert "slow method" in log and "search_entries" in log and "entries_fts MATCH" in log
+
+
+def test_instrumented_reads_stay_interruptible(tmp_path, make_entry):
+    db = Database(tmp_path / "test.db")
+    db.add_entries(make_entry(date(2023, 1, 1 + i % 28), description="Workshop") for i in range(3000))
+    db.enable_instrumentation()
+    with db.interruptible(lambda: True), pytest.raises(sqlite3.OperationalError, match="interrupted"):
+        list(db.iter_entries(date(2023, 1, 1), date(2023, 12, 31)))
+    assert len(db.get_entries_for_date(date(2023, 1, 5))) > 0
+    db.close()
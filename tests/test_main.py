@@ -1,17 +1,23 @@
 """Tests for legacy main.py compatibility and new database layer."""
 
 import json
-import sys
+import random
+import sqlite3
+import threading
 from datetime import datetime, date, timedelta
-from pathlib import Path
 
-ROOT_DIR = Path(__file__).resolve().parents[1]
-if str(ROOT_DIR) not in sys.path:
-    sys.path.insert(0, str(ROOT_DIR))
+import pytest
 
 import main
-from timetrac.database import Database
-from timetrac.models import Preset, TimeEntry, TimeMode
+from timetrac.database import LEGACY_JSON_CHECKED, SCHEMA_VERSION, Database
+from timetrac.models import (
+    Preset,
+    TimeEntry,
+    TimeMode,
+    format_time_of_day,
+    hours_to_seconds,
+    parse_time_of_day,
+)
 
 
 # --- Legacy main.py tests (backwards compatibility) ---
@@ -302,6 +308,35 @@ def test_db_hours_by_psp(tmp_path):
     db.close()
 
 
+def test_db_get_statistics_single_scan(tmp_path, make_entry):
+    db = _make_db(tmp_path)
+    monday = date(2024, 6, 10)
+    db.add_entries([
+        make_entry(monday, psp="A", hours=4.0),
+        make_entry(monday, psp="A", activity_type="Test"),
+        make_entry(monday, psp="B", hours=3.0),
+        make_entry(monday, psp="", hours=0.5),
+        make_entry(date(2024, 6, 17), psp="A", hours=9.0),
+    ])
+    # Two presets for PSP B: the last one by name decides
+    db.add_preset(Preset(id=None, name="B1", psp="B", activity_type="", billable=True))
+    db.add_preset(Preset(id=None, name="B2", psp="B", activity_type="", billable=False))
+    db.add_preset(Preset(id=None, name="Leer", psp="", activity_type="", billable=False))
+
+    statements = []
+    db._read_conn().set_trace_callback(statements.append)
+    stats = db.get_statistics(monday, date(2024, 6, 16))
+    assert len(statements) == 1
+
+    assert [(d["psp"], d["activity_type"], d["hours"], d["billable"]) for d in stats.detailed] == [
+        ("A", "Dev", 4.0, True), ("B", "Dev", 3.0, False), ("A", "Test", 1.0, True), ("", "Dev", 0.5, True),
+    ]
+    assert [(m["psp"], m["hours"]) for m in stats.merged] == [("A", 5.0), ("B", 3.0), ("", 0.5)]
+    assert (stats.billable_hours, stats.non_billable_hours, stats.total_hours) == (5.5, 3.0, 8.5)
+    assert stats.working_days == 5
+    db.close()
+
+
 def test_db_entries_for_week(tmp_path):
     db = _make_db(tmp_path)
     monday = date(2024, 6, 10)
@@ -323,3 +358,548 @@ def test_db_entries_for_week(tmp_path):
     assert len(week[wednesday]) == 1
     assert week[monday][0].description == "Mon work"
     db.close()
+
+
+def test_db_bulk_add_update_delete(tmp_path, make_entry):
+    db = _make_db(tmp_path)
+    day = date(2024, 6, 10)
+    count = db.add_entries(make_entry(day, psp=f"P{i}") for i in range(1200))
+    assert count == 1200
+
+    entries = db.get_entries_for_date(day)
+    assert len(entries) == 1200
+
+    for e in entries[:3]:
+        e.hours = 2.0
+    db.update_entries(entries[:3])
+    assert db.get_day_total(day) == 1203.0
+
+    assert db.delete_entries(e.id for e in entries[:1100]) == 1100
+    assert len(db.get_entries_for_date(day)) == 100
+    db.close()
+
+
+def test_db_transaction_commits_once_and_rolls_back(tmp_path, make_entry):
+    db = _make_db(tmp_path)
+    day = date(2024, 6, 10)
+
+    with db.transaction():
+        db.add_entry(make_entry(day))
+        with db.transaction():
+            db.add_entry(make_entry(day))
+        assert db.conn.in_transaction
+    assert not db.conn.in_transaction
+    assert len(db.get_entries_for_date(day)) == 2
+
+    try:
+        with db.transaction():
+            db.add_entry(make_entry(day))
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+    assert len(db.get_entries_for_date(day)) == 2
+    db.close()
+
+
+def test_db_import_from_json_streams_plain_format_in_batches(tmp_path):
+    json_path = tmp_path / "time_entries.json"
+    data = {
+        f"2024-01-{d:02d}": [
+            {"psp": f"P{d}", "type": "Dev", "desc": "x" * 50, "hours": "1,5", "mode": "duration"}
+            for _ in range(20)
+        ]
+        for d in range(1, 29)
+    }
+    data["not-a-date"] = [{"psp": "X"}]
+    json_path.write_text(json.dumps(data, indent=2))
+
+    db = _make_db(tmp_path)
+    calls = []
+    count = db.import_from_json(json_path, progress=lambda done, total: calls.append((done, total)),
+                                batch_size=50)
+    assert count == 28 * 20
+    assert db.get_day_total(date(2024, 1, 3)) == 30.0
+    assert len(calls) > 2
+    assert calls[-1][0] == calls[-1][1] == json_path.stat().st_size
+    db.close()
+
+
+def test_db_import_from_json_invalid_imports_nothing(tmp_path):
+    json_path = tmp_path / "time_entries.json"
+    valid = json.dumps({"entries": {"2024-01-15": [{"psp": "A", "hours": 1.0}]}})
+    json_path.write_text(valid[:-3])
+
+    db = _make_db(tmp_path)
+    assert db.import_from_json(json_path) == 0
+    assert db.get_entries_for_date(date(2024, 1, 15)) == []
+    db.close()
+
+
+def test_legacy_json_reader_handles_small_chunks(tmp_path):
+    from timetrac.legacy_json import LegacyJsonReader
+
+    json_path = tmp_path / "time_entries.json"
+    data = {
+        "presets": [{"name": "Ä", "psp": "P"}],
+        "entries": {"2024-01-01": [{"hours": 12345}], "2024-01-02": []},
+    }
+    json_path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+
+    items = list(LegacyJsonReader(json_path, chunk_size=3))
+    assert items == [
+        ("presets", None, [{"name": "Ä", "psp": "P"}]),
+        ("day", "2024-01-01", [{"hours": 12345}]),
+        ("day", "2024-01-02", []),
+    ]
+
+
+def test_db_daily_totals_follow_writes(tmp_path, make_entry):
+    db = _make_db(tmp_path)
+    monday = date(2024, 6, 10)
+    tuesday = date(2024, 6, 11)
+    first = db.add_entry(make_entry(monday, hours=4.0))
+    db.add_entry(make_entry(monday, hours=1.5))
+
+    moved = next(e for e in db.get_entries_for_date(monday) if e.id == first)
+    moved.date = tuesday
+    moved.hours = 2.0
+    db.update_entry(moved)
+    assert db.get_day_total(monday) == 1.5
+    assert db.get_day_total(tuesday) == 2.0
+    assert db.get_week_total(monday) == 3.5
+
+    db.delete_entry(first)
+    assert db.get_day_total(tuesday) == 0.0
+    rows = db.conn.execute("SELECT day, seconds, entry_count FROM daily_totals").fetchall()
+    assert rows == [(monday.toordinal(), 5400, 1)]
+    assert db.get_daily_hours(monday, tuesday) == [{"date": monday, "hours": 1.5}]
+    db.close()
+
+
+def test_db_daily_totals_backfilled_on_migration(tmp_path, make_entry):
+    db = _make_db(tmp_path)
+    db.add_entries([make_entry(date(2024, 6, 10), hours=2.0)] * 3)
+    db.conn.executescript("""
+        DROP TRIGGER trg_daily_totals_insert;
+        DROP TRIGGER trg_daily_totals_delete;
+        DROP TRIGGER trg_daily_totals_update;
+        DROP TABLE daily_totals;
+    """)
+    db.close()
+
+    db = _make_db(tmp_path)
+    assert db.get_day_total(date(2024, 6, 10)) == 6.0
+    db.close()
+
+
+def test_db_reads_inside_transaction_see_own_writes(tmp_path, make_entry):
+    db = _make_db(tmp_path)
+    day = date(2024, 6, 10)
+    seen_elsewhere = []
+
+    with db.transaction():
+        db.add_entry(make_entry(day, hours=2.0))
+        assert db.get_day_total(day) == 2.0
+        reader = threading.Thread(target=lambda: seen_elsewhere.append(db.get_day_total(day)))
+        reader.start()
+        reader.join()
+    assert seen_elsewhere == [0.0]
+    assert db.get_day_total(day) == 2.0
+    db.close()
+
+
+def test_db_concurrent_readers_never_see_partial_transactions(tmp_path, make_entry):
+    db = _make_db(tmp_path)
+    day = date(2024, 6, 10)
+    done = threading.Event()
+    errors = []
+    readers_used = set()
+
+    def read():
+        try:
+            while not done.is_set():
+                # Entries are only ever written in pairs
+                count = len(db.get_entries_for_date(day))
+                assert count % 2 == 0, count
+                with db.read_snapshot():
+                    psp_hours = sum(r["hours"] for r in db.get_hours_by_psp(day, day))
+                    assert psp_hours == db.get_day_total(day)
+            readers_used.add(id(db._read_conn()))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=read) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for _ in range(100):
+        with db.transaction():
+            db.add_entry(make_entry(day))
+            db.add_entry(make_entry(day))
+    done.set()
+    for t in threads:
+        t.join()
+
+    assert not errors
+    assert len(readers_used) == 4
+    assert db.get_day_total(day) == 200.0
+    db.close()
+
+
+def test_db_monthly_totals_follow_writes_and_backfill(tmp_path, make_entry):
+    db = _make_db(tmp_path)
+    first = db.add_entry(make_entry(date(2024, 5, 31), psp="A", hours=2.0))
+    db.add_entry(make_entry(date(2024, 6, 3), psp="A", hours=1.0))
+
+    entry = next(e for e in db.get_entries_for_date(date(2024, 5, 31)) if e.id == first)
+    entry.date = date(2024, 6, 4)
+    entry.psp = "B"
+    db.update_entry(entry)
+
+    def rows():
+        return db.conn.execute(
+            """SELECT m.month, p.value, a.value, m.seconds, m.entry_count FROM monthly_totals m
+               JOIN psp p ON p.id = m.psp_id JOIN activity_type a ON a.id = m.activity_type_id
+               ORDER BY 1, 2"""
+        ).fetchall()
+
+    assert rows() == [(202406, "A", "Dev", 3600, 1), (202406, "B", "Dev", 7200, 1)]
+    db.delete_entry(first)
+    assert rows() == [(202406, "A", "Dev", 3600, 1)]
+
+    db.conn.executescript("""
+        DROP TRIGGER trg_monthly_totals_insert;
+        DROP TRIGGER trg_monthly_totals_delete;
+        DROP TRIGGER trg_monthly_totals_update;
+        DROP TABLE monthly_totals;
+    """)
+    db.close()
+    db = _make_db(tmp_path)
+    assert rows() == [(202406, "A", "Dev", 3600, 1)]
+    db.close()
+
+
+def test_db_get_statistics_combines_rollup_and_edge_months(tmp_path, make_entry):
+    db = _make_db(tmp_path)
+    rng = random.Random(7)
+    origin = date(2023, 1, 1)
+    db.add_entries(
+        make_entry(origin + timedelta(days=rng.randrange(730)), psp=rng.choice("ABC"),
+                        hours=rng.randrange(1, 9) / 4)
+        for _ in range(2000)
+    )
+    all_entries = [(date.fromordinal(d), psp, seconds / 3600)
+                   for d, psp, seconds in db.conn.execute(
+                       "SELECT e.day, p.value, e.seconds FROM entries e JOIN psp p ON p.id = e.psp_id"
+                   )]
+
+    for start, end in [
+        (date(2023, 3, 15), date(2024, 8, 10)),  # partial edges around whole months
+        (date(2023, 1, 1), date(2024, 12, 31)),  # whole months only
+        (date(2023, 6, 5), date(2023, 6, 20)),  # inside one month
+        (date(2023, 6, 20), date(2023, 7, 5)),  # two partial months, no whole one
+    ]:
+        expected: dict[str, float] = {}
+        for day, psp, hours in all_entries:
+            if start <= day <= end:
+                expected[psp] = expected.get(psp, 0.0) + hours
+        merged = {m["psp"]: m["hours"] for m in db.get_statistics(start, end).merged}
+        assert merged == expected, (start, end)
+    db.close()
+
+
+def test_db_aggregate_cache_invalidated_by_any_commit(tmp_path, make_entry):
+    db = _make_db(tmp_path)
+    monday = date(2024, 6, 10)
+    db.add_entry(make_entry(monday, hours=2.0))
+    cache = db.aggregate_cache
+
+    assert db.get_week_total(monday) == 2.0
+    assert db.get_week_total(monday) == 2.0
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # A write through this Database
+    db.add_entry(make_entry(monday, hours=1.0))
+    assert db.get_week_total(monday) == 3.0
+
+    # A write from another connection, as another process would do
+    other = sqlite3.connect(str(db.db_path))
+    other.execute("UPDATE entries SET seconds = 18000 WHERE seconds = 3600")
+    other.commit()
+    other.close()
+    assert db.get_week_total(monday) == 7.0
+
+    # Inside a transaction the result reflects uncommitted writes and is not cached
+    misses = cache.misses
+    with db.transaction():
+        db.add_entry(make_entry(monday, hours=1.0))
+        assert db.get_week_total(monday) == 8.0
+    assert cache.misses == misses
+    assert db.get_week_total(monday) == 8.0
+    db.close()
+
+
+def test_db_aggregate_cache_results_are_not_shared(tmp_path, make_entry):
+    db = _make_db(tmp_path)
+    monday = date(2024, 6, 10)
+    db.add_entry(make_entry(monday, psp="A", hours=2.0))
+
+    db.get_hours_by_psp(monday, monday).clear()
+    db.get_week_summary(monday)[0].entries.clear()
+    assert [row["psp"] for row in db.get_statistics(monday, monday).detailed] == ["A"]
+    assert len(db.get_week_summary(monday)[0].entries) == 1
+
+    # Keyword and positional calls share a cache entry
+    misses = db.aggregate_cache.misses
+    assert db.get_day_total(day=monday) == db.get_day_total(monday) == 2.0
+    assert db.aggregate_cache.misses == misses + 1
+    db.close()
+
+
+def test_db_aggregate_cache_evicts_least_recently_used(tmp_path):
+    db = _make_db(tmp_path)
+    db.aggregate_cache.capacity = 2
+    monday = date(2024, 6, 10)
+    for offset in range(3):
+        db.get_day_total(monday + timedelta(days=offset))
+    db.get_day_total(monday + timedelta(days=2))
+    assert len(db.aggregate_cache) == 2
+    assert db.aggregate_cache.evictions == 1
+    assert db.aggregate_cache.hits == 1
+    db.close()
+
+
+def test_db_migrates_v1_schema_to_integer_columns(tmp_path, make_entry):
+    path = tmp_path / "test.db"
+    old = sqlite3.connect(str(path))
+    old.executescript("""
+        CREATE TABLE entries (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date TEXT NOT NULL,
+            psp TEXT NOT NULL DEFAULT '',
+            activity_type TEXT NOT NULL DEFAULT '',
+            description TEXT NOT NULL DEFAULT '',
+            hours REAL NOT NULL,
+            start_time TEXT NOT NULL DEFAULT '',
+            end_time TEXT NOT NULL DEFAULT '',
+            mode TEXT NOT NULL DEFAULT 'range',
+            created_at TEXT NOT NULL DEFAULT (datetime('now'))
+        );
+        INSERT INTO entries (date, psp, activity_type, hours, start_time, end_time, mode)
+        VALUES ('2024-06-10', 'A', 'Dev', 1.5, '08:00', '09:30', 'range'),
+               ('2024-06-10', 'B', 'Dev', 0.1, '', '', 'duration'),
+               ('2024-06-11', 'B', 'Dev', 0.2, '', '', 'duration'),
+               ('2024-06-12', 'C', 'Dev', 9.0, '', '', 'duration');
+        DELETE FROM entries WHERE psp = 'C';
+    """)
+    old.commit()
+    old.close()
+
+    db = Database(path)
+    assert db.conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+    ranged = db.get_entries_for_date(date(2024, 6, 10))[0]
+    assert (ranged.hours, ranged.start_time, ranged.end_time) == (1.5, "08:00", "09:30")
+    assert db.get_week_total(date(2024, 6, 10)) == 1.8
+    assert db.get_statistics(date(2024, 6, 1), date(2024, 6, 30)).total_hours == 1.8
+    # Ids of deleted v1 entries are not reused
+    assert db.add_entry(make_entry(date(2024, 6, 12))) == 5
+    # A database that already holds entries needs no legacy JSON import
+    assert db.get_meta(LEGACY_JSON_CHECKED) == "1"
+    db.close()
+
+
+def test_db_sums_are_exact(tmp_path, make_entry):
+    db = _make_db(tmp_path)
+    day = date(2024, 6, 10)
+    db.add_entries([make_entry(day, hours=0.1), make_entry(day, hours=0.2)])
+    assert db.get_day_total(day) == 0.3
+    assert db.get_week_summary(day)[0].total_hours == 0.3
+    assert db.get_statistics(day, day).total_hours == 0.3
+    db.close()
+
+
+def test_time_of_day_conversions():
+    assert parse_time_of_day("08:05") == 485
+    assert parse_time_of_day("8:05") == 485
+    assert parse_time_of_day("") is None
+    assert parse_time_of_day("24:00") is None
+    assert parse_time_of_day("12:60") is None
+    assert format_time_of_day(485) == "08:05"
+    assert format_time_of_day(None) == ""
+    assert hours_to_seconds(7.99) == 28764
+
+
+def test_db_migrates_v2_text_columns_to_lookup_tables(tmp_path):
+    path = tmp_path / "test.db"
+    old = sqlite3.connect(str(path))
+    old.executescript("""
+        CREATE TABLE entries (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            day INTEGER NOT NULL,
+            psp TEXT NOT NULL DEFAULT '',
+            activity_type TEXT NOT NULL DEFAULT '',
+            description TEXT NOT NULL DEFAULT '',
+            seconds INTEGER NOT NULL,
+            start_minute INTEGER,
+            end_minute INTEGER,
+            mode TEXT NOT NULL DEFAULT 'range',
+            created_at TEXT NOT NULL DEFAULT (datetime('now'))
+        );
+        PRAGMA user_version = 2;
+    """)
+    monday = date(2024, 6, 10).toordinal()
+    old.executemany(
+        "INSERT INTO entries (day, psp, activity_type, description, seconds, mode) VALUES (?, ?, ?, ?, ?, 'duration')",
+        [(monday, "A", "Dev", "x", 3600), (monday + 1, "A", "Test", "", 1800), (monday, "B", "Dev", "x", 7200)],
+    )
+    old.commit()
+    old.close()
+
+    db = Database(path)
+    assert db.conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+    assert db.conn.execute("SELECT COUNT(*) FROM psp").fetchone()[0] == 2
+    assert db.conn.execute("SELECT COUNT(*) FROM description_text").fetchone()[0] == 2
+    assert [e.psp for e in db.get_entries_for_date(date(2024, 6, 10))] == ["A", "B"]
+    assert db.get_recent_values("activity_type") == ["Dev", "Test"]
+    assert db.get_recent_values("description") == ["x"]
+    assert db.get_statistics(date(2024, 6, 1), date(2024, 6, 30)).total_hours == 3.5
+    db.close()
+
+
+def test_db_recent_values_ranked_by_frecency(tmp_path, make_entry):
+    db = _make_db(tmp_path)
+    day = 86400
+    now = 1_700_000_000
+    db.clock = lambda: now
+    monday = date(2024, 6, 10)
+    a = db.add_entry(make_entry(monday, psp="A"))
+    db.add_entries([make_entry(monday, psp="B"), make_entry(monday, psp="B")])
+    assert db.get_recent_values("psp") == ["B", "A"]
+
+    # Two uses a month ago lose to one use today
+    now += 30 * day
+    c = db.add_entry(make_entry(monday, psp="C"))
+    assert db.get_recent_values("psp") == ["C", "B", "A"]
+    assert db.get_recent_values("psp", limit=1) == ["C"]
+
+    # Editing an entry is a use of its new values; the old value keeps its history
+    moved = db.get_entries_for_date(monday)[0]
+    assert moved.id == a
+    moved.psp = "B"
+    db.update_entry(moved)
+    assert db.get_recent_values("psp") == ["B", "C"]
+    assert db.conn.execute(
+        "SELECT use_count, last_used FROM psp WHERE value = 'B'"
+    ).fetchone() == (3, now)
+
+    # A value without entries is no longer suggested; it starts over when reused
+    db.delete_entry(c)
+    assert db.get_recent_values("psp") == ["B"]
+    now += 365 * day
+    db.add_entry(make_entry(monday, psp="C"))
+    assert db.get_recent_values("psp") == ["C", "B"]
+
+    plan = " ".join(
+        row[3] for row in db.conn.execute(
+            "EXPLAIN QUERY PLAN SELECT value FROM psp WHERE frecency IS NOT NULL ORDER BY frecency DESC LIMIT 5"
+        )
+    )
+    assert "idx_psp_frecency" in plan and "TEMP B-TREE" not in plan
+    db.close()
+
+
+def test_db_iter_matching_values_prefix_then_substring(tmp_path, make_entry):
+    db = _make_db(tmp_path)
+    db.add_preset(Preset(id=None, name="Vorlage", psp="AB-9", activity_type="", notes="", billable=True))
+    monday = date(2024, 6, 10)
+    db.add_entries([make_entry(monday, psp=p) for p in ("ab-1", "xab", "AB-2", "AB-2", "a%b")])
+    gone = db.add_entry(make_entry(monday, psp="abandoned"))
+    db.delete_entry(gone)
+
+    pages = list(db.iter_matching_values("psp", "ab", page_size=2))
+    assert pages == [["AB-2", "ab-1"], ["AB-9"], ["xab"]]
+    assert list(db.iter_matching_values("psp", "%")) == [["a%b"]]
+    assert list(db.iter_matching_values("psp", "zz")) == []
+    assert list(db.iter_matching_values("hours", "1")) == []
+
+    plan = " ".join(
+        row[3] for row in db.conn.execute(
+            "EXPLAIN QUERY PLAN SELECT value FROM psp WHERE value LIKE ? ESCAPE '\\'", ("ab%",)
+        )
+    )
+    assert "idx_psp_value_nocase" in plan
+    db.close()
+
+
+def test_db_iter_matching_values_reads_one_page_at_a_time(tmp_path, make_entry):
+    db = _make_db(tmp_path)
+    # Added together, so all share one frecency and pages continue by value
+    db.add_entries([make_entry(date(2024, 6, 10), psp=f"P-{i:02d}") for i in range(25)])
+    statements = []
+    db._read_conn().set_trace_callback(statements.append)
+
+    pages = db.iter_matching_values("psp", "p", page_size=10)
+    assert next(pages) == [f"P-{i:02d}" for i in range(10)]
+    assert len(statements) == 1
+    assert [value for page in pages for value in page] == [f"P-{i:02d}" for i in range(10, 25)]
+    db.close()
+
+
+def test_db_search_entries_full_text_with_keyset_pages(tmp_path, make_entry):
+    db = _make_db(tmp_path)
+    monday = date(2024, 6, 10)
+    db.add_entries(
+        [make_entry(monday + timedelta(days=i), description=f"Kunde X Workshop {i}") for i in range(5)]
+        + [make_entry(monday, psp="P-4711", description="Übergabe")]
+    )
+
+    first = db.search_entries("kunde works", limit=2)
+    assert [e.description for e in first] == ["Kunde X Workshop 4", "Kunde X Workshop 3"]
+    rest = db.search_entries("kunde works", limit=10, after=first[-1])
+    assert [e.date for e in rest] == [monday + timedelta(days=i) for i in (2, 1, 0)]
+    assert [e.psp for e in db.search_entries("4711")] == ["P-4711"]
+    assert [e.psp for e in db.search_entries("ubergabe")] == ["P-4711"]
+    assert db.search_entries('"') == [] and db.search_entries("  ") == []
+    backdated = db.add_entry(make_entry(monday - timedelta(days=30), description="Kunde X Nachtrag"))
+    assert db.search_entries("kunde", limit=1)[0].id == backdated
+
+    # The index follows edits and deletes
+    hit = db.search_entries("ubergabe")[0]
+    hit.description = "Abnahme"
+    db.update_entry(hit)
+    assert db.search_entries("ubergabe") == []
+    assert [e.id for e in db.search_entries("abnahme")] == [hit.id]
+    db.delete_entry(hit.id)
+    assert db.search_entries("abnahme") == []
+    db.close()
+
+    # A database without the index gets it rebuilt from its entries
+    conn = sqlite3.connect(str(tmp_path / "test.db"))
+    conn.execute("DROP TABLE entries_fts")
+    conn.close()
+    db = _make_db(tmp_path)
+    assert len(db.search_entries("workshop")) == 5
+    db.close()
+
+
+def test_db_iter_entries_streams_keyset_batches(tmp_path, make_entry):
+    db = _make_db(tmp_path)
+    start = date(2023, 1, 2)
+    # All rows share one created_at second, so the id has to break ties
+    db.add_entries(
+        make_entry(start + timedelta(days=i % 40), psp="A" if i % 3 else "B") for i in range(250)
+    )
+
+    batches = list(db.iter_entries(start, start + timedelta(days=39), batch_size=64))
+    assert [len(b) for b in batches] == [64, 64, 64, 58]
+    streamed = [e for batch in batches for e in batch]
+    keys = [(e.date, e.created_at, e.id) for e in streamed]
+    assert keys == sorted(keys) and len(set(keys)) == 250
+
+    only_b = [e for batch in db.iter_entries(start, start + timedelta(days=9), {"psp": "B"}, 5) for e in batch]
+    assert only_b and all(e.psp == "B" and e.date <= start + timedelta(days=9) for e in only_b)
+    assert len(only_b) == sum(1 for e in streamed if e.psp == "B" and e.date <= start + timedelta(days=9))
+    assert list(db.iter_entries(start, start, {"mode": TimeMode.RANGE})) == []
+    assert list(db.iter_entries(start, start, {"psp": "missing"})) == []
+    with pytest.raises(ValueError):
+        next(db.iter_entries(start, start, {"hours": 1.0}))
+    db.close()
@@ -0,0 +1,222 @@
+"""Tests for the main window's optimistic writes and refreshes."""
+
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+
+import pytest
+
+from timetrac import main_window
+from timetrac.database import Database
+from timetrac.main_window import MainWindow
+from timetrac.snapshot import build_snapshot
+
+pytestmark = pytest.mark.usefixtures("qapp")
+
+MONDAY = date(2024, 6, 10)
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(tmp_path / "test.db")
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def window(db, wait_for):
+    window = MainWindow(db)
+    window.date_nav.selected_date = MONDAY
+    wait_for(window.is_settled)
+    yield window
+    window.close()
+
+
+def _record(window: MainWindow, monkeypatch, *methods: str) -> list[str]:
+    """Names of the given ``window`` methods, appended each time one is called."""
+    calls = []
+
+    def spy(name, original):
+        def call(*args):
+            calls.append(name)
+            return original(*args)
+        return call
+
+    for name in methods:
+        monkeypatch.setattr(window, name, spy(name, getattr(window, name)))
+    return calls
+
+
+def _hold_writes(db: Database, monkeypatch, *methods: str, error: Exception | None = None) -> threading.Event:
+    """Make the worker wait in ``methods`` until the returned event is set, then raise ``error`` if given."""
+    released = threading.Event()
+
+    def held(original):
+        def call(*args):
+            assert released.wait(5)
+            if error is not None:
+                raise error
+            return original(*args)
+        return call
+
+    for method in methods:
+        monkeypatch.setattr(db, method, held(getattr(db, method)))
+    return released
+
+
+def _day_rows(window: MainWindow) -> list[tuple[int, str, str]]:
+    """(entry id, PSP, hours) of every entry row in the day table."""
+    model = window.day_model
+    rows = [model.row_at(model.index(i, 0)) for i in range(model.rowCount())]
+    return [(row.entry_id, row.cells[0], row.cells[4]) for row in rows if not row.summary]
+
+
+def _enter(window: MainWindow, psp: str, hours: float):
+    window.psp_combo.text = psp
+    window.type_combo.text = "Dev"
+    window.hours_spin.setValue(hours)
+    window._save_entry()
+
+
+def _edit(window: MainWindow, entry_id: int):
+    model = window.day_model
+    row = next(i for i in range(model.rowCount()) if model.entry_id(model.index(i, 0)) == entry_id)
+    window._on_entry_double_clicked(model.index(row, 0))
+
+
+def test_add_shows_before_commit_and_is_reconciled_after(db, window, monkeypatch, wait_for):
+    released = _hold_writes(db, monkeypatch, "add_entry")
+    _enter(window, "P-1", 2.5)
+    wait_for(lambda: _day_rows(window))
+    [(provisional_id, psp, hours)] = _day_rows(window)
+    assert provisional_id < 0 and (psp, hours) == ("P-1", "2.50")
+    assert db.get_entries_for_date(MONDAY) == []
+    assert window.day_total_label.text() == "Summe Tag: 2.50 h"
+
+    released.set()
+    wait_for(window.is_settled)
+    [committed] = db.get_entries_for_date(MONDAY)
+    assert _day_rows(window) == [(committed.id, "P-1", "2.50")]
+
+
+def test_update_shows_before_commit(db, window, make_entry, monkeypatch, wait_for):
+    entry_id = db.add_entry(make_entry(MONDAY, psp="P-1", hours=1.0))
+    window._cache.clear()
+    window._refresh_data()
+    released = _hold_writes(db, monkeypatch, "update_entry")
+
+    _edit(window, entry_id)
+    window.hours_spin.setValue(3.0)
+    window._save_entry()
+    wait_for(lambda: _day_rows(window) == [(entry_id, "P-1", "3.00")])
+    assert db.get_entries_for_date(MONDAY)[0].hours == 1.0
+
+    released.set()
+    wait_for(window.is_settled)
+    assert db.get_entries_for_date(MONDAY)[0].hours == 3.0
+    assert _day_rows(window) == [(entry_id, "P-1", "3.00")]
+
+
+def test_week_reloaded_between_commit_and_resolve_shows_add_once(db, window, monkeypatch, wait_for):
+    released = _hold_writes(db, monkeypatch, "add_entry")
+    _enter(window, "P-1", 1.0)
+    released.set()
+    # Wait for the commit on the worker without letting its callback run
+    deadline = time.monotonic() + 5
+    while any(w.row_id is None for w in window._cache._pending.values()):
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+    window._cache.clear()
+    window._refresh_data()
+    [committed] = db.get_entries_for_date(MONDAY)
+    assert _day_rows(window) == [(committed.id, "P-1", "1.00")]
+
+    wait_for(window.is_settled)
+    assert _day_rows(window) == [(committed.id, "P-1", "1.00")]
+
+
+def test_failed_write_rolls_the_view_back(db, window, make_entry, monkeypatch, wait_for):
+    kept_id = db.add_entry(make_entry(MONDAY, psp="P-0", hours=1.0))
+    window._cache.clear()
+    window._refresh_data()
+    warnings = []
+    monkeypatch.setattr(main_window.QMessageBox, "warning", lambda *args: warnings.append(args[2]))
+    released = _hold_writes(db, monkeypatch, "add_entry", error=sqlite3.OperationalError("disk I/O error"))
+
+    _enter(window, "P-1", 2.0)
+    wait_for(lambda: len(_day_rows(window)) == 2)
+    released.set()
+    wait_for(window.is_settled)
+    assert _day_rows(window) == [(kept_id, "P-0", "1.00")]
+    assert window.day_total_label.text() == "Summe Tag: 1.00 h"
+    assert len(warnings) == 1 and "disk I/O error" in warnings[0]
+
+
+def test_delete_then_re_add_in_the_same_week(db, window, make_entry, monkeypatch, wait_for):
+    entry_id = db.add_entry(make_entry(MONDAY, psp="P-1", hours=1.0))
+    window._cache.clear()
+    window._refresh_data()
+    monkeypatch.setattr(main_window.QMessageBox, "question", lambda *args: main_window.QMessageBox.Yes)
+    released = _hold_writes(db, monkeypatch, "delete_entry", "add_entry")
+
+    _edit(window, entry_id)
+    window._delete_entry()
+    wait_for(lambda: _day_rows(window) == [])
+    _enter(window, "P-1", 1.0)
+    wait_for(lambda: len(_day_rows(window)) == 1)
+    assert _day_rows(window)[0][0] < 0
+
+    # Leaving the week and coming back reloads it with both writes still pending
+    window.date_nav.selected_date = date(2024, 6, 17)
+    window._refresh_data()
+    window._cache.clear()
+    window.date_nav.selected_date = MONDAY
+    window._refresh_data()
+    assert [(psp, hours) for _id, psp, hours in _day_rows(window)] == [("P-1", "1.00")]
+
+    released.set()
+    wait_for(window.is_settled)
+    [committed] = db.get_entries_for_date(MONDAY)
+    assert committed.id != entry_id
+    assert _day_rows(window) == [(committed.id, "P-1", "1.00")]
+
+
+def test_refresh_requests_in_one_tick_build_one_snapshot(db, window, make_entry, monkeypatch, wait_for):
+    db.add_entry(make_entry(MONDAY, psp="P-1", hours=2.0))
+    window._cache.invalidate(MONDAY)
+    snapshots = []
+    monkeypatch.setattr(
+        main_window, "build_snapshot", lambda *args: snapshots.append(args) or build_snapshot(*args),
+    )
+    signals = []
+    for model in (window.day_model, window.week_model):
+        model.modelReset.connect(lambda: signals.append("reset"))
+        model.rowsInserted.connect(lambda *args: signals.append("inserted"))
+        model.dataChanged.connect(lambda *args: signals.append("changed"))
+    refreshes = []
+    window.refreshed.connect(refreshes.append)
+
+    for _ in range(3):
+        window._request_refresh()
+    window.date_nav.selected_date = MONDAY
+    wait_for(lambda: refreshes)
+    wait_for(window.is_settled)
+    assert len(snapshots) == len(refreshes) == 1
+    assert "reset" not in signals and "inserted" in signals
+    assert _day_rows(window)[0][1:] == ("P-1", "2.00")
+
+
+def test_refresh_redraws_only_the_views_that_changed(window, monkeypatch, wait_for):
+    calls = _record(window, monkeypatch, "_refresh_day_view", "_refresh_week_view", "_refresh_combos")
+    refreshes = []
+    window.refreshed.connect(refreshes.append)
+
+    window._request_refresh()
+    wait_for(lambda: len(refreshes) == 1)
+    assert calls == []
+
+    # Another day of the same week: the week table stays as it is
+    window.date_nav.selected_date = MONDAY + timedelta(days=1)
+    wait_for(lambda: len(refreshes) == 2)
+    assert "_refresh_week_view" not in calls and "_refresh_day_view" in calls
@@ -0,0 +1,47 @@
+"""Tests for the per-action profiling mode."""
+
+import pytest
+from PySide6.QtWidgets import QPushButton, QWidget
+
+from timetrac.profiling import ActionProfiler
+
+pytestmark = pytest.mark.usefixtures("qapp")
+
+
+class _Form(QWidget):
+    def __init__(self):
+        super().__init__()
+        self.saved = 0
+        self.button = QPushButton(self)
+        self.button.clicked.connect(self._save)
+
+    def _save(self):
+        self.saved += 1
+        self._refresh()
+        return sum(range(1000))
+
+    def _refresh(self):
+        return sorted(range(100), reverse=True)
+
+
+def test_actions_are_profiled_per_call_and_summarized(tmp_path):
+    profiler = ActionProfiler(tmp_path / "profiles", top_n=5, max_files=3)
+    original = _Form._save
+    profiler.install(_Form, {"_save": "save", "_refresh": "refresh"})
+    form = _Form()
+    for _ in range(4):
+        form.button.click()  # clicked(bool) is not passed on to _save()
+    form._refresh()
+
+    assert form.saved == 4
+    files = sorted(p.name for p in (tmp_path / "profiles").glob("*.pstats"))
+    # Five profiles, the oldest two pruned; _refresh inside _save is part of "save"
+    assert len(files) == 3 and [name.split("-", 3)[3] for name in files] == ["save.pstats"] * 2 + ["refresh.pstats"]
+
+    summary = profiler.write_summary().read_text(encoding="utf-8")
+    rows = {line.split()[0]: line.split()[1] for line in summary.splitlines()[3:5]}
+    assert rows == {"save": "4", "refresh": "1"}
+    assert "=== save: top 5 by cumulative time ===" in summary and "(_save)" in summary
+
+    profiler.uninstall()
+    assert _Form._save is original
@@ -0,0 +1,125 @@
+"""Query-plan regression tests for every statement ``Database`` issues.
+
+Each public ``Database`` method is exercised with tracing on; every
+statement it ran is then explained and must neither scan a table in full
+nor sort through a temporary B-tree, apart from the steps listed in
+``ALLOWED`` with the reason they are acceptable.
+"""
+
+import inspect
+import json
+import re
+from datetime import date, timedelta
+from pathlib import Path
+
+from timetrac.database import _UNINSTRUMENTED as NOT_QUERIES, Database
+from timetrac.models import Preset, TimeMode
+
+# (text in the statement, text in the plan step, why the step is fine)
+ALLOWED = [
+    ("ORDER BY frecency DESC, value", "USE TEMP B-TREE FOR",
+     "completions rank only the values that matched"),
+    ("NOT LIKE", "SCAN ",
+     "substring completions cannot use an index; the lookup tables hold distinct values only"),
+    ("FROM presets", "SCAN presets", "presets are a handful of rows"),
+    ("FROM presets", "USE TEMP B-TREE FOR DISTINCT", "presets are a handful of rows"),
+    ("SUM(t.seconds)", "USE TEMP B-TREE FOR",
+     "statistics group the rollup rows and per-day-range sums, not raw history"),
+]
+
+
+def _exercise(db: Database, tmp_path: Path, make_entry) -> set[str]:
+    """Call every query method once; returns the names called."""
+    called = set()
+
+    def call(name, *args, **kwargs):
+        called.add(name)
+        result = getattr(db, name)(*args, **kwargs)
+        return list(result) if inspect.isgenerator(result) else result
+
+    day = date(2024, 6, 12)
+    preset_id = call("add_preset", Preset(id=None, name="P", psp="A", activity_type="Dev", notes="", billable=True))
+    call("get_presets")
+    call("update_preset", Preset(id=preset_id, name="P", psp="A", activity_type="Dev", notes="", billable=False))
+    entry_id = call("add_entry", make_entry(day, description="Workshop Kunde"))
+    call("add_entries", [make_entry(day, psp=psp, description="Workshop Kunde") for psp in "BC"])
+    entry = next(e for e in call("get_entries_for_date", day) if e.id == entry_id)
+    entry.psp = "D"
+    call("update_entry", entry)
+    call("update_entries", [entry])
+    call("get_entries_for_week", day)
+    call("iter_entries", day - timedelta(days=60), day, None, 50)
+    call("iter_entries", day - timedelta(days=60), day, {"psp": "A", "mode": TimeMode.DURATION}, 5)
+    hits = call("search_entries", "work kun", 5)
+    call("search_entries", "work", 5, hits[-1])
+    call("get_recent_values", "psp")
+    call("iter_matching_values", "psp", "a")
+    call("get_day_total", day)
+    call("get_week_total", day)
+    call("get_week_summary", day)
+    call("get_statistics", date(2023, 11, 20), date(2024, 5, 10))
+    call("get_hours_by_psp", date(2024, 1, 1), date(2024, 1, 20))
+    call("get_hours_by_psp_merged", date(2024, 1, 1), date(2024, 3, 31))
+    call("get_daily_hours", day - timedelta(days=30), day)
+    call("delete_entry", entry_id)
+    call("delete_entries", [1, 2, 3])
+    call("delete_preset", preset_id)
+    call("set_meta", "key", "value")
+    call("get_meta", "key")
+    legacy = tmp_path / "legacy.json"
+    legacy.write_text(json.dumps({
+        "entries": {"2021-03-01": [{"psp": "L", "type": "Dev", "desc": "Alt", "hours": 1.0, "mode": "duration"}]},
+        "presets": [{"name": "Legacy", "psp": "L", "type": "Dev"}],
+    }))
+    call("import_from_json", legacy)
+    return called
+
+
+def _problems(db: Database, statements: list[str]) -> list[str]:
+    problems = []
+    for sql in dict.fromkeys(statements):
+        # Skip transaction control, trigger bodies and FTS5's own bookkeeping
+        if sql.startswith("--") or "'main'." in sql or re.match(r"\s*(BEGIN|COMMIT|ROLLBACK|PRAGMA)\b", sql):
+            continue
+        steps = [row[3] for row in db.conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+        materialized = {m.group(2) for step in steps if (m := re.match(r"(MATERIALIZE|CO-ROUTINE) (\S+)", step))}
+        for step in steps:
+            scan = re.match(r"SCAN (\S+)", step)
+            bad = "TEMP B-TREE" in step or (
+                scan is not None and "VIRTUAL TABLE" not in step and scan.group(1) not in materialized
+            )
+            if bad and not any(s in sql and p in step for s, p, _reason in ALLOWED):
+                problems.append(f"{step}\n    in: {' '.join(sql.split())[:200]}")
+    return problems
+
+
+def test_no_query_scans_or_sorts_unexpectedly(tmp_path, make_entry):
+    db = Database(tmp_path / "test.db")
+    start = date(2023, 1, 2)
+    db.add_entries(
+        make_entry(start + timedelta(days=i % 600), psp=f"P{i % 40}", description=f"Workshop {i % 300}")
+        for i in range(3000)
+    )
+    statements: list[str] = []
+    db.conn.set_trace_callback(statements.append)
+    db._read_conn().set_trace_callback(statements.append)
+
+    called = _exercise(db, tmp_path, make_entry)
+
+    public = {name for name, _ in inspect.getmembers(Database, inspect.isfunction) if not name.startswith("_")}
+    assert public - NOT_QUERIES == called, "add new Database queries to _exercise"
+    problems = _problems(db, statements)
+    assert not problems, "unexpected query plans:\n" + "\n".join(problems)
+    db.close()
+
+
+def test_plan_check_flags_full_scans_and_sorts(tmp_path):
+    db = Database(tmp_path / "test.db")
+    problems = _problems(db, [
+        "SELECT * FROM entries WHERE seconds > 60",
+        "SELECT id FROM entries WHERE day = 5 ORDER BY seconds",
+        "SELECT id FROM entries WHERE day = 5 ORDER BY created_at",
+    ])
+    assert len(problems) == 2
+    assert problems[0].startswith("SCAN entries") and "TEMP B-TREE" in problems[1]
+    db.close()
@@ -0,0 +1,42 @@
+"""Tests for the full-text search panel."""
+
+from datetime import date, timedelta
+
+import pytest
+
+from timetrac.database import Database
+from timetrac.search_panel import SearchPanel
+
+pytestmark = pytest.mark.usefixtures("qapp")
+
+
+def test_search_panel_pages_and_activates_hits(tmp_path, make_entry, wait_for):
+    db = Database(tmp_path / "test.db")
+    start = date(2022, 1, 3)
+    db.add_entries([make_entry(start + timedelta(days=i), description="Workshop") for i in range(120)])
+    panel = SearchPanel(db)
+    activated = []
+    panel.entry_activated.connect(activated.append)
+
+    panel.search("work")
+    assert panel.is_searching() and panel.hits == []
+    wait_for(lambda: not panel.is_searching())
+    assert len(panel.hits) == SearchPanel.PAGE_SIZE
+    assert panel.hits[0].date == start + timedelta(days=119)
+    for _ in range(3):
+        panel.load_more()
+        wait_for(lambda: not panel.is_searching())
+    assert len(panel.hits) == 120 and panel.status_label.text() == "120 Treffer"
+    assert len({e.id for e in panel.hits}) == 120
+
+    item = panel.result_tree.topLevelItem(119)
+    panel.result_tree.itemDoubleClicked.emit(item, 0)
+    assert activated[0].date == start
+
+    # Only the search started last reaches the list
+    panel.search("work")
+    panel.search("nichts")
+    wait_for(lambda: not panel.is_searching())
+    assert panel.hits == [] and panel.status_label.text() == "Keine Treffer"
+    panel.shutdown()
+    db.close()
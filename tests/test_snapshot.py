@@ -0,0 +1,54 @@
+"""Tests for the main-window view snapshot."""
+
+from datetime import date
+
+from timetrac.cache import PendingWrite, WeekCache
+from timetrac.database import Database
+from timetrac.snapshot import build_snapshot
+
+
+def test_build_snapshot_groups_day_and_pivots_week(tmp_path, make_entry):
+    db = Database(tmp_path / "test.db")
+    monday = date(2024, 6, 10)
+    tuesday = date(2024, 6, 11)
+    db.add_entries([
+        make_entry(monday, psp="A", description="x", hours=1.0),
+        make_entry(tuesday, psp="A", description="x", hours=2.0),
+        make_entry(tuesday, psp="A", description="x", hours=0.5),
+        make_entry(tuesday, psp="B", description="y", hours=3.0),
+    ])
+
+    snapshot = build_snapshot(WeekCache(db), tuesday)
+    assert snapshot.week_start == monday
+    assert [(g.key, len(g.entries), g.hours) for g in snapshot.day_groups] == [
+        (("A", "Dev", "x"), 2, 2.5),
+        (("B", "Dev", "y"), 1, 3.0),
+    ]
+    assert [(r.key, r.daily_hours[:2], r.total) for r in snapshot.week_rows] == [
+        (("A", "Dev", "x"), (1.0, 2.5), 3.5),
+        (("B", "Dev", "y"), (0.0, 3.0), 3.0),
+    ]
+    assert snapshot.day_total == 5.5
+    assert snapshot.week_total == 6.5
+    assert set(snapshot.recent("psp")) == {"A", "B"}
+    assert snapshot.find_entry(snapshot.day_entries[0].id) == snapshot.day_entries[0]
+    db.close()
+
+
+def test_snapshot_equality_detects_unchanged_views(tmp_path, make_entry):
+    db = Database(tmp_path / "test.db")
+    monday = date(2024, 6, 10)
+    db.add_entry(make_entry(monday, psp="A", description="x", hours=1.0))
+    cache = WeekCache(db)
+
+    first = build_snapshot(cache, monday)
+    second = build_snapshot(cache, date(2024, 6, 11))
+    assert first.week_rows == second.week_rows
+    assert first.day_groups != second.day_groups
+
+    # A write still in flight shows up in the week and the recents
+    cache.add_pending(PendingWrite("add", make_entry(monday, psp="C", description="z", hours=1.0)))
+    third = build_snapshot(cache, monday)
+    assert third.recent("psp")[0] == "C"
+    assert third.week_rows != first.week_rows
+    db.close()
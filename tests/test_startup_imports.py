@@ -0,0 +1,98 @@
+"""Tests for what TimeTrac loads before its first window appears."""
+
+import json
+import os
+import subprocess
+import sys
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from timetrac import app as app_module
+from timetrac.database import LEGACY_JSON_CHECKED, Database
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+
+# Modules ``import timetrac.app`` may add on top of PySide6's QtWidgets.
+# Raise it deliberately when a new startup import is worth its cost.
+STARTUP_MODULE_BUDGET = 45
+
+# Loaded on first use only
+DEFERRED = {
+    "pynput",
+    "timetrac.preset_dialog",
+    "timetrac.profiling",
+    "timetrac.sap_export_dialog",
+    "timetrac.statistics_dialog",
+    "cProfile",
+    "pstats",
+    "logging.handlers",
+}
+
+
+def _imported(code: str) -> dict[str, int]:
+    """Modules ``code`` imports in a fresh interpreter, with cumulative import time in us."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, cwd=ROOT_DIR, env={**os.environ, "QT_QPA_PLATFORM": "offscreen"},
+    )
+    assert result.returncode == 0, result.stderr
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or line.endswith("| imported package"):
+            continue
+        _self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        modules[name.strip()] = int(cumulative_us)
+    return modules
+
+
+@pytest.fixture(scope="module")
+def startup_imports() -> tuple[dict[str, int], dict[str, int]]:
+    return _imported("import timetrac.app"), _imported("import PySide6.QtWidgets")
+
+
+def test_startup_defers_dialogs_and_pynput(startup_imports):
+    imported, _baseline = startup_imports
+    loaded = [name for name in imported if any(name == m or name.startswith(m + ".") for m in DEFERRED)]
+    assert not loaded
+
+
+def test_startup_imports_stay_within_budget(startup_imports):
+    imported, baseline = startup_imports
+    added = sorted(set(imported) - set(baseline))
+    assert len(added) <= STARTUP_MODULE_BUDGET, (
+        f"import timetrac.app loads {len(added)} modules beyond PySide6 "
+        f"({imported['timetrac.app'] / 1000:.0f} ms): {', '.join(added)}"
+    )
+
+
+def test_legacy_json_is_imported_once(tmp_path, monkeypatch, qapp):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "time_entries.json").write_text(json.dumps({
+        "entries": {"2024-06-10": [{"psp": "A", "type": "Dev", "desc": "", "hours": 1.0, "mode": "duration"}]},
+    }))
+    db = Database(tmp_path / "test.db")
+    assert db.get_meta(LEGACY_JSON_CHECKED) is None
+
+    app_module._try_migrate_json(db)
+    assert db.get_meta(LEGACY_JSON_CHECKED) == "1"
+    assert db.get_day_total(date(2024, 6, 10)) == 1.0
+
+    # Later starts skip the lookup, even once the entries have been deleted
+    db.delete_entries([e.id for e in db.get_entries_for_date(date(2024, 6, 10))])
+    app_module._try_migrate_json(db)
+    assert db.get_day_total(date(2024, 6, 10)) == 0
+    db.close()
+
+
+def test_malformed_thresholds_fall_back_to_defaults(monkeypatch, caplog):
+    monkeypatch.delenv("TIMETRAC_SLOW_QUERY_MS", raising=False)
+    assert app_module._env_ms("TIMETRAC_SLOW_QUERY_MS", 100.0) is None
+    assert app_module._env_ms("TIMETRAC_SLOW_QUERY_MS", 100.0, enabled=True) == 100.0
+    monkeypatch.setenv("TIMETRAC_SLOW_QUERY_MS", "25")
+    assert app_module._env_ms("TIMETRAC_SLOW_QUERY_MS", 100.0) == 25.0
+
+    monkeypatch.setenv("TIMETRAC_SLOW_QUERY_MS", "50ms")
+    assert app_module._env_ms("TIMETRAC_SLOW_QUERY_MS", 100.0) == 100.0
+    assert "TIMETRAC_SLOW_QUERY_MS='50ms'" in caplog.text
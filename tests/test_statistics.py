@@ -0,0 +1,59 @@
+"""Tests for the off-thread statistics computation."""
+
+from datetime import date, timedelta
+
+import pytest
+
+from timetrac.database import Database
+from timetrac.models import Preset, count_working_days
+from timetrac.statistics_dialog import StatisticsDialog
+from timetrac.statistics_worker import StatisticsCancelled, compute_statistics
+
+
+def test_count_working_days_matches_day_by_day_count():
+    start = date(2024, 6, 1)
+    for length in range(0, 30):
+        end = start + timedelta(days=length)
+        expected = sum(1 for i in range(length + 1) if (start + timedelta(days=i)).weekday() < 5)
+        assert count_working_days(start, end) == expected
+    assert count_working_days(date(2024, 6, 10), date(2024, 6, 9)) == 0
+
+
+def test_compute_statistics_totals_and_cancellation(tmp_path, make_entry):
+    db = Database(tmp_path / "test.db")
+    db.add_preset(Preset(id=None, name="Intern", psp="B", activity_type="", notes="", billable=False))
+    monday = date(2024, 6, 10)
+    db.add_entries([make_entry(monday, psp="A", hours=3.0), make_entry(monday, psp="B", hours=1.0)])
+
+    stats = compute_statistics(db, monday, monday + timedelta(days=6)).stats
+    assert (stats.total_hours, stats.billable_hours, stats.non_billable_hours) == (4.0, 3.0, 1.0)
+    assert stats.working_days == 5
+    assert stats.average == 0.8
+
+    with pytest.raises(StatisticsCancelled):
+        compute_statistics(db, monday, monday, cancelled=lambda: True)
+    db.close()
+
+
+def test_dialog_shows_only_latest_request(tmp_path, make_entry, wait_for):
+    db = Database(tmp_path / "test.db")
+    monday = date(2024, 6, 10)
+    db.add_entries([make_entry(monday, hours=2.0), make_entry(monday + timedelta(days=14), hours=5.0)])
+    dialog = StatisticsDialog(db, monday)
+    timings = []
+    dialog.stats_refreshed.connect(timings.append)
+    wait_for(lambda: not dialog.is_refreshing())
+    assert dialog.last_result.stats.total_hours == 2.0
+    timings.clear()
+
+    # Month, week, month in quick succession: only the last request is shown
+    dialog.period_combo.setCurrentIndex(1)
+    assert dialog.is_refreshing()
+    dialog.period_combo.setCurrentIndex(0)
+    dialog.period_combo.setCurrentIndex(1)
+    wait_for(lambda: not dialog.is_refreshing())
+    assert dialog.last_result.stats.total_hours == 7.0
+    assert len(timings) == 1 and timings[0] >= 0.0
+
+    dialog.reject()
+    db.close()
@@ -0,0 +1,88 @@
+"""Tests for the diffed day/week table models."""
+
+from datetime import date
+
+import pytest
+from PySide6.QtCore import Qt
+
+from timetrac.cache import WeekCache
+from timetrac.database import Database
+from timetrac.snapshot import build_snapshot
+from timetrac.table_models import DayTableModel, WeekTableModel
+
+pytestmark = pytest.mark.usefixtures("qapp")
+
+
+class SignalLog:
+    def __init__(self, model):
+        self.events = []
+        model.rowsInserted.connect(lambda _p, first, last: self.events.append(("insert", first, last)))
+        model.rowsRemoved.connect(lambda _p, first, last: self.events.append(("remove", first, last)))
+        model.dataChanged.connect(lambda tl, br, _r=None: self.events.append(("change", tl.row(), br.row())))
+        model.modelReset.connect(lambda: self.events.append(("reset",)))
+
+
+def test_day_model_emits_row_level_signals(tmp_path, make_entry):
+    db = Database(tmp_path / "test.db")
+    monday = date(2024, 6, 10)
+    cache = WeekCache(db)
+    db.add_entries([make_entry(monday, psp="A", description="x", hours=1.0), make_entry(monday, psp="B", description="y", hours=2.0)])
+
+    model = DayTableModel()
+    model.set_groups(build_snapshot(cache, monday).day_groups)
+    assert model.rowCount() == 2
+
+    log = SignalLog(model)
+    entry = make_entry(monday, psp="A", description="x", hours=0.5)
+    db.add_entry(entry)
+    cache.invalidate(entry.date)
+    model.set_groups(build_snapshot(cache, monday).day_groups)
+
+    # New entry row plus the group summary row, inserted after the first entry
+    assert log.events == [("insert", 1, 2)]
+    assert model.index(2, 2).data() == "Summe: x"
+    assert model.index(2, 4).data() == "1.50"
+    assert model.index(2, 0).data(Qt.FontRole).bold()
+    assert not model.flags(model.index(2, 0)) & Qt.ItemIsSelectable
+    assert model.entry_id(model.index(2, 0)) is None
+    assert model.entry_id(model.index(0, 0)) is not None
+
+    edited = next(e for e in db.get_entries_for_date(monday) if e.psp == "B")
+    edited.hours = 4.0
+    db.update_entry(edited)
+    cache.invalidate(edited.date)
+    log.events.clear()
+    model.set_groups(build_snapshot(cache, monday).day_groups)
+    assert log.events == [("change", 3, 3)]
+    db.close()
+
+
+def test_week_model_pivots_and_labels_headers(tmp_path, make_entry):
+    db = Database(tmp_path / "test.db")
+    monday = date(2024, 6, 10)
+    db.add_entries([make_entry(monday, psp="A", description="x", hours=1.0), make_entry(date(2024, 6, 12), psp="A", description="x", hours=2.0)])
+    snapshot = build_snapshot(WeekCache(db), monday)
+
+    model = WeekTableModel()
+    model.set_week(snapshot.week_start, snapshot.week_rows, snapshot.week_day_totals, snapshot.week_total)
+    assert model.rowCount() == 2
+    assert [model.index(0, c).data() for c in (3, 4, 5, 10)] == ["1.00", "", "2.00", "3.00"]
+    assert model.index(1, 2).data() == "Summe"
+    assert model.headerData(5, Qt.Horizontal) == "Mi\n12.06"
+    assert model.index(0, 10).data(Qt.FontRole).bold()
+    assert model.index(0, 3).data(Qt.FontRole) is None
+    db.close()
+
+
+def test_week_model_total_matches_the_exact_week_total(tmp_path, make_entry):
+    db = Database(tmp_path / "test.db")
+    monday = date(2024, 6, 10)
+    # 18 s + 108 s: the float hours sum to 0.034999…, the seconds to exactly 0.035
+    db.add_entries([make_entry(monday, hours=0.005), make_entry(date(2024, 6, 11), hours=0.03)])
+    snapshot = build_snapshot(WeekCache(db), monday)
+
+    model = WeekTableModel()
+    model.set_week(snapshot.week_start, snapshot.week_rows, snapshot.week_day_totals, snapshot.week_total)
+    assert [model.index(1, c).data() for c in (3, 4, 10)] == ["0.01", "0.03", "0.04"]
+    assert model.index(0, 10).data() == model.index(1, 10).data()
+    db.close()
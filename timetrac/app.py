@@ -2,21 +2,42 @@
 
 from __future__ import annotations
 
+import argparse
+import logging
+import os
 import sys
 from pathlib import Path
 
-from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import QApplication, QProgressDialog
 
-from .database import Database
+from .database import LEGACY_JSON_CHECKED, Database
+from .diagnostics import StallWatchdog
 from .main_window import MainWindow
 from .theme import apply_theme
 
+_log = logging.getLogger(__name__)
+
+
+def _env_ms(name: str, default: float, enabled: bool = False) -> float | None:
+    """Milliseconds threshold from environment variable ``name``.
+
+    Unset, it is ``default`` if ``enabled`` and ``None`` otherwise; a value
+    that is not a number is reported and replaced by ``default``.
+    """
+    value = os.environ.get(name)
+    if not value:
+        return default if enabled else None
+    try:
+        return float(value)
+    except ValueError:
+        _log.warning("%s=%r is not a number of milliseconds; using %g", name, value, default)
+        return default
+
 
 def _try_migrate_json(db: Database):
-    """Auto-import old time_entries.json if database is empty."""
-    # Only migrate if DB has no entries yet
-    cursor = db.conn.execute("SELECT COUNT(*) FROM entries")
-    if cursor.fetchone()[0] > 0:
+    """Auto-import old time_entries.json, once per database."""
+    if db.get_meta(LEGACY_JSON_CHECKED):
         return
 
     # Look for JSON in common locations
@@ -26,26 +47,94 @@ def _try_migrate_json(db: Database):
     ]
     for json_path in candidates:
         if json_path.exists():
-            count = db.import_from_json(json_path)
+            dialog = QProgressDialog("Importiere alte Zeiteinträge…", None, 0, 1000)
+            dialog.setWindowTitle("TimeTrac")
+            dialog.setWindowModality(Qt.ApplicationModal)
+            dialog.setMinimumDuration(0)
+            dialog.setValue(0)
+
+            def on_progress(done: int, total: int):
+                dialog.setValue(int(done * 1000 / total) if total else 1000)
+                QApplication.processEvents()
+
+            count = db.import_from_json(json_path, progress=on_progress)
+            dialog.close()
             if count > 0:
                 print(f"Migrated {count} entries from {json_path}")
             break
+    db.set_meta(LEGACY_JSON_CHECKED, "1")
+
+
+def _install_profiler(directory: Path):
+    """Profile every user-triggered action into ``directory``; returns the ``ActionProfiler``."""
+    from .preset_dialog import PresetManagerDialog
+    from .profiling import ActionProfiler
+    from .sap_export_dialog import SapExportDialog
+    from .statistics_dialog import StatisticsDialog
+
+    profiler = ActionProfiler(directory)
+    profiler.install(MainWindow, {
+        "_save_entry": "save_entry",
+        "_delete_entry": "delete_entry",
+        "_refresh_data": "refresh_data",
+        "_copy_day_for_sap": "copy_day_for_sap",
+    })
+    # Dialogs run modally; profiling their construction keeps actions inside them separate
+    profiler.install(StatisticsDialog, {"__init__": "open_statistics", "_show_result": "show_statistics"})
+    profiler.install(SapExportDialog, {"__init__": "open_sap_export", "_copy_grid": "copy_grid"})
+    profiler.install(PresetManagerDialog, {
+        "__init__": "open_presets",
+        "_add_preset": "add_preset",
+        "_update_preset": "update_preset",
+        "_delete_preset": "delete_preset",
+    })
+    return profiler
 
 
 def main():
-    app = QApplication(sys.argv)
+    parser = argparse.ArgumentParser(prog="timetrac")
+    parser.add_argument(
+        "--profile", nargs="?", const="", default=os.environ.get("TIMETRAC_PROFILE"), metavar="DIR",
+        help="profile each action with cProfile into DIR (default: 'profiles' next to the database); "
+             "also enabled by TIMETRAC_PROFILE",
+    )
+    args, qt_args = parser.parse_known_args()
+
+    app = QApplication(sys.argv[:1] + qt_args)
     app.setApplicationName("TimeTrac")
     app.setOrganizationName("NicoDahlhaus")
 
     apply_theme(app)
 
     db = Database()
+    # TIMETRAC_SLOW_QUERY_MS=50 logs every query taking 50 ms or more next to the database;
+    # TIMETRAC_STALL_MS=50 logs event-loop stalls of 50 ms or more with the GUI thread's stack;
+    # TIMETRAC_HUD=1 enables both (default thresholds) and shows the performance HUD.
+    show_hud = os.environ.get("TIMETRAC_HUD") == "1"
+    slow_query_ms = _env_ms("TIMETRAC_SLOW_QUERY_MS", 100.0, enabled=show_hud)
+    if slow_query_ms is not None:
+        db.enable_instrumentation(slow_query_ms, db.db_path.with_name("slow_queries.log"))
     _try_migrate_json(db)
 
+    profiler = None
+    if args.profile is not None:
+        profiler = _install_profiler(Path(args.profile) if args.profile else db.db_path.with_name("profiles"))
+
     window = MainWindow(db)
+    watchdog = None
+    stall_ms = _env_ms("TIMETRAC_STALL_MS", 50.0, enabled=show_hud)
+    if stall_ms is not None:
+        watchdog = StallWatchdog(stall_ms, db.db_path.with_name("stalls.log"))
+        watchdog.stalled.connect(window.hud.show_stall)
+        watchdog.start()
+    window.set_hud_visible(show_hud)
     window.show()
 
     exit_code = app.exec()
+    if watchdog is not None:
+        watchdog.stop()
+    if profiler is not None:
+        print(f"Profile summary: {profiler.write_summary()}")
     db.close()
     sys.exit(exit_code)
 
@@ -0,0 +1,174 @@
+"""Week-keyed entry cache sitting between the main window and the database."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from datetime import date, timedelta
+
+from .database import Database
+from .models import TimeEntry
+
+
+def week_start(day: date) -> date:
+    """Return the Monday of the week containing ``day``."""
+    return day - timedelta(days=day.weekday())
+
+
+@dataclass
+class PendingWrite:
+    """An entry write that has been submitted but not yet committed.
+
+    ``kind`` is ``"add"``, ``"update"`` or ``"delete"``; ``old_date`` is the
+    date the entry had before an update. ``row_id`` is the id an add was
+    committed under, known before the write is resolved.
+    """
+
+    kind: str
+    entry: TimeEntry
+    old_date: date | None = None
+    row_id: int | None = None
+
+    def dates(self) -> tuple[date, ...]:
+        if self.old_date is None or self.old_date == self.entry.date:
+            return (self.entry.date,)
+        return (self.old_date, self.entry.date)
+
+
+class WeekCache:
+    """LRU cache of ``Database.get_entries_for_week`` results.
+
+    Every day-level read the main window needs is answered from one cached
+    week fetch. Returned weeks are shared with the cache and must not be
+    modified.
+
+    Entry writes go through ``add_pending``, which overlays the in-flight
+    write on the cached weeks so views show it immediately, and moves the
+    entry's values to the front of the cached recent combo values (ranked
+    by frecency in the database). Pending new entries get negative
+    provisional ids. Once the write has completed, ``resolve_pending`` drops
+    the overlay, the affected weeks and the recents, and the next read picks
+    up the committed state.
+    """
+
+    RECENT_LIMIT = 200
+
+    def __init__(self, db: Database, capacity: int = 8):
+        self.db = db
+        self.capacity = capacity
+        self._weeks: OrderedDict[date, dict[date, list[TimeEntry]]] = OrderedDict()
+        self._recents: dict[str, list[str]] = {}
+        self._pending: dict[int, PendingWrite] = {}
+        self._next_token = -1
+        self.hits = 0
+        self.misses = 0
+
+    def week(self, day: date) -> dict[date, list[TimeEntry]]:
+        key = week_start(day)
+        week = self._weeks.get(key)
+        if week is not None:
+            self.hits += 1
+            self._weeks.move_to_end(key)
+            return week
+        self.misses += 1
+        return self._load(key)
+
+    def invalidate(self, *days: date):
+        """Drop the cached weeks containing the given dates."""
+        for day in days:
+            self._weeks.pop(week_start(day), None)
+
+    def clear(self):
+        self._weeks.clear()
+        self._recents.clear()
+
+    def recent_values(self, field: str) -> list[str]:
+        values = self._recents.get(field)
+        if values is None:
+            values = self.db.get_recent_values(field, self.RECENT_LIMIT)
+            self._recents[field] = values
+        return values
+
+    def has_pending(self) -> bool:
+        return bool(self._pending)
+
+    def add_pending(self, write: PendingWrite) -> int:
+        """Overlay an in-flight write on the cached weeks. Returns its token."""
+        token = self._next_token
+        self._next_token -= 1
+        if write.kind == "add":
+            write.entry = replace(write.entry, id=token)
+        self._pending[token] = write
+        for day in write.dates():
+            week = self._weeks.get(week_start(day))
+            if week is not None:
+                self._apply_pending(week, write)
+        if write.kind != "delete":
+            self._bump_recents(write.entry)
+        return token
+
+    def mark_committed(self, token: int, row_id: int):
+        """Record that a pending add was committed as ``row_id``.
+
+        Safe to call from the worker thread. Until ``resolve_pending`` runs,
+        weeks that are reloaded and already hold the row skip the overlay.
+        """
+        self._pending[token].row_id = row_id
+
+    def resolve_pending(self, token: int) -> PendingWrite:
+        """Remove a completed write's overlay and drop the weeks and recents it touched."""
+        write = self._pending.pop(token)
+        self.invalidate(*write.dates())
+        self._recents.clear()
+        return write
+
+    def _apply_pending(self, week: dict[date, list[TimeEntry]], write: PendingWrite):
+        entry = write.entry
+        if write.kind == "update" and entry.date in week:
+            day_entries = week[entry.date]
+            for i, existing in enumerate(day_entries):
+                if existing.id == entry.id:
+                    day_entries[i] = entry
+                    return
+        if write.kind in ("update", "delete"):
+            for day_entries in week.values():
+                day_entries[:] = [e for e in day_entries if e.id != entry.id]
+        if write.kind in ("add", "update") and entry.date in week:
+            week[entry.date].append(entry)
+
+    def _bump_recents(self, entry: TimeEntry):
+        for field, values in self._recents.items():
+            value = getattr(entry, field)
+            if not value:
+                continue
+            if value in values:
+                values.remove(value)
+            values.insert(0, value)
+            del values[self.RECENT_LIMIT:]
+
+    def prefetch(self, day: date) -> int:
+        """Load the weeks before and after ``day``'s week if not cached yet.
+
+        Returns the number of weeks fetched from the database.
+        """
+        loaded = 0
+        for offset in (-7, 7):
+            key = week_start(day) + timedelta(days=offset)
+            if key not in self._weeks:
+                self._load(key)
+                loaded += 1
+        return loaded
+
+    def _load(self, key: date) -> dict[date, list[TimeEntry]]:
+        week = self.db.get_entries_for_week(key)
+        loaded_ids = {e.id for entries in week.values() for e in entries}
+        for write in self._pending.values():
+            if write.row_id in loaded_ids:
+                continue  # committed before this load, so the row is already in ``week``
+            if any(week_start(day) == key for day in write.dates()):
+                self._apply_pending(week, write)
+        self._weeks[key] = week
+        self._weeks.move_to_end(key)
+        while len(self._weeks) > self.capacity:
+            self._weeks.popitem(last=False)
+        return week
@@ -0,0 +1,131 @@
+"""Type-ahead completion over every value ever entered, queried off the GUI thread."""
+
+from __future__ import annotations
+
+from PySide6.QtCore import QAbstractListModel, QModelIndex, Qt, QTimer, Signal
+from PySide6.QtWidgets import QCompleter, QLineEdit
+
+from .database import Database
+from .jobs import DatabaseJob, JobCancelled, LatestJobRunner
+
+PAGE_SIZE = 50
+DEBOUNCE_MS = 40
+
+
+class ValueSearchJob(DatabaseJob):
+    """``Database.iter_matching_values`` as a ``DatabaseJob``, one page per ``emit_page``."""
+
+    def __init__(self, db: Database, field: str, text: str):
+        super().__init__(db)
+        self.field = field
+        self.text = text
+
+    def work(self):
+        with self.db.interruptible(self.is_cancelled):
+            for page in self.db.iter_matching_values(self.field, self.text, PAGE_SIZE):
+                if self.is_cancelled():
+                    raise JobCancelled
+                self.emit_page(page)
+
+
+class CompletionModel(QAbstractListModel):
+    """Flat list of completion candidates that grows page by page."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._values: list[str] = []
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._values)
+
+    def data(self, index: QModelIndex, role=Qt.DisplayRole):
+        if index.isValid() and role in (Qt.DisplayRole, Qt.EditRole):
+            return self._values[index.row()]
+        return None
+
+    def values(self) -> list[str]:
+        return list(self._values)
+
+    def set_values(self, values: list[str]):
+        self.beginResetModel()
+        self._values = list(values)
+        self.endResetModel()
+
+    def append_values(self, values: list[str]):
+        if not values:
+            return
+        first = len(self._values)
+        self.beginInsertRows(QModelIndex(), first, first + len(values) - 1)
+        self._values.extend(values)
+        self.endInsertRows()
+
+
+class HistoryCompleter(QCompleter):
+    """Completer over all values of one entry field in the database.
+
+    Typing restarts a short debounce timer; when it fires, a search for the
+    current text runs off the GUI thread and its pages replace
+    the model's rows as they arrive. Only the newest search reaches the
+    model. The rows are already filtered and ranked, so the completer shows
+    them unfiltered.
+    """
+
+    searched = Signal(str)  # text whose results are complete
+
+    def __init__(self, db: Database, field: str, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.field = field
+        self.source = CompletionModel(self)
+        self.setModel(self.source)
+        self.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self.setCaseSensitivity(Qt.CaseInsensitive)
+        self.setMaxVisibleItems(12)
+
+        self._runner = LatestJobRunner(self)
+        self._runner.page.connect(self._on_page)
+        self._runner.finished.connect(self._on_finished)
+        self._first_page_seen = False
+        self._pending_text = ""
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(DEBOUNCE_MS)
+        self._debounce.timeout.connect(self._start_search)
+
+    def attach(self, line_edit: QLineEdit):
+        """Complete ``line_edit``'s text from this completer."""
+        line_edit.setCompleter(self)
+        line_edit.textEdited.connect(self.search)
+
+    def search(self, text: str):
+        """Look up ``text`` once typing has paused for ``DEBOUNCE_MS``."""
+        self._pending_text = text.strip()
+        self._debounce.start()
+
+    def is_searching(self) -> bool:
+        return self._debounce.isActive() or self._runner.is_running()
+
+    def shutdown(self):
+        """Stop pending work; call before the database is closed."""
+        self._debounce.stop()
+        self._runner.shutdown()
+
+    def _start_search(self):
+        self._first_page_seen = False
+        self._runner.start(ValueSearchJob(self.db, self.field, self._pending_text))
+
+    def _on_page(self, _job: ValueSearchJob, values: list):
+        if self._first_page_seen:
+            self.source.append_values(values)
+            return
+        self._first_page_seen = True
+        self.source.set_values(values)
+        widget = self.widget()
+        if widget is not None and widget.hasFocus():
+            self.complete()
+
+    def _on_finished(self, job: ValueSearchJob, _outcome):
+        if not self._first_page_seen:
+            self.source.set_values([])
+            self.popup().hide()
+        self.searched.emit(job.text)
@@ -2,16 +2,398 @@
 
 from __future__ import annotations
 
+import copy
+import functools
+import inspect
 import json
+import math
 import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
 from datetime import date, datetime, timedelta
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Iterable, Iterator, Optional
 
-from .models import DaySummary, Preset, TimeEntry, TimeMode
+from .instrumentation import Instrumentation
+from .legacy_json import LegacyJsonReader
+from .models import (
+    DaySummary,
+    PeriodStatistics,
+    Preset,
+    TimeEntry,
+    TimeMode,
+    count_working_days,
+    format_time_of_day,
+    hours_to_seconds,
+    parse_time_of_day,
+    seconds_to_hours,
+)
 
 DATE_FORMAT = "%Y-%m-%d"
 
+# Public methods that manage connections or instrumentation instead of querying
+_UNINSTRUMENTED = {
+    "close", "release_reader", "data_version", "interruptible", "read_snapshot", "transaction",
+    "enable_instrumentation", "stats",
+}
+
+# Upper bound for ids bound into a single ``IN (...)`` clause; older SQLite
+# builds reject statements with more than 999 host parameters.
+_MAX_IN_PARAMS = 500
+
+# ``PRAGMA user_version`` of the current schema. Version 2 stores entry dates
+# as day numbers (``date.toordinal()``), durations as integer seconds and
+# start/end times as minutes of the day. Version 3 moves PSP, activity type
+# and description text into lookup tables referenced by id. Version 4 ranks
+# lookup values by frecency. Version 5 replaces the single-column entry
+# indexes by composite ones. Version 6 adds the ``meta`` key/value table.
+SCHEMA_VERSION = 6
+
+# ``meta`` key set once the legacy ``time_entries.json`` import has been
+# looked for; databases that already hold entries never need it.
+LEGACY_JSON_CHECKED = "legacy_json_checked"
+
+# Lookup tables as (table, ``entries`` column, ``TimeEntry`` field). Each
+# distinct string is stored once, with its suggestion ranking: ``use_count``
+# (entries referencing it, kept by triggers), ``last_used`` (Unix time of
+# the last write using it) and ``frecency``.
+_LOOKUPS = [
+    ("psp", "psp_id", "psp"),
+    ("activity_type", "activity_type_id", "activity_type"),
+    ("description_text", "description_id", "description"),
+]
+
+_LOOKUP_FIELDS = {field: table for table, _column, field in _LOOKUPS}
+
+# Entry fields that presets can fill in, with their presets column
+_PRESET_FIELDS = {"psp": "psp", "activity_type": "activity_type"}
+
+# Frecency is log(sum(exp(rate * t))) over the write times t of a value: an
+# exponentially decaying use count kept in log space. Decaying everything to
+# "now" rescales all values alike, so the stored score never needs aging and
+# an index on it gives the ranking directly. NULL means "not suggested".
+_FRECENCY_HALF_LIFE_DAYS = 14.0
+_FRECENCY_RATE = math.log(2) / (_FRECENCY_HALF_LIFE_DAYS * 86400)
+
+
+def _log_add_exp(a: float | None, b: float | None) -> float | None:
+    """``log(exp(a) + exp(b))`` without overflow; ``None`` stands for log(0)."""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    if a < b:
+        a, b = b, a
+    return a + math.log1p(math.exp(b - a))
+
+
+class _LogSumExp:
+    """SQL aggregate ``log_sum_exp(x)`` built on ``_log_add_exp``."""
+
+    def __init__(self):
+        self.total: float | None = None
+
+    def step(self, value: float | None):
+        self.total = _log_add_exp(self.total, value)
+
+    def finalize(self) -> float | None:
+        return self.total
+
+
+def _lookup_table_schema(table: str) -> list[str]:
+    return [
+        f"""CREATE TABLE IF NOT EXISTS {table} (
+                id INTEGER PRIMARY KEY,
+                value TEXT NOT NULL UNIQUE,
+                use_count INTEGER NOT NULL DEFAULT 0,
+                last_used INTEGER,
+                frecency REAL
+            )""",
+        f"CREATE INDEX IF NOT EXISTS idx_{table}_frecency ON {table}(frecency)",
+        # Lets case-insensitive prefix LIKE run as an index range scan
+        f"CREATE INDEX IF NOT EXISTS idx_{table}_value_nocase ON {table}(value COLLATE NOCASE)",
+    ]
+
+
+def _lookup_usage_triggers(table: str, column: str) -> list[str]:
+    # A value nobody references any more drops out of the suggestions
+    release = f"""UPDATE {table} SET use_count = use_count - 1,
+                         frecency = CASE WHEN use_count <= 1 THEN NULL ELSE frecency END
+                  WHERE id = OLD.{column};"""
+    acquire = f"UPDATE {table} SET use_count = use_count + 1 WHERE id = NEW.{column};"
+    return [
+        f"""CREATE TRIGGER IF NOT EXISTS trg_{table}_usage_insert AFTER INSERT ON entries
+            BEGIN
+                {acquire}
+            END""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_{table}_usage_delete AFTER DELETE ON entries
+            BEGIN
+                {release}
+            END""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_{table}_usage_update AFTER UPDATE OF {column} ON entries
+            WHEN OLD.{column} != NEW.{column}
+            BEGIN
+                {release}
+                {acquire}
+            END""",
+    ]
+
+
+_ENTRIES_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS entries (
+           id INTEGER PRIMARY KEY AUTOINCREMENT,
+           day INTEGER NOT NULL,
+           psp_id INTEGER NOT NULL REFERENCES psp(id),
+           activity_type_id INTEGER NOT NULL REFERENCES activity_type(id),
+           description_id INTEGER NOT NULL REFERENCES description_text(id),
+           seconds INTEGER NOT NULL,
+           start_minute INTEGER,
+           end_minute INTEGER,
+           mode TEXT NOT NULL DEFAULT 'range',
+           created_at TEXT NOT NULL DEFAULT (datetime('now'))
+       )""",
+    # Day and range reads in display order, without a sort
+    "CREATE INDEX IF NOT EXISTS idx_entries_day_created ON entries(day, created_at)",
+    # The same per PSP
+    "CREATE INDEX IF NOT EXISTS idx_entries_psp_day ON entries(psp_id, day, created_at)",
+    # Covers the statistics scan of partial months
+    """CREATE INDEX IF NOT EXISTS idx_entries_day_totals
+       ON entries(day, psp_id, activity_type_id, seconds)""",
+]
+
+# Conditions ``iter_entries`` can filter on, keyed by ``TimeEntry`` field
+_ENTRY_FILTERS = {
+    "psp": "e.psp_id = (SELECT id FROM psp WHERE value = ?)",
+    "activity_type": "e.activity_type_id = (SELECT id FROM activity_type WHERE value = ?)",
+    "description": "e.description_id = (SELECT id FROM description_text WHERE value = ?)",
+    "mode": "e.mode = ?",
+}
+
+# Julian day number of day 0 in ``date.toordinal()`` numbering; adding it
+# turns a day number into a value SQLite's date functions accept.
+_ORDINAL_JULIAN_OFFSET = 1721424.5
+
+
+def _sql_month(day: str) -> str:
+    """SQL expression for the ``YYYYMM`` integer month of a day-number expression."""
+    return f"CAST(strftime('%Y%m', {day} + {_ORDINAL_JULIAN_OFFSET}) AS INTEGER)"
+
+
+def _month_key(d: date) -> int:
+    return d.year * 100 + d.month
+
+
+# Per-day rollup of ``entries`` kept current by triggers, so day/week totals
+# and daily-hours queries read one row per day instead of every entry.
+_DAILY_TOTALS_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS daily_totals (
+           day INTEGER PRIMARY KEY,
+           seconds INTEGER NOT NULL DEFAULT 0,
+           entry_count INTEGER NOT NULL DEFAULT 0
+       ) WITHOUT ROWID""",
+    """CREATE TRIGGER IF NOT EXISTS trg_daily_totals_insert AFTER INSERT ON entries
+       BEGIN
+           INSERT INTO daily_totals (day, seconds, entry_count) VALUES (NEW.day, NEW.seconds, 1)
+           ON CONFLICT(day) DO UPDATE SET seconds = seconds + excluded.seconds,
+                                          entry_count = entry_count + 1;
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_daily_totals_delete AFTER DELETE ON entries
+       BEGIN
+           UPDATE daily_totals SET seconds = seconds - OLD.seconds, entry_count = entry_count - 1
+           WHERE day = OLD.day;
+           DELETE FROM daily_totals WHERE day = OLD.day AND entry_count <= 0;
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_daily_totals_update AFTER UPDATE OF day, seconds ON entries
+       BEGIN
+           UPDATE daily_totals SET seconds = seconds - OLD.seconds, entry_count = entry_count - 1
+           WHERE day = OLD.day;
+           DELETE FROM daily_totals WHERE day = OLD.day AND entry_count <= 0;
+           INSERT INTO daily_totals (day, seconds, entry_count) VALUES (NEW.day, NEW.seconds, 1)
+           ON CONFLICT(day) DO UPDATE SET seconds = seconds + excluded.seconds,
+                                          entry_count = entry_count + 1;
+       END""",
+]
+
+# Per-(month, psp, activity type) rollup of ``entries``, so statistics over
+# long ranges read whole months from here and only scan raw rows for the
+# partial months at either end. ``month`` is a ``YYYYMM`` integer.
+_MONTHLY_TOTALS_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS monthly_totals (
+           month INTEGER NOT NULL,
+           psp_id INTEGER NOT NULL,
+           activity_type_id INTEGER NOT NULL,
+           seconds INTEGER NOT NULL DEFAULT 0,
+           entry_count INTEGER NOT NULL DEFAULT 0,
+           PRIMARY KEY (month, psp_id, activity_type_id)
+       ) WITHOUT ROWID""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_monthly_totals_insert AFTER INSERT ON entries
+        BEGIN
+            INSERT INTO monthly_totals (month, psp_id, activity_type_id, seconds, entry_count)
+            VALUES ({_sql_month("NEW.day")}, NEW.psp_id, NEW.activity_type_id, NEW.seconds, 1)
+            ON CONFLICT(month, psp_id, activity_type_id) DO UPDATE SET seconds = seconds + excluded.seconds,
+                                                                     entry_count = entry_count + 1;
+        END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_monthly_totals_delete AFTER DELETE ON entries
+        BEGIN
+            UPDATE monthly_totals SET seconds = seconds - OLD.seconds, entry_count = entry_count - 1
+            WHERE month = {_sql_month("OLD.day")} AND psp_id = OLD.psp_id
+                  AND activity_type_id = OLD.activity_type_id;
+            DELETE FROM monthly_totals
+            WHERE month = {_sql_month("OLD.day")} AND psp_id = OLD.psp_id
+                  AND activity_type_id = OLD.activity_type_id AND entry_count <= 0;
+        END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_monthly_totals_update
+        AFTER UPDATE OF day, psp_id, activity_type_id, seconds ON entries
+        BEGIN
+            UPDATE monthly_totals SET seconds = seconds - OLD.seconds, entry_count = entry_count - 1
+            WHERE month = {_sql_month("OLD.day")} AND psp_id = OLD.psp_id
+                  AND activity_type_id = OLD.activity_type_id;
+            DELETE FROM monthly_totals
+            WHERE month = {_sql_month("OLD.day")} AND psp_id = OLD.psp_id
+                  AND activity_type_id = OLD.activity_type_id AND entry_count <= 0;
+            INSERT INTO monthly_totals (month, psp_id, activity_type_id, seconds, entry_count)
+            VALUES ({_sql_month("NEW.day")}, NEW.psp_id, NEW.activity_type_id, NEW.seconds, 1)
+            ON CONFLICT(month, psp_id, activity_type_id) DO UPDATE SET seconds = seconds + excluded.seconds,
+                                                                     entry_count = entry_count + 1;
+        END""",
+]
+
+_FTS_VALUES = """(SELECT value FROM description_text WHERE id = {0}.description_id),
+                (SELECT value FROM psp WHERE id = {0}.psp_id),
+                (SELECT value FROM activity_type WHERE id = {0}.activity_type_id)"""
+
+# Full-text index over the text of each entry, rowid = entry id. It is
+# contentless (the text already lives in the lookup tables), so removing a
+# row has to repeat the indexed text through the 'delete' command.
+_ENTRIES_FTS_SCHEMA = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+           description, psp, activity_type,
+           content='', tokenize='unicode61 remove_diacritics 2'
+       )""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_entries_fts_insert AFTER INSERT ON entries
+        BEGIN
+            INSERT INTO entries_fts (rowid, description, psp, activity_type)
+            VALUES (NEW.id, {_FTS_VALUES.format("NEW")});
+        END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_entries_fts_delete AFTER DELETE ON entries
+        BEGIN
+            INSERT INTO entries_fts (entries_fts, rowid, description, psp, activity_type)
+            VALUES ('delete', OLD.id, {_FTS_VALUES.format("OLD")});
+        END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_entries_fts_update
+        AFTER UPDATE OF psp_id, activity_type_id, description_id ON entries
+        BEGIN
+            INSERT INTO entries_fts (entries_fts, rowid, description, psp, activity_type)
+            VALUES ('delete', OLD.id, {_FTS_VALUES.format("OLD")});
+            INSERT INTO entries_fts (rowid, description, psp, activity_type)
+            VALUES (NEW.id, {_FTS_VALUES.format("NEW")});
+        END""",
+]
+
+# Tables derived from ``entries`` with their schema and the statement that
+# fills them when an existing database is migrated.
+_ROLLUPS = [
+    ("daily_totals", _DAILY_TOTALS_SCHEMA,
+     """INSERT INTO daily_totals (day, seconds, entry_count)
+        SELECT day, SUM(seconds), COUNT(*) FROM entries GROUP BY day"""),
+    ("monthly_totals", _MONTHLY_TOTALS_SCHEMA,
+     f"""INSERT INTO monthly_totals (month, psp_id, activity_type_id, seconds, entry_count)
+         SELECT {_sql_month("day")} AS m, psp_id, activity_type_id, SUM(seconds), COUNT(*)
+         FROM entries GROUP BY m, psp_id, activity_type_id"""),
+    ("entries_fts", _ENTRIES_FTS_SCHEMA,
+     f"""INSERT INTO entries_fts (rowid, description, psp, activity_type)
+         SELECT id, {_FTS_VALUES.format("entries")} FROM entries"""),
+]
+
+
+def _fts_query(text: str) -> str:
+    """Turn typed search text into an FTS5 query matching all words as prefixes."""
+    terms = ['"' + word.replace('"', '""') + '"*' for word in text.split()]
+    return " ".join(terms)
+
+
+def _month_split(start: date, end: date) -> tuple[tuple[date, date] | None, list[tuple[date, date]]]:
+    """Split ``start..end`` into its whole calendar months and the partial edges.
+
+    Returns ``(months, edges)``: the first and last day of the run of whole
+    months (or ``None`` if there is none) and the date ranges outside it.
+    """
+    first = start if start.day == 1 else (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    after_end = end + timedelta(days=1)
+    last = end if after_end.day == 1 else end.replace(day=1) - timedelta(days=1)
+    if first > last:
+        return None, [(start, end)] if start <= end else []
+    edges = []
+    if start < first:
+        edges.append((start, first - timedelta(days=1)))
+    if last < end:
+        edges.append((last + timedelta(days=1), end))
+    return (first, last), edges
+
+
+class AggregateCache:
+    """Bounded LRU of aggregate query results, shared by all threads.
+
+    Keys carry the database's data version, so a commit from any connection
+    (this process or another one) makes earlier results unreachable; they
+    age out through the LRU. Stored results are shared between callers;
+    ``_cached_aggregate`` hands out copies.
+    """
+
+    def __init__(self, capacity: int = 128):
+        self.capacity = capacity
+        self._results: OrderedDict[tuple, object] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def get_or_compute(self, key: tuple, compute: Callable[[], object]):
+        with self._lock:
+            if key in self._results:
+                self.hits += 1
+                self._results.move_to_end(key)
+                return self._results[key]
+            self.misses += 1
+        result = compute()
+        with self._lock:
+            self._results[key] = result
+            self._results.move_to_end(key)
+            while len(self._results) > self.capacity:
+                self._results.popitem(last=False)
+                self.evictions += 1
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+
+
+def _cached_aggregate(method):
+    """Serve ``method``'s results from ``Database.aggregate_cache``.
+
+    The key holds the bound arguments, so keyword and positional calls
+    share an entry. Each caller gets its own copy of the result.
+    """
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    def wrapper(self: Database, *args, **kwargs):
+        version = self._cacheable_version()
+        if version is None:
+            return method(self, *args, **kwargs)
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        key = (method.__name__, bound.args[1:], tuple(sorted(bound.kwargs.items())), version)
+        return copy.deepcopy(self.aggregate_cache.get_or_compute(key, lambda: method(*bound.args, **bound.kwargs)))
+
+    return wrapper
+
 
 def _app_data_dir() -> Path:
     """Return the platform-appropriate app data directory."""
@@ -34,31 +416,44 @@ def default_db_path() -> Path:
 
 
 class Database:
+    """SQLite access for TimeTrac, safe to share between threads.
+
+    ``conn`` is the single writer connection; every write goes through
+    ``transaction()``, which serializes writers with a lock. Reads use a
+    read-only connection per thread, so under WAL they see the last committed
+    state and never wait for (or block) a save. A thread that is inside a
+    transaction reads through the writer and sees its own changes.
+
+    Aggregate reads (totals, statistics, daily hours, week summaries) are
+    memoized in ``aggregate_cache``, keyed by ``PRAGMA data_version``.
+
+    ``enable_instrumentation()`` turns on per-method and per-statement
+    timing, reported by ``stats()``.
+    """
+
     def __init__(self, db_path: Path | None = None):
         self.db_path = db_path or default_db_path()
-        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
         self.conn.execute("PRAGMA journal_mode=WAL")
         self.conn.execute("PRAGMA foreign_keys=ON")
+        self._write_lock = threading.RLock()
+        self._tx_depth = 0
+        self._tx_owner: int | None = None
+        self._local = threading.local()
+        self._readers: list[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+        self._version_conn: sqlite3.Connection | None = None
+        self._version_lock = threading.Lock()
+        self.aggregate_cache = AggregateCache()
+        self.instrumentation: Instrumentation | None = None
+        # Source of usage timestamps for frecency; replaceable in tests
+        self.clock = time.time
+        self.conn.create_function("log_add_exp", 2, _log_add_exp, deterministic=True)
+        self.conn.create_aggregate("log_sum_exp", 1, _LogSumExp)
         self._create_tables()
 
     def _create_tables(self):
         self.conn.executescript("""
-            CREATE TABLE IF NOT EXISTS entries (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                date TEXT NOT NULL,
-                psp TEXT NOT NULL DEFAULT '',
-                activity_type TEXT NOT NULL DEFAULT '',
-                description TEXT NOT NULL DEFAULT '',
-                hours REAL NOT NULL,
-                start_time TEXT NOT NULL DEFAULT '',
-                end_time TEXT NOT NULL DEFAULT '',
-                mode TEXT NOT NULL DEFAULT 'range',
-                created_at TEXT NOT NULL DEFAULT (datetime('now'))
-            );
-
-            CREATE INDEX IF NOT EXISTS idx_entries_date ON entries(date);
-            CREATE INDEX IF NOT EXISTS idx_entries_psp ON entries(psp);
-
             CREATE TABLE IF NOT EXISTS presets (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 name TEXT NOT NULL UNIQUE,
@@ -79,126 +474,657 @@ class Database:
             self.conn.execute("ALTER TABLE presets ADD COLUMN billable INTEGER NOT NULL DEFAULT 1")
             self.conn.commit()
 
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        with self.transaction():
+            has_entries = self._table_exists("entries")
+            if version < 2 and has_entries:
+                self._migrate_entries_v2()
+            if version == 3:
+                self._migrate_lookups_v4()
+            for table, _column, _field in _LOOKUPS:
+                for statement in _lookup_table_schema(table):
+                    self.conn.execute(statement)
+            if version < 3 and has_entries:
+                self._migrate_entries_v3()
+            if version < 5:
+                self.conn.execute("DROP INDEX IF EXISTS idx_entries_day")
+                self.conn.execute("DROP INDEX IF EXISTS idx_entries_psp")
+            for statement in _ENTRIES_SCHEMA:
+                self.conn.execute(statement)
+            for table, column, _field in _LOOKUPS:
+                for statement in _lookup_usage_triggers(table, column):
+                    self.conn.execute(statement)
+            if version < 4 and has_entries:
+                self._backfill_lookup_usage()
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL) WITHOUT ROWID"
+            )
+            if version < 6 and has_entries:
+                self.conn.execute(
+                    "INSERT OR IGNORE INTO meta (key, value) SELECT ?, '1' WHERE EXISTS (SELECT 1 FROM entries)",
+                    (LEGACY_JSON_CHECKED,),
+                )
+            if version < SCHEMA_VERSION:
+                self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+        for table, schema, backfill in _ROLLUPS:
+            if not self._table_exists(table):
+                with self.transaction():
+                    for statement in schema:
+                        self.conn.execute(statement)
+                    self.conn.execute(backfill)
+
+    def _rebuild_entries(self, create_sql: str, fill: Callable[[], None]):
+        """Replace ``entries`` by ``entries_new`` (made by ``create_sql``, filled by ``fill``).
+
+        Triggers on the old table and the derived tables are dropped; the
+        caller recreates them. The AUTOINCREMENT counter carries over, so ids
+        of deleted entries are not handed out again.
+        """
+        seq = self.conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'entries'").fetchone()
+        self.conn.execute(create_sql)
+        fill()
+        for table in ("entries", *(table for table, _schema, _backfill in _ROLLUPS)):
+            self.conn.execute(f"DROP TABLE IF EXISTS {table}")
+        self.conn.execute("ALTER TABLE entries_new RENAME TO entries")
+        if seq is not None:
+            self.conn.execute(
+                "UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'entries'", seq,
+            )
+
+    def _migrate_entries_v2(self):
+        """Convert a version 1 ``entries`` table (ISO text dates, REAL hours, "HH:MM" times)."""
+
+        def fill():
+            rows = self.conn.execute(
+                """SELECT id, date, psp, activity_type, description, hours,
+                          start_time, end_time, mode, created_at FROM entries"""
+            )
+            self.conn.executemany(
+                """INSERT INTO entries_new (id, day, psp, activity_type, description, seconds,
+                                            start_minute, end_minute, mode, created_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (
+                    (entry_id, date.fromisoformat(day).toordinal(), psp, activity_type, description,
+                     hours_to_seconds(hours), parse_time_of_day(start), parse_time_of_day(end),
+                     mode, created_at)
+                    for entry_id, day, psp, activity_type, description, hours, start, end, mode, created_at
+                    in rows.fetchall()
+                ),
+            )
+
+        self._rebuild_entries(
+            """CREATE TABLE entries_new (
+                   id INTEGER PRIMARY KEY AUTOINCREMENT,
+                   day INTEGER NOT NULL,
+                   psp TEXT NOT NULL DEFAULT '',
+                   activity_type TEXT NOT NULL DEFAULT '',
+                   description TEXT NOT NULL DEFAULT '',
+                   seconds INTEGER NOT NULL,
+                   start_minute INTEGER,
+                   end_minute INTEGER,
+                   mode TEXT NOT NULL DEFAULT 'range',
+                   created_at TEXT NOT NULL DEFAULT (datetime('now'))
+               )""",
+            fill,
+        )
+
+    def _migrate_entries_v3(self):
+        """Move a version 2 ``entries`` table's text columns into the lookup tables."""
+
+        def fill():
+            for table, _column, field in _LOOKUPS:
+                self.conn.execute(f"INSERT OR IGNORE INTO {table} (value) SELECT DISTINCT {field} FROM entries")
+            self.conn.execute(
+                """INSERT INTO entries_new (id, day, psp_id, activity_type_id, description_id, seconds,
+                                            start_minute, end_minute, mode, created_at)
+                   SELECT e.id, e.day, p.id, a.id, d.id, e.seconds,
+                          e.start_minute, e.end_minute, e.mode, e.created_at
+                   FROM entries e
+                   JOIN psp p ON p.value = e.psp
+                   JOIN activity_type a ON a.value = e.activity_type
+                   JOIN description_text d ON d.value = e.description"""
+            )
+
+        self._rebuild_entries(
+            """CREATE TABLE entries_new (
+                   id INTEGER PRIMARY KEY AUTOINCREMENT,
+                   day INTEGER NOT NULL,
+                   psp_id INTEGER NOT NULL REFERENCES psp(id),
+                   activity_type_id INTEGER NOT NULL REFERENCES activity_type(id),
+                   description_id INTEGER NOT NULL REFERENCES description_text(id),
+                   seconds INTEGER NOT NULL,
+                   start_minute INTEGER,
+                   end_minute INTEGER,
+                   mode TEXT NOT NULL DEFAULT 'range',
+                   created_at TEXT NOT NULL DEFAULT (datetime('now'))
+               )""",
+            fill,
+        )
+
+    def _migrate_lookups_v4(self):
+        """Swap version 3's day-based ``last_used`` ranking for frecency."""
+        for table, _column, _field in _LOOKUPS:
+            self.conn.execute(f"ALTER TABLE {table} ADD COLUMN frecency REAL")
+            self.conn.execute(f"DROP INDEX IF EXISTS idx_{table}_last_used")
+            for kind in ("insert", "delete", "update"):
+                self.conn.execute(f"DROP TRIGGER IF EXISTS trg_{table}_usage_{kind}")
+        self.conn.execute("DROP INDEX IF EXISTS idx_entries_activity_type")
+        self.conn.execute("DROP INDEX IF EXISTS idx_entries_description")
+
+    def _backfill_lookup_usage(self):
+        """Derive use counts and frecency of migrated lookup values from ``entries``.
+
+        Each entry's ``created_at`` stands in for the time the value was used.
+        """
+        for table, column, _field in _LOOKUPS:
+            rows = self.conn.execute(
+                f"""SELECT {column}, COUNT(*), CAST(strftime('%s', MAX(created_at)) AS INTEGER),
+                           log_sum_exp(? * strftime('%s', created_at))
+                    FROM entries GROUP BY {column}""",
+                (_FRECENCY_RATE,),
+            ).fetchall()
+            self.conn.execute(f"UPDATE {table} SET use_count = 0, last_used = NULL, frecency = NULL")
+            self.conn.executemany(
+                f"""UPDATE {table} SET use_count = ?, last_used = ?,
+                           frecency = CASE WHEN value != '' THEN ? END
+                    WHERE id = ?""",
+                ((count, last_used, frecency, value_id)
+                 for value_id, count, last_used, frecency in rows),
+            )
+
+    def _table_exists(self, name: str) -> bool:
+        cursor = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+        )
+        return cursor.fetchone() is not None
+
     def close(self):
-        self.conn.close()
+        if self.instrumentation is not None:
+            self.instrumentation.close()
+        with self._readers_lock:
+            for reader in self._readers:
+                reader.close()
+            self._readers.clear()
+        with self._version_lock:
+            if self._version_conn is not None:
+                self._version_conn.close()
+                self._version_conn = None
+        with self._write_lock:
+            self.conn.close()
+
+    # --- Connections ---
+
+    def _read_conn(self) -> sqlite3.Connection:
+        """Return the calling thread's read connection."""
+        if self._tx_owner == threading.get_ident():
+            return self.conn
+        reader = getattr(self._local, "reader", None)
+        if reader is None:
+            uri = self.db_path.resolve().as_uri() + "?mode=ro"
+            # Only ever used by the owning thread; close() may run elsewhere
+            reader = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            if self.instrumentation is not None:
+                self.instrumentation.attach(reader)
+            self._local.reader = reader
+            with self._readers_lock:
+                self._readers.append(reader)
+        return reader
+
+    def release_reader(self):
+        """Close the calling thread's read connection, e.g. before a pool thread is reused."""
+        reader = getattr(self._local, "reader", None)
+        if reader is None:
+            return
+        self._local.reader = None
+        with self._readers_lock:
+            if reader in self._readers:
+                self._readers.remove(reader)
+        if self.instrumentation is not None:
+            self.instrumentation.detach(reader)
+        reader.close()
+
+    def data_version(self) -> int:
+        """Counter that changes whenever any connection commits to the database.
+
+        Read through a dedicated idle connection, for which the writer is just
+        another connection, so it covers this process's writes as well.
+        """
+        with self._version_lock:
+            if self._version_conn is None:
+                uri = self.db_path.resolve().as_uri() + "?mode=ro"
+                self._version_conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+                if self.instrumentation is not None:
+                    self.instrumentation.attach(self._version_conn)
+            return self._version_conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _cacheable_version(self) -> int | None:
+        """Data version for an aggregate cache key, or ``None`` to bypass the cache.
+
+        Reads inside a transaction or an open snapshot may see a state other
+        than the latest commit, so they are never cached.
+        """
+        if self._tx_owner == threading.get_ident():
+            return None
+        if self._read_conn().in_transaction:
+            return None
+        return self.data_version()
+
+    @contextmanager
+    def interruptible(self, cancelled: Callable[[], bool]) -> Iterator[None]:
+        """Abort this thread's reads with ``sqlite3.OperationalError`` once ``cancelled()`` is true."""
+        reader = self._read_conn()
+        self._set_cancel_check(reader, cancelled)
+        try:
+            yield
+        finally:
+            self._set_cancel_check(reader, None)
+
+    def _set_cancel_check(self, conn: sqlite3.Connection, cancelled: Callable[[], bool] | None):
+        if self.instrumentation is not None:
+            # The instrumentation owns the progress handler and polls the check
+            self.instrumentation.set_cancel_check(conn, cancelled)
+        else:
+            conn.set_progress_handler(cancelled, 1000)
+
+    @contextmanager
+    def read_snapshot(self) -> Iterator[sqlite3.Connection]:
+        """Run several reads against one consistent WAL snapshot."""
+        reader = self._read_conn()
+        if reader is self.conn or reader.in_transaction:
+            yield reader
+            return
+        reader.execute("BEGIN")
+        try:
+            yield reader
+        finally:
+            reader.rollback()
+
+    # --- Instrumentation ---
+
+    def enable_instrumentation(self, slow_query_ms: float = 100.0, log_path: Path | None = None) -> Instrumentation:
+        """Record calls, rows and latencies of every query method and SQL statement.
+
+        Calls and statements taking ``slow_query_ms`` or longer are also
+        written to ``log_path``, a rotating log file, if given. Call this
+        before other threads start using the database. Enabling it twice
+        returns the existing instrumentation.
+        """
+        if self.instrumentation is None:
+            self.instrumentation = Instrumentation(slow_query_ms, log_path)
+            with self._readers_lock:
+                connections = [self.conn, *self._readers]
+            if self._version_conn is not None:
+                connections.append(self._version_conn)
+            for conn in connections:
+                self.instrumentation.attach(conn)
+            for name, method in inspect.getmembers(type(self), inspect.isfunction):
+                if not name.startswith("_") and name not in _UNINSTRUMENTED:
+                    setattr(self, name, self.instrumentation.wrap(name, getattr(self, name)))
+        return self.instrumentation
+
+    def stats(self) -> dict:
+        """Snapshot of the aggregate cache and, if enabled, the instrumentation.
+
+        ``methods`` and ``statements`` (keyed by normalized SQL) map to
+        calls, rows, SQLite VM steps, total, p50, p95 and max milliseconds;
+        ``slow`` counts the calls and statements over the threshold and
+        lists the latest of them.
+        """
+        cache = self.aggregate_cache
+        snapshot = {
+            "aggregate_cache": {
+                "size": len(cache), "hits": cache.hits, "misses": cache.misses, "evictions": cache.evictions,
+            },
+        }
+        if self.instrumentation is not None:
+            snapshot.update(self.instrumentation.stats())
+        return snapshot
+
+    # --- Transactions ---
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Group several writes into one transaction (and one commit).
+
+        Write methods called inside the block skip their own commit. Blocks
+        may be nested; only the outermost one commits, and any exception
+        rolls the whole transaction back. Other threads' writes wait until
+        the outermost block has finished.
+        """
+        with self._write_lock:
+            outermost = self._tx_depth == 0
+            if outermost:
+                if not self.conn.in_transaction:
+                    self.conn.execute("BEGIN IMMEDIATE")
+                self._tx_owner = threading.get_ident()
+            self._tx_depth += 1
+            try:
+                yield self.conn
+            except BaseException:
+                if outermost:
+                    self.conn.rollback()
+                raise
+            else:
+                if outermost:
+                    self.conn.commit()
+            finally:
+                self._tx_depth -= 1
+                if outermost:
+                    self._tx_owner = None
 
     # --- Entries ---
 
+    _ENTRY_SELECT = """SELECT e.id, e.day, p.value, a.value, d.value, e.seconds,
+                              e.start_minute, e.end_minute, e.mode, e.created_at
+                       FROM entries e
+                       JOIN psp p ON p.id = e.psp_id
+                       JOIN activity_type a ON a.id = e.activity_type_id
+                       JOIN description_text d ON d.id = e.description_id"""
+
     def _row_to_entry(self, row: tuple) -> TimeEntry:
         return TimeEntry(
             id=row[0],
-            date=datetime.strptime(row[1], DATE_FORMAT).date(),
+            date=date.fromordinal(row[1]),
             psp=row[2],
             activity_type=row[3],
             description=row[4],
-            hours=row[5],
-            start_time=row[6],
-            end_time=row[7],
+            hours=seconds_to_hours(row[5]),
+            start_time=format_time_of_day(row[6]),
+            end_time=format_time_of_day(row[7]),
             mode=TimeMode(row[8]),
             created_at=row[9],
         )
 
+    def iter_entries(
+        self,
+        start: date,
+        end: date,
+        filters: dict[str, object] | None = None,
+        batch_size: int = 500,
+    ) -> Iterator[list[TimeEntry]]:
+        """Yield the entries of ``start..end`` in batches, by date and creation time.
+
+        ``filters`` maps ``psp``, ``activity_type``, ``description`` or
+        ``mode`` to the value an entry must have. Every batch is its own
+        keyset query continuing after ``(day, created_at, id)`` of the
+        previous one, so memory stays bounded and no read is held open
+        between batches; iterate inside ``read_snapshot()`` to see one
+        consistent state throughout.
+        """
+        conditions = ["e.day BETWEEN ? AND ?"]
+        params: list = [start.toordinal(), end.toordinal()]
+        for field, value in (filters or {}).items():
+            if field not in _ENTRY_FILTERS:
+                raise ValueError(f"cannot filter entries by {field!r}")
+            conditions.append(_ENTRY_FILTERS[field])
+            params.append(value.value if isinstance(value, TimeMode) else value)
+        sql = f"{self._ENTRY_SELECT} WHERE {' AND '.join(conditions)}"
+        order = "ORDER BY e.day, e.created_at, e.id LIMIT ?"
+        cursor = self._read_conn().execute(f"{sql} {order}", (*params, batch_size))
+        while True:
+            batch = [self._row_to_entry(row) for row in cursor.fetchall()]
+            if batch:
+                yield batch
+            if len(batch) < batch_size:
+                return
+            last = batch[-1]
+            cursor = self._read_conn().execute(
+                f"{sql} AND (e.day, e.created_at, e.id) > (?, ?, ?) {order}",
+                (*params, last.date.toordinal(), last.created_at, last.id, batch_size),
+            )
+
     def get_entries_for_date(self, day: date) -> list[TimeEntry]:
-        cursor = self.conn.execute(
-            "SELECT * FROM entries WHERE date = ? ORDER BY created_at",
-            (day.strftime(DATE_FORMAT),),
-        )
-        return [self._row_to_entry(row) for row in cursor.fetchall()]
+        return [entry for batch in self.iter_entries(day, day) for entry in batch]
 
     def get_entries_for_week(self, day: date) -> dict[date, list[TimeEntry]]:
         start = day - timedelta(days=day.weekday())
         end = start + timedelta(days=6)
-        cursor = self.conn.execute(
-            "SELECT * FROM entries WHERE date BETWEEN ? AND ? ORDER BY date, created_at",
-            (start.strftime(DATE_FORMAT), end.strftime(DATE_FORMAT)),
-        )
         result: dict[date, list[TimeEntry]] = {}
         for i in range(7):
             result[start + timedelta(days=i)] = []
-        for row in cursor.fetchall():
-            entry = self._row_to_entry(row)
-            result.setdefault(entry.date, []).append(entry)
+        for batch in self.iter_entries(start, end):
+            for entry in batch:
+                result[entry.date].append(entry)
         return result
 
-    def add_entry(self, entry: TimeEntry) -> int:
-        cursor = self.conn.execute(
-            """INSERT INTO entries (date, psp, activity_type, description, hours,
-               start_time, end_time, mode)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-            (
-                entry.date.strftime(DATE_FORMAT),
-                entry.psp,
-                entry.activity_type,
-                entry.description,
-                entry.hours,
-                entry.start_time,
-                entry.end_time,
-                entry.mode.value,
-            ),
+    def search_entries(self, query: str, limit: int = 50, after: TimeEntry | None = None) -> list[TimeEntry]:
+        """Entries whose description, PSP or activity type contain every word of ``query``.
+
+        Words match as prefixes, case- and accent-insensitively. Hits are
+        returned most recently entered first; pass the last hit of a page as
+        ``after`` to get the next one.
+        """
+        match = _fts_query(query)
+        if not match:
+            return []
+        hits = "SELECT rowid FROM entries_fts WHERE entries_fts MATCH ?"
+        params: list = [match]
+        if after is not None:
+            hits += " AND rowid < ?"
+            params.append(after.id)
+        # FTS5 yields matches in rowid order, so the page needs no sort
+        cursor = self._read_conn().execute(
+            f"""{self._ENTRY_SELECT}
+                WHERE e.id IN ({hits} ORDER BY rowid DESC LIMIT ?)
+                ORDER BY e.id DESC""",
+            (*params, limit),
         )
-        self.conn.commit()
+        return [self._row_to_entry(row) for row in cursor.fetchall()]
+
+    _INSERT_ENTRY_SQL = """INSERT INTO entries (day, psp_id, activity_type_id, description_id,
+               seconds, start_minute, end_minute, mode)
+               VALUES (?, (SELECT id FROM psp WHERE value = ?),
+                       (SELECT id FROM activity_type WHERE value = ?),
+                       (SELECT id FROM description_text WHERE value = ?), ?, ?, ?, ?)"""
+
+    _UPDATE_ENTRY_SQL = """UPDATE entries SET day=?,
+               psp_id=(SELECT id FROM psp WHERE value = ?),
+               activity_type_id=(SELECT id FROM activity_type WHERE value = ?),
+               description_id=(SELECT id FROM description_text WHERE value = ?),
+               seconds=?, start_minute=?, end_minute=?, mode=? WHERE id=?"""
+
+    @staticmethod
+    def _intern_values(conn: sqlite3.Connection, entries: list[TimeEntry]):
+        """Make sure the lookup tables hold every text value of ``entries``."""
+        for table, _column, field in _LOOKUPS:
+            conn.executemany(
+                f"INSERT OR IGNORE INTO {table} (value) VALUES (?)",
+                {(getattr(e, field),) for e in entries},
+            )
+
+    def _record_usage(self, conn: sqlite3.Connection, entries: list[TimeEntry]):
+        """Add one use per entry to the frecency of its non-empty lookup values.
+
+        Frecency is stored as ``log(sum(exp(rate * t)))`` over all use times
+        ``t``, so a new use is a single ``log_add_exp`` and older uses decay
+        relative to newer ones without ever rewriting the row again.
+        """
+        now = self.clock()
+        for table, _column, field in _LOOKUPS:
+            counts = Counter(getattr(e, field) for e in entries)
+            counts.pop("", None)
+            conn.executemany(
+                f"UPDATE {table} SET frecency = log_add_exp(frecency, ?), last_used = ? WHERE value = ?",
+                ((_FRECENCY_RATE * now + math.log(n), int(now), value) for value, n in counts.items()),
+            )
+
+    @staticmethod
+    def _entry_params(entry: TimeEntry) -> tuple:
+        return (
+            entry.date.toordinal(),
+            entry.psp,
+            entry.activity_type,
+            entry.description,
+            hours_to_seconds(entry.hours),
+            parse_time_of_day(entry.start_time),
+            parse_time_of_day(entry.end_time),
+            entry.mode.value,
+        )
+
+    def add_entry(self, entry: TimeEntry) -> int:
+        with self.transaction() as conn:
+            self._intern_values(conn, [entry])
+            cursor = conn.execute(self._INSERT_ENTRY_SQL, self._entry_params(entry))
+            self._record_usage(conn, [entry])
         return cursor.lastrowid
 
+    def add_entries(self, entries: Iterable[TimeEntry]) -> int:
+        """Insert many entries in a single transaction. Returns count inserted."""
+        entries = list(entries)
+        with self.transaction() as conn:
+            self._intern_values(conn, entries)
+            cursor = conn.executemany(
+                self._INSERT_ENTRY_SQL, (self._entry_params(e) for e in entries)
+            )
+            self._record_usage(conn, entries)
+        return max(cursor.rowcount, 0)
+
     def update_entry(self, entry: TimeEntry):
-        self.conn.execute(
-            """UPDATE entries SET date=?, psp=?, activity_type=?, description=?,
-               hours=?, start_time=?, end_time=?, mode=? WHERE id=?""",
-            (
-                entry.date.strftime(DATE_FORMAT),
-                entry.psp,
-                entry.activity_type,
-                entry.description,
-                entry.hours,
-                entry.start_time,
-                entry.end_time,
-                entry.mode.value,
-                entry.id,
-            ),
-        )
-        self.conn.commit()
+        with self.transaction() as conn:
+            self._intern_values(conn, [entry])
+            conn.execute(self._UPDATE_ENTRY_SQL, (*self._entry_params(entry), entry.id))
+            self._record_usage(conn, [entry])
+
+    def update_entries(self, entries: Iterable[TimeEntry]):
+        """Update many entries (matched by id) in a single transaction."""
+        entries = list(entries)
+        with self.transaction() as conn:
+            self._intern_values(conn, entries)
+            conn.executemany(
+                self._UPDATE_ENTRY_SQL,
+                ((*self._entry_params(e), e.id) for e in entries),
+            )
+            self._record_usage(conn, entries)
 
     def delete_entry(self, entry_id: int):
-        self.conn.execute("DELETE FROM entries WHERE id = ?", (entry_id,))
-        self.conn.commit()
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM entries WHERE id = ?", (entry_id,))
+
+    def delete_entries(self, entry_ids: Iterable[int]) -> int:
+        """Delete many entries by id in a single transaction. Returns count deleted."""
+        ids = list(entry_ids)
+        deleted = 0
+        with self.transaction() as conn:
+            for i in range(0, len(ids), _MAX_IN_PARAMS):
+                chunk = ids[i:i + _MAX_IN_PARAMS]
+                placeholders = ", ".join("?" * len(chunk))
+                cursor = conn.execute(
+                    f"DELETE FROM entries WHERE id IN ({placeholders})", chunk
+                )
+                deleted += cursor.rowcount
+        return deleted
 
     def get_recent_values(self, field: str, limit: int = 15) -> list[str]:
-        column_map = {
-            "psp": "psp",
-            "activity_type": "activity_type",
-            "description": "description",
-        }
-        col = column_map.get(field)
-        if not col:
+        """Distinct non-empty values of ``field`` still in use, highest frecency first.
+
+        Frecency weighs every use by its age (halving every
+        ``_FRECENCY_HALF_LIFE_DAYS``), so a value used often ranks above one
+        used once, and a recent use above an old one.
+        """
+        table = _LOOKUP_FIELDS.get(field)
+        if not table:
             return []
-        cursor = self.conn.execute(
-            f"SELECT DISTINCT {col} FROM entries WHERE {col} != '' "
-            f"ORDER BY date DESC, created_at DESC LIMIT ?",
+        cursor = self._read_conn().execute(
+            f"SELECT value FROM {table} WHERE frecency IS NOT NULL ORDER BY frecency DESC LIMIT ?",
             (limit,),
         )
         return [row[0] for row in cursor.fetchall()]
 
+    def iter_matching_values(self, field: str, text: str, page_size: int = 50) -> Iterator[list[str]]:
+        """Yield pages of the distinct values of ``field`` that contain ``text``.
+
+        Covers every value referenced by an entry and, for psp and activity
+        type, by a preset. Values starting with ``text`` come first, then those
+        containing it elsewhere; each group is ranked by frecency, followed by
+        the presets' values not in use yet. Matching is case-insensitive for
+        ASCII letters. Every page is its own keyset query, continuing after
+        ``(frecency, value)`` of the previous one, so a caller that stops
+        early has read no further and never leaves a read open.
+        """
+        table = _LOOKUP_FIELDS.get(field)
+        if not table:
+            return
+        escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        preset_column = _PRESET_FIELDS.get(field)
+        for pattern, exclude in ((f"{escaped}%", None), (f"%{escaped}%", f"{escaped}%")):
+            condition = "{0} LIKE ? ESCAPE '\\'"
+            params = [pattern]
+            if exclude is not None:
+                condition += " AND {0} NOT LIKE ? ESCAPE '\\'"
+                params.append(exclude)
+            for rows in self._keyset_pages(
+                f"""SELECT value, frecency FROM {table}
+                    WHERE frecency IS NOT NULL AND value != '' AND {condition.format("value")}""",
+                "frecency <= ? AND (frecency < ? OR value > ?)",
+                "ORDER BY frecency DESC, value",
+                params, page_size, lambda row: (row[1], row[1], row[0]),
+            ):
+                yield [row[0] for row in rows]
+            if not preset_column:
+                continue
+            for rows in self._keyset_pages(
+                f"""SELECT DISTINCT {preset_column} FROM presets
+                    WHERE {preset_column} != '' AND {condition.format(preset_column)}
+                      AND NOT EXISTS (SELECT 1 FROM {table} AS t
+                                      WHERE t.value = presets.{preset_column} AND t.frecency IS NOT NULL)""",
+                f"{preset_column} > ?",
+                f"ORDER BY {preset_column}",
+                params, page_size, lambda row: (row[0],),
+            ):
+                yield [row[0] for row in rows]
+
+    def _keyset_pages(
+        self,
+        sql: str,
+        after: str,
+        order: str,
+        params: list,
+        page_size: int,
+        key: Callable[[tuple], tuple],
+    ) -> Iterator[list[tuple]]:
+        """Yield the rows of ``sql`` a page at a time, one query per page.
+
+        Each page after the first adds the condition ``after``, bound to
+        ``key(last row)`` of the previous page. The cursor is closed before a
+        page is handed out.
+        """
+        conn = self._read_conn()
+        cursor = conn.execute(f"{sql} {order} LIMIT ?", (*params, page_size))
+        while True:
+            rows = cursor.fetchall()
+            cursor.close()
+            if rows:
+                yield rows
+            if len(rows) < page_size:
+                return
+            cursor = conn.execute(f"{sql} AND {after} {order} LIMIT ?", (*params, *key(rows[-1]), page_size))
+
+    @_cached_aggregate
     def get_day_total(self, day: date) -> float:
-        cursor = self.conn.execute(
-            "SELECT COALESCE(SUM(hours), 0) FROM entries WHERE date = ?",
-            (day.strftime(DATE_FORMAT),),
+        cursor = self._read_conn().execute(
+            "SELECT seconds FROM daily_totals WHERE day = ?", (day.toordinal(),),
         )
-        return cursor.fetchone()[0]
+        row = cursor.fetchone()
+        return seconds_to_hours(row[0]) if row else 0.0
 
+    @_cached_aggregate
     def get_week_total(self, day: date) -> float:
         start = day - timedelta(days=day.weekday())
         end = start + timedelta(days=6)
-        cursor = self.conn.execute(
-            "SELECT COALESCE(SUM(hours), 0) FROM entries WHERE date BETWEEN ? AND ?",
-            (start.strftime(DATE_FORMAT), end.strftime(DATE_FORMAT)),
+        cursor = self._read_conn().execute(
+            "SELECT COALESCE(SUM(seconds), 0) FROM daily_totals WHERE day BETWEEN ? AND ?",
+            (start.toordinal(), end.toordinal()),
         )
-        return cursor.fetchone()[0]
+        return seconds_to_hours(cursor.fetchone()[0])
 
+    @_cached_aggregate
     def get_week_summary(self, day: date) -> list[DaySummary]:
         week_entries = self.get_entries_for_week(day)
         summaries = []
         for d in sorted(week_entries.keys()):
             entries = week_entries[d]
-            total = sum(e.hours for e in entries)
+            total = seconds_to_hours(sum(hours_to_seconds(e.hours) for e in entries))
             summaries.append(DaySummary(date=d, total_hours=total, entries=entries))
         return summaries
 
@@ -209,146 +1135,220 @@ class Database:
                        billable=bool(row[5]) if len(row) > 5 else True)
 
     def get_presets(self) -> list[Preset]:
-        cursor = self.conn.execute("SELECT * FROM presets ORDER BY name")
+        cursor = self._read_conn().execute("SELECT * FROM presets ORDER BY name")
         return [self._row_to_preset(row) for row in cursor.fetchall()]
 
     def add_preset(self, preset: Preset) -> int:
-        cursor = self.conn.execute(
-            "INSERT INTO presets (name, psp, activity_type, notes, billable) VALUES (?, ?, ?, ?, ?)",
-            (preset.name, preset.psp, preset.activity_type, preset.notes, int(preset.billable)),
-        )
-        self.conn.commit()
+        with self.transaction() as conn:
+            cursor = conn.execute(
+                "INSERT INTO presets (name, psp, activity_type, notes, billable) VALUES (?, ?, ?, ?, ?)",
+                (preset.name, preset.psp, preset.activity_type, preset.notes, int(preset.billable)),
+            )
         return cursor.lastrowid
 
     def update_preset(self, preset: Preset):
-        self.conn.execute(
-            "UPDATE presets SET name=?, psp=?, activity_type=?, notes=?, billable=? WHERE id=?",
-            (preset.name, preset.psp, preset.activity_type, preset.notes, int(preset.billable), preset.id),
-        )
-        self.conn.commit()
+        with self.transaction() as conn:
+            conn.execute(
+                "UPDATE presets SET name=?, psp=?, activity_type=?, notes=?, billable=? WHERE id=?",
+                (preset.name, preset.psp, preset.activity_type, preset.notes, int(preset.billable), preset.id),
+            )
 
     def delete_preset(self, preset_id: int):
-        self.conn.execute("DELETE FROM presets WHERE id = ?", (preset_id,))
-        self.conn.commit()
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM presets WHERE id = ?", (preset_id,))
 
     # --- Statistics ---
 
-    def get_hours_by_psp(self, start: date, end: date) -> list[dict]:
-        """Return hours grouped by PSP for a date range, with billable info from presets."""
-        cursor = self.conn.execute(
-            """SELECT e.psp, SUM(e.hours) as total_hours, e.activity_type
-               FROM entries e
-               WHERE e.date BETWEEN ? AND ?
-               GROUP BY e.psp, e.activity_type
-               ORDER BY total_hours DESC""",
-            (start.strftime(DATE_FORMAT), end.strftime(DATE_FORMAT)),
+    @_cached_aggregate
+    def get_statistics(self, start: date, end: date) -> PeriodStatistics:
+        """Return PSP hours for a date range in a single query.
+
+        Whole calendar months are read from ``monthly_totals``; only the
+        partial months at either end of the range scan ``entries``, so the
+        cost grows with months × PSPs rather than with the number of entries.
+        Billable info comes from the presets (joined in SQL); a PSP without a
+        preset counts as billable. If several presets share a PSP, the one
+        with the last name wins.
+        """
+        months, edges = _month_split(start, end)
+        parts: list[str] = []
+        params: list[int] = []
+        columns = "psp_id, activity_type_id, seconds"
+        if months is not None:
+            parts.append(f"SELECT {columns} FROM monthly_totals WHERE month BETWEEN ? AND ?")
+            params += [_month_key(months[0]), _month_key(months[1])]
+        for edge_start, edge_end in edges:
+            # Pre-aggregated so the planner cannot flatten the scan into the
+            # outer GROUP BY and trade the day range for a full index walk
+            parts.append(
+                """SELECT psp_id, activity_type_id, SUM(seconds) AS seconds FROM entries
+                   WHERE day BETWEEN ? AND ? GROUP BY psp_id, activity_type_id"""
+            )
+            params += [edge_start.toordinal(), edge_end.toordinal()]
+        if not parts:
+            parts.append(f"SELECT {columns} FROM entries WHERE 0")
+        cursor = self._read_conn().execute(
+            f"""SELECT ps.value, act.value, SUM(t.seconds) AS total_seconds,
+                       COALESCE(pr.billable, 1)
+                FROM ({" UNION ALL ".join(parts)}) t
+                JOIN psp ps ON ps.id = t.psp_id
+                JOIN activity_type act ON act.id = t.activity_type_id
+                LEFT JOIN (
+                    SELECT psp, billable, MAX(name) FROM presets
+                    WHERE psp != '' GROUP BY psp
+                ) pr ON pr.psp = ps.value
+                GROUP BY t.psp_id, t.activity_type_id
+                ORDER BY total_seconds DESC""",
+            params,
         )
-        results = []
-        # Build a lookup of PSP -> billable from presets
-        presets = {p.psp: p.billable for p in self.get_presets() if p.psp}
-        for row in cursor.fetchall():
-            psp = row[0]
-            results.append({
+        detailed = []
+        merged_seconds: dict[str, int] = {}
+        billable_by_psp: dict[str, bool] = {}
+        billable_seconds = non_billable_seconds = 0
+        for psp, activity_type, seconds, billable in cursor.fetchall():
+            billable = bool(billable)
+            detailed.append({
                 "psp": psp,
-                "hours": row[1],
-                "activity_type": row[2],
-                "billable": presets.get(psp, True),
+                "hours": seconds_to_hours(seconds),
+                "activity_type": activity_type,
+                "billable": billable,
             })
-        return results
+            merged_seconds[psp] = merged_seconds.get(psp, 0) + seconds
+            billable_by_psp[psp] = billable
+            if billable:
+                billable_seconds += seconds
+            else:
+                non_billable_seconds += seconds
+        merged = [
+            {"psp": psp, "hours": seconds_to_hours(seconds), "billable": billable_by_psp[psp]}
+            for psp, seconds in sorted(merged_seconds.items(), key=lambda item: item[1], reverse=True)
+        ]
+        return PeriodStatistics(
+            start=start,
+            end=end,
+            detailed=detailed,
+            merged=merged,
+            billable_hours=seconds_to_hours(billable_seconds),
+            non_billable_hours=seconds_to_hours(non_billable_seconds),
+            working_days=count_working_days(start, end),
+        )
+
+    def get_hours_by_psp(self, start: date, end: date) -> list[dict]:
+        """Return hours grouped by PSP for a date range, with billable info from presets."""
+        return self.get_statistics(start, end).detailed
 
     def get_hours_by_psp_merged(self, start: date, end: date) -> list[dict]:
         """Return hours grouped by PSP only (merging activity types), with billable info."""
-        cursor = self.conn.execute(
-            """SELECT e.psp, SUM(e.hours) as total_hours
-               FROM entries e
-               WHERE e.date BETWEEN ? AND ?
-               GROUP BY e.psp
-               ORDER BY total_hours DESC""",
-            (start.strftime(DATE_FORMAT), end.strftime(DATE_FORMAT)),
-        )
-        presets = {p.psp: p.billable for p in self.get_presets() if p.psp}
-        results = []
-        for row in cursor.fetchall():
-            psp = row[0]
-            results.append({
-                "psp": psp,
-                "hours": row[1],
-                "billable": presets.get(psp, True),
-            })
-        return results
+        return self.get_statistics(start, end).merged
 
+    @_cached_aggregate
     def get_daily_hours(self, start: date, end: date) -> list[dict]:
         """Return total hours per day in a date range."""
-        cursor = self.conn.execute(
-            """SELECT date, SUM(hours) FROM entries
-               WHERE date BETWEEN ? AND ?
-               GROUP BY date ORDER BY date""",
-            (start.strftime(DATE_FORMAT), end.strftime(DATE_FORMAT)),
+        cursor = self._read_conn().execute(
+            """SELECT day, seconds FROM daily_totals
+               WHERE day BETWEEN ? AND ?
+               ORDER BY day""",
+            (start.toordinal(), end.toordinal()),
         )
-        return [{"date": datetime.strptime(row[0], DATE_FORMAT).date(), "hours": row[1]}
+        return [{"date": date.fromordinal(row[0]), "hours": seconds_to_hours(row[1])}
                 for row in cursor.fetchall()]
 
+    # --- Metadata ---
+
+    def get_meta(self, key: str) -> str | None:
+        cursor = self._read_conn().execute("SELECT value FROM meta WHERE key = ?", (key,))
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str):
+        with self.transaction() as conn:
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
     # --- Migration from JSON ---
 
-    def import_from_json(self, json_path: Path) -> int:
-        """Import entries from old time_entries.json format. Returns count imported."""
+    def import_from_json(
+        self,
+        json_path: Path,
+        progress: Callable[[int, int], None] | None = None,
+        batch_size: int = 500,
+    ) -> int:
+        """Import entries from old time_entries.json format. Returns count imported.
+
+        The file is streamed day by day and inserted in batches of
+        ``batch_size`` inside one transaction, so memory stays flat for large
+        histories. ``progress(bytes_read, total_bytes)`` is called after each
+        batch. Malformed files import nothing.
+        """
         if not json_path.exists():
             return 0
 
+        count = 0
         try:
-            raw = json.loads(json_path.read_text())
-        except (json.JSONDecodeError, OSError):
+            reader = LegacyJsonReader(json_path)
+            with self.transaction():
+                batch: list[TimeEntry] = []
+                presets_data: list = []
+                for kind, key, value in reader:
+                    if kind == "presets":
+                        if isinstance(value, list):
+                            presets_data = value
+                        continue
+                    batch.extend(self._entries_from_json_bucket(key, value))
+                    if len(batch) >= batch_size:
+                        count += self.add_entries(batch)
+                        batch.clear()
+                        if progress:
+                            progress(reader.bytes_read, reader.total_bytes)
+                count += self.add_entries(batch)
+
+                for preset_data in presets_data:
+                    if isinstance(preset_data, dict):
+                        name = preset_data.get("name", "")
+                        if name:
+                            try:
+                                self.add_preset(Preset(
+                                    id=None,
+                                    name=name,
+                                    psp=preset_data.get("psp", ""),
+                                    activity_type=preset_data.get("type", ""),
+                                    notes="",
+                                ))
+                            except sqlite3.IntegrityError:
+                                pass  # duplicate name
+        except (json.JSONDecodeError, UnicodeDecodeError, OSError):
             return 0
 
-        # Handle both formats: {entries: {...}, presets: [...]} and plain {date: [...]}
-        if "entries" in raw:
-            entries_data = raw.get("entries", {})
-            presets_data = raw.get("presets", [])
-        else:
-            entries_data = raw
-            presets_data = []
+        if progress:
+            progress(reader.total_bytes, reader.total_bytes)
+        return count
 
-        count = 0
-        for day_key, day_entries in entries_data.items():
-            try:
-                day = datetime.strptime(day_key, DATE_FORMAT).date()
-            except ValueError:
+    @staticmethod
+    def _entries_from_json_bucket(day_key: str, day_entries: object) -> Iterator[TimeEntry]:
+        """Convert one legacy day bucket into TimeEntry objects."""
+        try:
+            day = datetime.strptime(day_key, DATE_FORMAT).date()
+        except ValueError:
+            return
+        if not isinstance(day_entries, list):
+            return
+        for entry_data in day_entries:
+            if not isinstance(entry_data, dict):
                 continue
-            for entry_data in day_entries:
-                hours = entry_data.get("hours", 0)
-                if isinstance(hours, str):
-                    try:
-                        hours = float(hours.replace(",", "."))
-                    except ValueError:
-                        hours = 0
-                mode = entry_data.get("mode", "range")
-                entry = TimeEntry(
-                    id=None,
-                    date=day,
-                    psp=entry_data.get("psp", ""),
-                    activity_type=entry_data.get("type", ""),
-                    description=entry_data.get("desc", ""),
-                    hours=float(hours),
-                    start_time=entry_data.get("start", ""),
-                    end_time=entry_data.get("end", ""),
-                    mode=TimeMode(mode) if mode in ("range", "duration") else TimeMode.RANGE,
-                )
-                self.add_entry(entry)
-                count += 1
-
-        for preset_data in presets_data:
-            if isinstance(preset_data, dict):
-                name = preset_data.get("name", "")
-                if name:
-                    try:
-                        self.add_preset(Preset(
-                            id=None,
-                            name=name,
-                            psp=preset_data.get("psp", ""),
-                            activity_type=preset_data.get("type", ""),
-                            notes="",
-                        ))
-                    except sqlite3.IntegrityError:
-                        pass  # duplicate name
-
-        return count
+            hours = entry_data.get("hours", 0)
+            if isinstance(hours, str):
+                try:
+                    hours = float(hours.replace(",", "."))
+                except ValueError:
+                    hours = 0
+            mode = entry_data.get("mode", "range")
+            yield TimeEntry(
+                id=None,
+                date=day,
+                psp=entry_data.get("psp", ""),
+                activity_type=entry_data.get("type", ""),
+                description=entry_data.get("desc", ""),
+                hours=float(hours),
+                start_time=entry_data.get("start", ""),
+                end_time=entry_data.get("end", ""),
+                mode=TimeMode(mode) if mode in ("range", "duration") else TimeMode.RANGE,
+            )
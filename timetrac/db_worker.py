@@ -0,0 +1,63 @@
+"""Background database writer so the GUI thread never waits on a commit."""
+
+from __future__ import annotations
+
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Callable
+
+from PySide6.QtCore import QObject, Signal
+
+from .database import Database
+
+
+class DatabaseWorker(QObject):
+    """Executes ``Database`` write methods on a dedicated thread.
+
+    ``submit("add_entry", entry)`` queues a call and returns a
+    ``concurrent.futures.Future``. Commands run strictly in submission order
+    on the shared ``Database``; its reads keep working from other threads
+    while a write commits. An optional ``callback(future)`` is invoked on the
+    thread that owns this object (the GUI thread) once the command has
+    finished, whether it succeeded or raised.
+    """
+
+    _completed = Signal(object, object)  # future, callback
+
+    def __init__(self, db: Database, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self._queue: queue.Queue = queue.Queue()
+        self._completed.connect(self._dispatch)
+        self._thread = threading.Thread(target=self._run, name="timetrac-db-worker", daemon=True)
+        self._thread.start()
+
+    def submit(self, method: str, *args, callback: Callable[[Future], None] | None = None) -> Future:
+        future: Future = Future()
+        self._queue.put((future, method, args, callback))
+        return future
+
+    def close(self, timeout: float | None = None):
+        """Finish all queued commands, then stop the worker thread."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            future, method, args, callback = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(getattr(self.db, method)(*args))
+            except Exception as e:
+                future.set_exception(e)
+            if callback is not None:
+                self._completed.emit(future, callback)
+
+    def _dispatch(self, future: Future, callback: Callable[[Future], None]):
+        callback(future)
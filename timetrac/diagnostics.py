@@ -0,0 +1,148 @@
+"""GUI responsiveness diagnostics: an event-loop stall watchdog and a status-bar HUD."""
+
+from __future__ import annotations
+
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+from PySide6.QtCore import QObject, Qt, QTimer, Signal
+from PySide6.QtWidgets import QLabel
+
+from .instrumentation import attach_rotating_file
+
+_stall_log = logging.getLogger("timetrac.stalls")
+
+
+@dataclass(frozen=True)
+class Stall:
+    at: datetime
+    duration_ms: float
+    stack: str  # the GUI thread's Python stack while it was stalled; empty if not caught
+
+
+class StallWatchdog(QObject):
+    """Detects when the GUI thread's event loop stops running and records where.
+
+    A precise timer on the GUI thread stamps a heartbeat every ``TICK_MS``.
+    A monitor thread checks the heartbeat as often; once it is older than
+    ``threshold_ms``, it captures the GUI thread's Python stack. When the
+    loop runs again, the stall is recorded with its full duration and that
+    stack, logged to ``timetrac.stalls`` (a rotating file if ``log_path`` is
+    given) and emitted as ``stalled``.
+    """
+
+    stalled = Signal(object)  # emits Stall
+
+    TICK_MS = 10
+    KEEP = 100
+
+    def __init__(self, threshold_ms: float = 50.0, log_path: Path | None = None, parent=None):
+        super().__init__(parent)
+        self.threshold_ms = threshold_ms
+        self.stalls: deque[Stall] = deque(maxlen=self.KEEP)
+        self._gui_thread = threading.get_ident()
+        self._beat = time.perf_counter()
+        self._stack: tuple[float, str] | None = None  # (heartbeat, stack) caught by the monitor
+        self._stop = threading.Event()
+        self._monitor: threading.Thread | None = None
+        self._handler = attach_rotating_file(_stall_log, log_path) if log_path is not None else None
+        self._timer = QTimer(self)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.setInterval(self.TICK_MS)
+        self._timer.timeout.connect(self._heartbeat)
+
+    @property
+    def last_stall(self) -> Stall | None:
+        return self.stalls[-1] if self.stalls else None
+
+    def start(self):
+        """Start watching; call on the GUI thread."""
+        if self._monitor is not None:
+            return
+        self._gui_thread = threading.get_ident()
+        self._beat = time.perf_counter()
+        self._stop.clear()
+        self._monitor = threading.Thread(target=self._watch, name="timetrac-stall-watchdog", daemon=True)
+        self._monitor.start()
+        self._timer.start()
+
+    def stop(self):
+        self._timer.stop()
+        self._stop.set()
+        if self._monitor is not None:
+            self._monitor.join()
+            self._monitor = None
+        if self._handler is not None:
+            _stall_log.removeHandler(self._handler)
+            self._handler.close()
+            self._handler = None
+
+    def _heartbeat(self):
+        now = time.perf_counter()
+        beat, self._beat = self._beat, now
+        gap_ms = (now - beat) * 1000
+        if gap_ms < self.threshold_ms:
+            return
+        caught = self._stack
+        stack = caught[1] if caught is not None and caught[0] == beat else ""
+        stall = Stall(at=datetime.now(), duration_ms=gap_ms, stack=stack)
+        self.stalls.append(stall)
+        _stall_log.warning("event loop stalled for %.0f ms\n%s", gap_ms, stack or "  (stack not caught)\n")
+        self.stalled.emit(stall)
+
+    def _watch(self):
+        while not self._stop.wait(self.TICK_MS / 1000):
+            beat = self._beat
+            if (time.perf_counter() - beat) * 1000 < self.threshold_ms:
+                continue
+            if self._stack is not None and self._stack[0] == beat:
+                continue  # already caught this stall
+            frame = sys._current_frames().get(self._gui_thread)
+            if frame is not None:
+                self._stack = (beat, "".join(traceback.format_stack(frame)))
+
+
+class PerformanceHud(QLabel):
+    """Status-bar readout of the last refresh, its queries, cache hit rates and the last stall."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setObjectName("subtitle")
+        self._figures = ""
+        self._stall = ""
+
+    def show_refresh(
+        self,
+        refresh_ms: float,
+        queries: int | None,
+        week_cache: tuple[int, int],
+        aggregate_cache: tuple[int, int],
+    ):
+        """``*_cache`` are (hits, misses); ``queries`` is ``None`` without instrumentation."""
+        parts = [f"Refresh {refresh_ms:.1f} ms"]
+        if queries is not None:
+            parts.append(f"{queries} Abfrage" if queries == 1 else f"{queries} Abfragen")
+        parts.append(f"Wochen-Cache {_hit_rate(*week_cache)}")
+        parts.append(f"Summen-Cache {_hit_rate(*aggregate_cache)}")
+        self._figures = "  ·  ".join(parts)
+        self._render()
+
+    def show_stall(self, stall: Stall):
+        self._stall = f"Hänger {stall.duration_ms:.0f} ms um {stall.at:%H:%M:%S}"
+        self.setToolTip(stall.stack)
+        self._render()
+
+    def _render(self):
+        self.setText("  ·  ".join(part for part in (self._figures, self._stall) if part))
+
+
+def _hit_rate(hits: int, misses: int) -> str:
+    total = hits + misses
+    return f"{hits / total:.0%}" if total else "–"
@@ -0,0 +1,279 @@
+"""Opt-in query tracing for ``Database``; see ``Database.enable_instrumentation``."""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import logging
+import re
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Callable, Iterator
+
+# SQLite VM instructions between two progress handler calls
+PROGRESS_STEPS = 1000
+
+LOG_MAX_BYTES = 1_000_000
+LOG_BACKUPS = 3
+
+_slow_log = logging.getLogger("timetrac.slow_queries")
+
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?(?:e[+-]?\d+)?\b", re.IGNORECASE)
+_PARAM_LIST = re.compile(r"\(\?(?:, \?)+\)")
+
+
+def normalize_sql(sql: str) -> str:
+    """``sql`` with literals replaced by ``?`` and whitespace collapsed.
+
+    The trace callback sees statements with their parameters expanded; this
+    maps all executions of one statement to the same key.
+    """
+    sql = " ".join(_LITERAL.sub("?", sql).split())
+    return _PARAM_LIST.sub("(?, ...)", sql)
+
+
+def attach_rotating_file(logger: logging.Logger, path: Path) -> logging.Handler:
+    """Make ``logger`` write to a size-rotated file at ``path``; returns the handler to remove later."""
+    from logging.handlers import RotatingFileHandler  # pulls in socket and pickle; only needed when logging
+
+    handler = RotatingFileHandler(path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    return handler
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    """Nearest-rank percentile of a sorted, non-empty list."""
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class LatencyStats:
+    """Calls, rows, VM steps and latency distribution of one method or statement.
+
+    Percentiles cover the latest ``WINDOW`` calls; the other figures all of them.
+    """
+
+    WINDOW = 1000
+
+    def __init__(self):
+        self.calls = 0
+        self.rows = 0
+        self.steps = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._samples: deque[float] = deque(maxlen=self.WINDOW)
+
+    def add(self, elapsed_ms: float, rows: int, steps: int):
+        self.calls += 1
+        self.rows += rows
+        self.steps += steps
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self._samples.append(elapsed_ms)
+
+    def snapshot(self) -> dict:
+        ordered = sorted(self._samples)
+        return {
+            "calls": self.calls,
+            "rows": self.rows,
+            "steps": self.steps,
+            "total_ms": round(self.total_ms, 3),
+            "p50_ms": round(_percentile(ordered, 0.50), 3) if ordered else 0.0,
+            "p95_ms": round(_percentile(ordered, 0.95), 3) if ordered else 0.0,
+            "max_ms": round(self.max_ms, 3),
+        }
+
+
+class _StatementTracer:
+    """Times the statements run on one connection.
+
+    A statement starts when the trace callback reports it and ends when the
+    next statement on the same thread starts or the instrumented call that
+    ran it returns; the code base fetches each result in full before
+    running another statement. Rows are
+    counted through the row factory and VM steps through the progress
+    handler, which also polls the ``interruptible()`` cancel check.
+    """
+
+    def __init__(self, owner: Instrumentation):
+        self.owner = owner
+        self.cancelled: Callable[[], bool] | None = None
+        self._sql: str | None = None
+        self._started = 0.0
+        self._rows = 0
+        self._steps = 0
+
+    def trace(self, sql: str):
+        # Trigger bodies and FTS5's bookkeeping run inside the current statement
+        if sql.startswith("--") or "'main'." in sql:
+            return
+        now = time.perf_counter()
+        self.owner._finish_statements(now)
+        self.owner._local.statements = getattr(self.owner._local, "statements", 0) + 1
+        self._sql = sql
+        self._started = now
+        self._rows = self._steps = 0
+        self.owner._opened(self)
+
+    def row(self, _cursor, row: tuple) -> tuple:
+        self._rows += 1
+        self.owner._local.rows = getattr(self.owner._local, "rows", 0) + 1
+        return row
+
+    def progress(self) -> int:
+        self._steps += PROGRESS_STEPS
+        self.owner._local.steps = getattr(self.owner._local, "steps", 0) + PROGRESS_STEPS
+        return 1 if self.cancelled is not None and self.cancelled() else 0
+
+    def finish(self, now: float | None = None):
+        if self._sql is None:
+            return
+        sql, self._sql = self._sql, None
+        elapsed_ms = ((now or time.perf_counter()) - self._started) * 1000
+        self.owner._record("statements", normalize_sql(sql), elapsed_ms, self._rows, self._steps, sql)
+
+
+class Instrumentation:
+    """Per-method and per-statement call counts, rows and latencies.
+
+    Calls and statements slower than ``slow_query_ms`` are counted, kept in
+    ``recent_slow`` and logged to ``timetrac.slow_queries``; with a
+    ``log_path`` that logger writes to a rotating file.
+    """
+
+    RECENT_SLOW = 50
+
+    def __init__(self, slow_query_ms: float = 100.0, log_path: Path | None = None):
+        self.slow_query_ms = slow_query_ms
+        self.slow_count = 0
+        self.recent_slow: deque[dict] = deque(maxlen=self.RECENT_SLOW)
+        self._stats: dict[str, dict[str, LatencyStats]] = {"methods": {}, "statements": {}}
+        self._tracers: dict[int, _StatementTracer] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._handler = attach_rotating_file(_slow_log, log_path) if log_path is not None else None
+
+    def attach(self, conn):
+        """Trace the statements of ``conn``."""
+        tracer = _StatementTracer(self)
+        with self._lock:
+            self._tracers[id(conn)] = tracer
+        conn.set_trace_callback(tracer.trace)
+        conn.row_factory = tracer.row
+        conn.set_progress_handler(tracer.progress, PROGRESS_STEPS)
+
+    def detach(self, conn):
+        with self._lock:
+            self._tracers.pop(id(conn), None)
+
+    def set_cancel_check(self, conn, cancelled: Callable[[], bool] | None):
+        """Abort ``conn``'s statements once ``cancelled()`` is true; ``None`` stops checking."""
+        self._tracers[id(conn)].cancelled = cancelled
+
+    def wrap(self, name: str, method: Callable) -> Callable:
+        """``method`` recording each call under ``name``; generators are timed while they run."""
+        if inspect.isgeneratorfunction(method):
+            return self._wrap_generator(name, method)
+
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            rows, steps = self._counters()
+            started = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self._finish_statements()
+                end_rows, end_steps = self._counters()
+                self._record(
+                    "methods", name, (time.perf_counter() - started) * 1000, end_rows - rows, end_steps - steps, name,
+                )
+
+        return wrapper
+
+    def _wrap_generator(self, name: str, method: Callable) -> Callable:
+        # Only the time spent producing items counts, not the consumer's
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs) -> Iterator:
+            elapsed_ms, rows, steps = 0.0, 0, 0
+            generator = method(*args, **kwargs)
+            try:
+                while True:
+                    start_rows, start_steps = self._counters()
+                    started = time.perf_counter()
+                    try:
+                        item = next(generator)
+                    except StopIteration:
+                        return
+                    finally:
+                        self._finish_statements()
+                        elapsed_ms += (time.perf_counter() - started) * 1000
+                        end_rows, end_steps = self._counters()
+                        rows += end_rows - start_rows
+                        steps += end_steps - start_steps
+                    yield item
+            finally:
+                generator.close()
+                self._record("methods", name, elapsed_ms, rows, steps, name)
+
+        return wrapper
+
+    def thread_statement_count(self) -> int:
+        """Statements the calling thread has run so far."""
+        return getattr(self._local, "statements", 0)
+
+    def stats(self) -> dict:
+        """Snapshot of everything recorded so far, keyed by method name and normalized SQL."""
+        with self._lock:
+            snapshot = {
+                kind: {key: entry.snapshot() for key, entry in entries.items()}
+                for kind, entries in self._stats.items()
+            }
+            snapshot["slow"] = {"threshold_ms": self.slow_query_ms, "count": self.slow_count,
+                                "recent": list(self.recent_slow)}
+        return snapshot
+
+    def reset(self):
+        with self._lock:
+            for entries in self._stats.values():
+                entries.clear()
+            self.slow_count = 0
+            self.recent_slow.clear()
+
+    def close(self):
+        if self._handler is not None:
+            _slow_log.removeHandler(self._handler)
+            self._handler.close()
+            self._handler = None
+
+    def _counters(self) -> tuple[int, int]:
+        return getattr(self._local, "rows", 0), getattr(self._local, "steps", 0)
+
+    def _opened(self, tracer: _StatementTracer):
+        open_tracers = getattr(self._local, "open", None)
+        if open_tracers is None:
+            open_tracers = self._local.open = set()
+        open_tracers.add(tracer)
+
+    def _finish_statements(self, now: float | None = None):
+        now = now or time.perf_counter()
+        for tracer in getattr(self._local, "open", ()):
+            tracer.finish(now)
+        self._local.open = set()
+
+    def _record(self, kind: str, key: str, elapsed_ms: float, rows: int, steps: int, detail: str):
+        with self._lock:
+            entry = self._stats[kind].get(key)
+            if entry is None:
+                entry = self._stats[kind][key] = LatencyStats()
+            entry.add(elapsed_ms, rows, steps)
+            slow = elapsed_ms >= self.slow_query_ms
+            if slow:
+                self.slow_count += 1
+                self.recent_slow.append({
+                    "kind": kind[:-1], "name": key, "ms": round(elapsed_ms, 3), "rows": rows, "at": time.time(),
+                })
+        if slow:
+            _slow_log.info("slow %s %.1f ms, %d rows: %s", kind[:-1], elapsed_ms, rows, " ".join(detail.split())[:500])
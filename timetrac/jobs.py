@@ -0,0 +1,129 @@
+"""Cancellable database reads on a thread pool, where only the newest request reports."""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+from .database import Database
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when a newer request has superseded it."""
+
+
+class _JobSignals(QObject):
+    page = Signal(int, object)  # request id, partial result
+    finished = Signal(int, object)  # request id, result or exception
+
+
+class DatabaseJob(QRunnable):
+    """A read against ``Database`` as a cancellable ``QThreadPool`` task.
+
+    Subclasses implement ``work()``. Its return value, or the exception it
+    raised (``JobCancelled`` after ``cancel()``), is delivered through
+    ``signals.finished`` on the thread that created the job. ``work()`` may
+    hand out partial results with ``emit_page()`` before that.
+    """
+
+    def __init__(self, db: Database):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.db = db
+        self.request_id = 0
+        self.signals = _JobSignals()
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def emit_page(self, value):
+        self.signals.page.emit(self.request_id, value)
+
+    def work(self):
+        raise NotImplementedError
+
+    def run(self):
+        try:
+            if self.is_cancelled():
+                raise JobCancelled
+            outcome = self.work()
+        except sqlite3.OperationalError as e:
+            # An interrupted query surfaces as OperationalError
+            outcome = JobCancelled() if self.is_cancelled() else e
+        except Exception as e:
+            outcome = e
+        finally:
+            # Pool threads come and go; don't leave their connections behind
+            self.db.release_reader()
+        self.signals.finished.emit(self.request_id, outcome)
+
+
+class LatestJobRunner(QObject):
+    """Runs ``DatabaseJob``s on a private single-thread pool, newest first.
+
+    Starting a job cancels the one in flight. Only the current job's pages
+    and outcome are forwarded through ``page`` and ``finished``; whatever a
+    superseded job still reports is dropped.
+    """
+
+    page = Signal(object, object)  # job, partial result
+    finished = Signal(object, object)  # job, result or exception
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self._jobs: dict[int, DatabaseJob] = {}  # keeps started jobs alive until they report
+        self._job: DatabaseJob | None = None
+        self._next_request_id = 0
+
+    @property
+    def current(self) -> DatabaseJob | None:
+        return self._job
+
+    def is_running(self) -> bool:
+        return self._job is not None
+
+    def start(self, job: DatabaseJob):
+        self.cancel()
+        self._next_request_id += 1
+        job.request_id = self._next_request_id
+        job.signals.page.connect(self._on_page)
+        job.signals.finished.connect(self._on_finished)
+        self._jobs[job.request_id] = job
+        self._job = job
+        self._pool.start(job)
+
+    def cancel(self):
+        """Cancel the current job; it will not report."""
+        if self._job is None:
+            return
+        self._job.cancel()
+        if self._pool.tryTake(self._job):
+            del self._jobs[self._job.request_id]
+        self._job = None
+
+    def shutdown(self):
+        """Cancel and wait for the pool; call before the database is closed."""
+        self.cancel()
+        self._pool.waitForDone()
+
+    def _is_current(self, request_id: int) -> bool:
+        return self._job is not None and request_id == self._job.request_id
+
+    def _on_page(self, request_id: int, value):
+        if self._is_current(request_id):
+            self.page.emit(self._job, value)
+
+    def _on_finished(self, request_id: int, outcome):
+        job = self._jobs.pop(request_id, None)
+        if not self._is_current(request_id):
+            return  # superseded by a newer request
+        self._job = None
+        self.finished.emit(job, outcome)
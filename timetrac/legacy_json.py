@@ -0,0 +1,139 @@
+"""Incremental reader for the legacy time_entries.json format.
+
+The old app stored everything in one JSON document, either
+``{"entries": {date: [...]}, "presets": [...]}`` or a plain ``{date: [...]}``
+mapping. Years of history make that file large, so instead of ``json.loads``
+on the whole text this reader walks the top-level objects itself and only
+decodes one day bucket at a time. Memory use is bounded by the largest single
+day plus the read chunk, regardless of the file size.
+"""
+
+from __future__ import annotations
+
+import codecs
+import json
+from pathlib import Path
+from typing import Iterator
+
+_WHITESPACE = " \t\n\r"
+
+
+class LegacyJsonReader:
+    """Stream ``(kind, key, value)`` items out of a legacy JSON file.
+
+    ``kind`` is ``"day"`` for a day bucket (``key`` is the date string and
+    ``value`` the list of entry dicts) or ``"presets"`` for the preset list
+    (``key`` is ``None``). ``bytes_read``/``total_bytes`` can be polled
+    between items to report progress.
+
+    Raises ``json.JSONDecodeError`` on malformed input.
+    """
+
+    def __init__(self, path: Path, chunk_size: int = 64 * 1024):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.total_bytes = path.stat().st_size
+        self.bytes_read = 0
+        self._fp = None
+        self._decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self._json = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def __iter__(self) -> Iterator[tuple[str, str | None, object]]:
+        with open(self.path, "rb") as fp:
+            self._fp = fp
+            try:
+                yield from self._read_document()
+            finally:
+                self._fp = None
+
+    # --- Top-level structure ---
+
+    def _read_document(self) -> Iterator[tuple[str, str | None, object]]:
+        self._expect("{")
+        for key in self._iter_keys():
+            if key == "entries" and self._peek() == "{":
+                self._expect("{")
+                for day_key in self._iter_keys():
+                    yield "day", day_key, self._value()
+            elif key == "presets":
+                yield "presets", None, self._value()
+            else:
+                yield "day", key, self._value()
+        if self._peek():
+            self._error("Extra data")
+
+    def _iter_keys(self) -> Iterator[str]:
+        """Yield the keys of the object whose ``{`` was just consumed.
+
+        The caller must consume each key's value before resuming the iterator.
+        """
+        if self._peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self._value()
+            if not isinstance(key, str):
+                self._error("Expecting property name enclosed in double quotes")
+            self._expect(":")
+            yield key
+            ch = self._peek()
+            self._pos += 1
+            if ch == "}":
+                return
+            if ch != ",":
+                self._error("Expecting ',' delimiter")
+
+    # --- Buffer handling ---
+
+    def _fill(self) -> bool:
+        """Read the next chunk into the buffer. Returns False at end of file."""
+        if self._eof:
+            return False
+        chunk = self._fp.read(self.chunk_size)
+        self.bytes_read += len(chunk)
+        if not chunk:
+            self._eof = True
+            self._buf = self._buf[self._pos:] + self._decoder.decode(b"", final=True)
+        else:
+            self._buf = self._buf[self._pos:] + self._decoder.decode(chunk)
+        self._pos = 0
+        return True
+
+    def _peek(self) -> str:
+        """Skip whitespace and return the next character ('' at end of file)."""
+        while True:
+            buf, pos = self._buf, self._pos
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+            self._pos = pos
+            if pos < len(buf):
+                return buf[pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, ch: str):
+        if self._peek() != ch:
+            self._error(f"Expecting '{ch}'")
+        self._pos += 1
+
+    def _value(self) -> object:
+        """Decode one complete JSON value, reading more input as needed."""
+        self._peek()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number at the very end of the buffer may continue in the next chunk
+            if end == len(self._buf) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def _error(self, msg: str):
+        raise json.JSONDecodeError(msg, self._buf, self._pos)
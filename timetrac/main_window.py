@@ -2,11 +2,12 @@
 
 from __future__ import annotations
 
-from datetime import date, datetime, timedelta
+import time
+from datetime import date, datetime
 from pathlib import Path
 
-from PySide6.QtCore import QTimer, Qt, QSize
-from PySide6.QtGui import QAction, QBrush, QColor, QIcon, QKeySequence, QShortcut
+from PySide6.QtCore import QTimer, Qt, QSize, Signal
+from PySide6.QtGui import QAction, QIcon, QKeySequence, QShortcut
 from PySide6.QtWidgets import (
     QApplication,
     QComboBox,
@@ -25,18 +26,20 @@ from PySide6.QtWidgets import (
     QSplitter,
     QStatusBar,
     QTabWidget,
-    QTreeWidget,
-    QTreeWidgetItem,
+    QTreeView,
     QVBoxLayout,
     QWidget,
 )
 
 from . import theme
+from .cache import PendingWrite, WeekCache
 from .database import Database
-from .models import Preset, TimeEntry, TimeMode
-from .preset_dialog import PresetManagerDialog
-from .sap_export_dialog import KURZTEXT_MAX_LENGTH, SapExportDialog
-from .statistics_dialog import StatisticsDialog
+from .db_worker import DatabaseWorker
+from .diagnostics import PerformanceHud
+from .models import KURZTEXT_MAX_LENGTH, Preset, TimeEntry, TimeMode, parse_time_of_day
+from .search_panel import SearchPanel
+from .snapshot import ViewSnapshot, build_snapshot
+from .table_models import DayTableModel, WeekTableModel
 from .widgets import DateNavigator, EditableComboBox, TimeEdit, make_card, make_divider, make_label
 
 GERMAN_DAYS_SHORT = ["Mo", "Di", "Mi", "Do", "Fr", "Sa", "So"]
@@ -47,9 +50,13 @@ GERMAN_DAYS_FULL = [
 
 
 class MainWindow(QMainWindow):
+    refreshed = Signal(float)  # emits refresh duration in milliseconds
+
     def __init__(self, db: Database):
         super().__init__()
         self.db = db
+        self._cache = WeekCache(db)
+        self._db_worker = DatabaseWorker(db, self)
         self.setWindowTitle("TimeTrac")
         self.setMinimumSize(1100, 700)
         self.resize(1300, 800)
@@ -59,6 +66,23 @@ class MainWindow(QMainWindow):
         self._timer = QTimer(self)
         self._timer.timeout.connect(self._update_timer_display)
         self._presets: list[Preset] = []
+        self._snapshot: ViewSnapshot | None = None
+        self.last_refresh_ms = 0.0
+        self.last_refresh_queries: int | None = None  # needs Database.enable_instrumentation()
+
+        # Coalesce refresh requests fired within the same event-loop tick
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.setInterval(0)
+        self._refresh_timer.timeout.connect(self._refresh_data)
+
+        # Prefetch neighbouring weeks once the event loop is idle again
+        self._prefetch_timer = QTimer(self)
+        self._prefetch_timer.setSingleShot(True)
+        self._prefetch_timer.setInterval(0)
+        self._prefetch_timer.timeout.connect(
+            lambda: self._cache.prefetch(self.date_nav.selected_date)
+        )
 
         icon_path = Path(__file__).resolve().parent.parent / "timetable_icon.ico"
         if icon_path.exists():
@@ -72,6 +96,8 @@ class MainWindow(QMainWindow):
         QShortcut(QKeySequence("Ctrl+N"), self, self._reset_form)
         QShortcut(QKeySequence("Ctrl+S"), self, self._save_entry)
         QShortcut(QKeySequence("Ctrl+T"), self, self._toggle_timer)
+        QShortcut(QKeySequence("Ctrl+F"), self, self._focus_search)
+        QShortcut(QKeySequence("Ctrl+Shift+P"), self, lambda: self.set_hud_visible(self.hud.isHidden()))
 
     def _build_ui(self):
         central = QWidget()
@@ -99,6 +125,9 @@ class MainWindow(QMainWindow):
         self.setStatusBar(self.status_bar)
         self._status_label = QLabel("")
         self.status_bar.addWidget(self._status_label)
+        self.hud = PerformanceHud()
+        self.hud.setVisible(False)
+        self.status_bar.addPermanentWidget(self.hud)
 
     def _build_left_panel(self) -> QWidget:
         scroll = QScrollArea()
@@ -160,6 +189,7 @@ class MainWindow(QMainWindow):
         psp_col.addWidget(make_label("PSP", "sectionLabel"))
         self.psp_combo = EditableComboBox()
         self.psp_combo.setPlaceholderText("PSP-Element")
+        self.psp_combo.enable_history(self.db, "psp")
         psp_col.addWidget(self.psp_combo)
         fields_layout.addLayout(psp_col, 1)
 
@@ -168,6 +198,7 @@ class MainWindow(QMainWindow):
         type_col.addWidget(make_label("Leistungsart", "sectionLabel"))
         self.type_combo = EditableComboBox()
         self.type_combo.setPlaceholderText("Leistungsart")
+        self.type_combo.enable_history(self.db, "activity_type")
         type_col.addWidget(self.type_combo)
         fields_layout.addLayout(type_col, 1)
 
@@ -243,6 +274,7 @@ class MainWindow(QMainWindow):
         layout.addWidget(make_label("Beschreibung", "sectionLabel"))
         self.desc_combo = EditableComboBox()
         self.desc_combo.setPlaceholderText("Kurzbeschreibung der Tätigkeit")
+        self.desc_combo.enable_history(self.db, "description")
         # Limit to 40 characters for SAP ITP compatibility
         self.desc_combo.lineEdit().setMaxLength(KURZTEXT_MAX_LENGTH)
         layout.addWidget(self.desc_combo)
@@ -334,9 +366,11 @@ class MainWindow(QMainWindow):
         day_layout = QVBoxLayout(day_widget)
         day_layout.setContentsMargins(0, 10, 0, 0)
 
-        self.day_tree = QTreeWidget()
-        self.day_tree.setHeaderLabels(["PSP", "Leistungsart", "Beschreibung", "Zeit", "Stunden"])
+        self.day_model = DayTableModel(self)
+        self.day_tree = QTreeView()
+        self.day_tree.setModel(self.day_model)
         self.day_tree.setRootIsDecorated(False)
+        self.day_tree.setUniformRowHeights(True)
         self.day_tree.setAlternatingRowColors(True)
         self.day_tree.header().setStretchLastSection(False)
         self.day_tree.header().setSectionResizeMode(0, QHeaderView.Interactive)
@@ -346,8 +380,8 @@ class MainWindow(QMainWindow):
         self.day_tree.header().setSectionResizeMode(4, QHeaderView.ResizeToContents)
         self.day_tree.setColumnWidth(0, 120)
         self.day_tree.setColumnWidth(1, 120)
-        self.day_tree.currentItemChanged.connect(self._on_entry_selected)
-        self.day_tree.itemDoubleClicked.connect(self._on_entry_double_clicked)
+        self.day_tree.selectionModel().currentChanged.connect(self._on_entry_selected)
+        self.day_tree.doubleClicked.connect(self._on_entry_double_clicked)
         self.day_tree.setContextMenuPolicy(Qt.CustomContextMenu)
         day_layout.addWidget(self.day_tree, 1)
 
@@ -398,9 +432,11 @@ class MainWindow(QMainWindow):
         week_layout = QVBoxLayout(week_widget)
         week_layout.setContentsMargins(0, 10, 0, 0)
 
-        self.week_tree = QTreeWidget()
-        self.week_tree.setHeaderLabels(["PSP", "Leistungsart", "Beschreibung", "Mo", "Di", "Mi", "Do", "Fr", "Sa", "So", "Summe"])
+        self.week_model = WeekTableModel(self)
+        self.week_tree = QTreeView()
+        self.week_tree.setModel(self.week_model)
         self.week_tree.setRootIsDecorated(False)
+        self.week_tree.setUniformRowHeights(True)
         self.week_tree.setAlternatingRowColors(True)
         self.week_tree.header().setStretchLastSection(False)
         self.week_tree.header().setSectionResizeMode(0, QHeaderView.Interactive)
@@ -423,122 +459,84 @@ class MainWindow(QMainWindow):
 
         self.tabs.addTab(week_widget, "Wochenansicht")
 
+        # --- Search tab ---
+        self.search_panel = SearchPanel(self.db)
+        self.search_panel.entry_activated.connect(self._jump_to_entry)
+        self.tabs.addTab(self.search_panel, "Suche")
+        self.tabs.currentChanged.connect(self._on_tab_changed)
+
         layout.addWidget(self.tabs, 1)
 
         return panel
 
     # --- Data & Refresh ---
 
+    def _request_refresh(self):
+        """Schedule a refresh; requests made in the same event-loop tick merge."""
+        self._refresh_timer.start()
+
+    def is_settled(self) -> bool:
+        """True when no refresh, prefetch or write is outstanding."""
+        return not (
+            self._refresh_timer.isActive() or self._prefetch_timer.isActive() or self._cache.has_pending()
+        )
+
+    def set_hud_visible(self, visible: bool):
+        """Show refresh time, queries per refresh and cache hit rates in the status bar."""
+        self.hud.setVisible(visible)
+        if visible:
+            self._update_hud()
+
+    def _update_hud(self):
+        self.hud.show_refresh(
+            self.last_refresh_ms,
+            self.last_refresh_queries,
+            (self._cache.hits, self._cache.misses),
+            (self.db.aggregate_cache.hits, self.db.aggregate_cache.misses),
+        )
+
     def _refresh_data(self):
-        self._refresh_day_view()
-        self._refresh_week_view()
-        self._refresh_combos()
-        self._update_totals()
+        self._refresh_timer.stop()
+        instrumentation = self.db.instrumentation
+        queries = instrumentation.thread_statement_count() if instrumentation else 0
+        started = time.perf_counter()
+
+        previous = self._snapshot
+        snapshot = build_snapshot(self._cache, self.date_nav.selected_date)
+        self._snapshot = snapshot
+
+        same_day = previous is not None and previous.day == snapshot.day
+        same_week = previous is not None and previous.week_start == snapshot.week_start
+        if not (same_day and previous.day_groups == snapshot.day_groups):
+            self._refresh_day_view(snapshot)
+        if not (same_week and previous.week_rows == snapshot.week_rows):
+            self._refresh_week_view(snapshot)
+        if not (same_day and previous.recents == snapshot.recents
+                and previous.day_groups == snapshot.day_groups):
+            self._refresh_combos(snapshot)
+        self._update_totals(snapshot)
+
+        self.last_refresh_ms = (time.perf_counter() - started) * 1000
+        if instrumentation:
+            self.last_refresh_queries = instrumentation.thread_statement_count() - queries
+        if not self.hud.isHidden():
+            self._update_hud()
+        self.refreshed.emit(self.last_refresh_ms)
+        self._prefetch_timer.start()
+
+    def _refresh_day_view(self, snapshot: ViewSnapshot):
+        self.day_model.set_groups(snapshot.day_groups)
+
+    def _refresh_week_view(self, snapshot: ViewSnapshot):
+        self.week_model.set_week(
+            snapshot.week_start, snapshot.week_rows, snapshot.week_day_totals, snapshot.week_total,
+        )
 
-    def _refresh_day_view(self):
-        self.day_tree.clear()
-        day = self.date_nav.selected_date
-        entries = self.db.get_entries_for_date(day)
-
-        # Group by (psp, type, desc)
-        groups: dict[tuple, list[TimeEntry]] = {}
-        for entry in entries:
-            key = (entry.psp, entry.activity_type, entry.description)
-            groups.setdefault(key, []).append(entry)
-
-        for (psp, act_type, desc), group_entries in groups.items():
-            # Add individual entry rows
-            for entry in group_entries:
-                time_info = ""
-                if entry.start_time and entry.end_time:
-                    time_info = f"{entry.start_time}\u2013{entry.end_time}"
-                item = QTreeWidgetItem([
-                    entry.psp,
-                    entry.activity_type,
-                    entry.description,
-                    time_info if time_info else "\u2013",
-                    f"{entry.hours:.2f}",
-                ])
-                item.setData(0, Qt.UserRole, entry.id)
-                self.day_tree.addTopLevelItem(item)
-
-            # Add group summary row only when 2+ entries share the same key
-            if len(group_entries) > 1:
-                group_hours = sum(e.hours for e in group_entries)
-                summary = QTreeWidgetItem([
-                    "",
-                    "",
-                    f"Summe: {desc}",
-                    "",
-                    f"{group_hours:.2f}",
-                ])
-                summary.setFlags(summary.flags() & ~Qt.ItemIsSelectable)
-                font = summary.font(0)
-                font.setBold(True)
-                group_brush = QBrush(QColor(theme.GROUP_ROW))
-                for col in range(5):
-                    summary.setFont(col, font)
-                    summary.setBackground(col, group_brush)
-                self.day_tree.addTopLevelItem(summary)
-
-    def _refresh_week_view(self):
-        self.week_tree.clear()
-        day = self.date_nav.selected_date
-        week_data = self.db.get_entries_for_week(day)
-        start_of_week = day - timedelta(days=day.weekday())
-
-        # Aggregate by (psp, type, desc) across the week
-        aggregated: dict[tuple, list[float]] = {}
-        for d, entries in sorted(week_data.items()):
-            day_index = (d - start_of_week).days
-            for entry in entries:
-                key = (entry.psp, entry.activity_type, entry.description)
-                if key not in aggregated:
-                    aggregated[key] = [0.0] * 7
-                aggregated[key][day_index] += entry.hours
-
-        for (psp, act_type, desc), daily_hours in aggregated.items():
-            total = sum(daily_hours)
-            row_data = [psp, act_type, desc]
-            for h in daily_hours:
-                row_data.append(f"{h:.2f}" if h > 0 else "")
-            row_data.append(f"{total:.2f}")
-            item = QTreeWidgetItem(row_data)
-            # Bold the total
-            font = item.font(10)
-            font.setBold(True)
-            item.setFont(10, font)
-            self.week_tree.addTopLevelItem(item)
-
-        # Totals row
-        day_totals = [0.0] * 7
-        for daily_hours in aggregated.values():
-            for i, h in enumerate(daily_hours):
-                day_totals[i] += h
-        grand_total = sum(day_totals)
-        total_row = ["", "", "Summe"]
-        for h in day_totals:
-            total_row.append(f"{h:.2f}" if h > 0 else "")
-        total_row.append(f"{grand_total:.2f}")
-        total_item = QTreeWidgetItem(total_row)
-        font = total_item.font(0)
-        font.setBold(True)
-        for col in range(11):
-            total_item.setFont(col, font)
-        self.week_tree.addTopLevelItem(total_item)
-
-        # Update week header with dates
-        for i in range(7):
-            d = start_of_week + timedelta(days=i)
-            self.week_tree.headerItem().setText(3 + i, f"{GERMAN_DAYS_SHORT[i]}\n{d.day:02d}.{d.month:02d}")
-
-    def _refresh_combos(self):
-        self.psp_combo.set_items(self.db.get_recent_values("psp"))
-        self.type_combo.set_items(self.db.get_recent_values("activity_type"))
-        day = self.date_nav.selected_date
-        entries = self.db.get_entries_for_date(day)
-        descs = list(dict.fromkeys(e.description for e in entries if e.description))
-        self.desc_combo.set_items(descs or self.db.get_recent_values("description"))
+    def _refresh_combos(self, snapshot: ViewSnapshot):
+        self.psp_combo.set_items(list(snapshot.recent("psp")))
+        self.type_combo.set_items(list(snapshot.recent("activity_type")))
+        descs = list(dict.fromkeys(e.description for e in snapshot.day_entries if e.description))
+        self.desc_combo.set_items(descs or list(snapshot.recent("description")))
 
     def _refresh_presets(self):
         self._presets = self.db.get_presets()
@@ -547,10 +545,9 @@ class MainWindow(QMainWindow):
         for preset in self._presets:
             self.preset_combo.addItem(preset.display_name, preset.id)
 
-    def _update_totals(self):
-        day = self.date_nav.selected_date
-        day_total = self.db.get_day_total(day)
-        week_total = self.db.get_week_total(day)
+    def _update_totals(self, snapshot: ViewSnapshot):
+        day_total = snapshot.day_total
+        week_total = snapshot.week_total
         self.day_total_label.setText(f"Summe Tag: {day_total:.2f} h")
         self.week_total_label.setText(f"Woche: {week_total:.2f} h")
 
@@ -567,21 +564,35 @@ class MainWindow(QMainWindow):
     def _on_date_changed(self, new_date: date):
         self._editing_entry = None
         self._toggle_edit_mode(False)
-        self._refresh_data()
+        self._request_refresh()
+
+    def _on_tab_changed(self, index: int):
+        # Hits may have been edited or deleted since the search ran
+        if self.tabs.widget(index) is self.search_panel:
+            self.search_panel.refresh()
+
+    def _focus_search(self):
+        self.tabs.setCurrentWidget(self.search_panel)
+        self.search_panel.search_edit.setFocus()
+        self.search_panel.search_edit.selectAll()
+
+    def _jump_to_entry(self, entry: TimeEntry):
+        """Show the day of a search hit."""
+        self.date_nav.selected_date = entry.date
+        self.tabs.setCurrentIndex(0)
 
     def _on_entry_selected(self, current, previous):
         """Handle selection change - only clears edit mode, doesn't load entry."""
         # Single click just selects, double-click loads for editing
         pass
 
-    def _on_entry_double_clicked(self, item, column):
+    def _on_entry_double_clicked(self, index):
         """Handle double-click to load entry for editing."""
-        entry_id = item.data(0, Qt.UserRole)
-        if entry_id is None:
-            return  # Summary row, not an entry
+        entry_id = self.day_model.entry_id(index)
+        if entry_id is None or entry_id < 0:
+            return  # Summary row or entry that is still being saved
 
-        entries = self.db.get_entries_for_date(self.date_nav.selected_date)
-        entry = next((e for e in entries if e.id == entry_id), None)
+        entry = self._snapshot.find_entry(entry_id)
         if entry is None:
             return
 
@@ -651,16 +662,15 @@ class MainWindow(QMainWindow):
             if not start or not end:
                 QMessageBox.warning(self, "Eingabe", "Bitte Start- und Endzeit angeben.")
                 return None
-            try:
-                start_dt = datetime.strptime(start, "%H:%M")
-                end_dt = datetime.strptime(end, "%H:%M")
-            except ValueError:
+            start_minute = parse_time_of_day(start)
+            end_minute = parse_time_of_day(end)
+            if start_minute is None or end_minute is None:
                 QMessageBox.warning(self, "Eingabe", "Zeitformat muss HH:MM sein.")
                 return None
-            if end_dt <= start_dt:
+            if end_minute <= start_minute:
                 QMessageBox.warning(self, "Eingabe", "Ende muss nach Start liegen.")
                 return None
-            hours = (end_dt - start_dt).total_seconds() / 3600
+            hours = (end_minute - start_minute) / 60
         else:
             hours = self.hours_spin.value()
             if hours <= 0:
@@ -687,35 +697,62 @@ class MainWindow(QMainWindow):
             return
 
         if self._editing_entry:
-            self.db.update_entry(entry)
+            self._submit_write("update_entry", PendingWrite("update", entry, self._editing_entry.date))
             self._show_status("Eintrag aktualisiert.")
         else:
-            self.db.add_entry(entry)
+            self._submit_write("add_entry", PendingWrite("add", entry))
             self._show_status("Eintrag hinzugefügt.")
 
         self._reset_form()
-        self._refresh_data()
 
     def _delete_entry(self):
         if not self._editing_entry:
-            current = self.day_tree.currentItem()
-            if not current or current.data(0, Qt.UserRole) is None:
+            entry_id = self.day_model.entry_id(self.day_tree.currentIndex())
+            if entry_id is None:
                 QMessageBox.information(self, "Löschen", "Bitte einen Eintrag zum Löschen auswählen.")
                 return
-            entry_id = current.data(0, Qt.UserRole)
         else:
             entry_id = self._editing_entry.id
 
+        entry = self._snapshot.find_entry(entry_id)
+        if entry is None or entry_id < 0:
+            self._show_status("Eintrag wird noch gespeichert.")
+            return
+
         reply = QMessageBox.question(
             self, "Löschen", "Eintrag wirklich löschen?",
             QMessageBox.Yes | QMessageBox.No,
         )
         if reply == QMessageBox.Yes:
-            self.db.delete_entry(entry_id)
+            self._submit_write("delete_entry", PendingWrite("delete", entry))
             self._reset_form()
-            self._refresh_data()
             self._show_status("Eintrag gelöscht.")
 
+    def _submit_write(self, method: str, write: PendingWrite):
+        """Show a write immediately and commit it on the worker thread."""
+        token = self._cache.add_pending(write)
+        arg = write.entry.id if write.kind == "delete" else write.entry
+        future = self._db_worker.submit(
+            method, arg, callback=lambda future: self._on_write_finished(token, future),
+        )
+        if write.kind == "add":
+            def committed(future):
+                # Runs on the worker thread, before the finished callback is queued
+                if not future.cancelled() and future.exception() is None:
+                    self._cache.mark_committed(token, future.result())
+
+            future.add_done_callback(committed)
+        self._request_refresh()
+
+    def _on_write_finished(self, token: int, future):
+        """Reconcile the optimistic view with the committed state."""
+        self._cache.resolve_pending(token)
+        error = future.exception()
+        if error is not None:
+            self._cache.clear()
+            QMessageBox.warning(self, "Fehler", f"Eintrag konnte nicht gespeichert werden:\n{error}")
+        self._request_refresh()
+
     def _reset_form(self):
         self._editing_entry = None
         self.preset_combo.setCurrentIndex(0)
@@ -772,17 +809,16 @@ class MainWindow(QMainWindow):
     # --- SAP ITP Copy ---
 
     def _copy_for_sap(self):
-        current = self.day_tree.currentItem()
-        if not current:
+        current = self.day_tree.currentIndex()
+        if not current.isValid():
             QMessageBox.information(self, "Kopieren", "Bitte einen Eintrag auswählen.")
             return
 
-        entry_id = current.data(0, Qt.UserRole)
+        entry_id = self.day_model.entry_id(current)
         if entry_id is None:
             return  # Summary row, not an entry
 
-        entries = self.db.get_entries_for_date(self.date_nav.selected_date)
-        entry = next((e for e in entries if e.id == entry_id), None)
+        entry = self._snapshot.find_entry(entry_id)
         if not entry:
             return
         text = self._entry_to_sap_line(entry)
@@ -791,7 +827,7 @@ class MainWindow(QMainWindow):
         self._show_status("In Zwischenablage kopiert.")
 
     def _copy_day_for_sap(self):
-        entries = self.db.get_entries_for_date(self.date_nav.selected_date)
+        entries = self._snapshot.day_entries
         if not entries:
             QMessageBox.information(self, "Kopieren", "Keine Einträge für diesen Tag.")
             return
@@ -801,6 +837,8 @@ class MainWindow(QMainWindow):
         self._show_status(f"{len(entries)} Einträge in Zwischenablage kopiert.")
 
     def _open_sap_export(self):
+        from .sap_export_dialog import SapExportDialog  # loads pynput; keep it off the startup path
+
         dialog = SapExportDialog(self.db, self.date_nav.selected_date, self)
         if dialog.exec():
             self._show_status("SAP ITP Daten in Zwischenablage kopiert.")
@@ -833,10 +871,22 @@ class MainWindow(QMainWindow):
         self.status_bar.showMessage(msg, duration)
 
     def _open_preset_manager(self):
+        from .preset_dialog import PresetManagerDialog
+
         dialog = PresetManagerDialog(self.db, self)
         dialog.presets_changed.connect(self._refresh_presets)
         dialog.exec()
 
+    def closeEvent(self, event):
+        # Flush queued writes before the application exits
+        self._db_worker.close()
+        for combo in (self.psp_combo, self.type_combo, self.desc_combo):
+            combo.history_completer.shutdown()
+        self.search_panel.shutdown()
+        super().closeEvent(event)
+
     def _open_statistics(self):
+        from .statistics_dialog import StatisticsDialog
+
         dialog = StatisticsDialog(self.db, self.date_nav.selected_date, self)
         dialog.exec()
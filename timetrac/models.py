@@ -3,9 +3,12 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from datetime import date, time
+from datetime import date
 from enum import Enum
 
+# Longest Kurztext SAP ITP accepts
+KURZTEXT_MAX_LENGTH = 40
+
 
 class TimeMode(Enum):
     RANGE = "range"
@@ -52,3 +55,60 @@ class DaySummary:
     date: date
     total_hours: float
     entries: list[TimeEntry] = field(default_factory=list)
+
+
+@dataclass
+class PeriodStatistics:
+    """Hours of a date range by PSP, as shown in the statistics dialog."""
+
+    start: date
+    end: date
+    detailed: list[dict]  # psp, activity_type, hours, billable; by hours descending
+    merged: list[dict]  # psp, hours, billable; by hours descending
+    billable_hours: float
+    non_billable_hours: float
+    working_days: int
+
+    @property
+    def total_hours(self) -> float:
+        return self.billable_hours + self.non_billable_hours
+
+    @property
+    def average(self) -> float:
+        return self.total_hours / self.working_days if self.working_days > 0 else 0.0
+
+
+def hours_to_seconds(hours: float) -> int:
+    """Hours as whole seconds; exact for minutes and for hundredths of an hour."""
+    return round(hours * 3600)
+
+
+def seconds_to_hours(seconds: int) -> float:
+    return seconds / 3600
+
+
+def parse_time_of_day(text: str) -> int | None:
+    """Minute of the day for ``"HH:MM"``, or ``None`` if ``text`` is empty or invalid."""
+    hh, sep, mm = text.partition(":")
+    if not sep or not (hh.isdigit() and mm.isdigit()) or len(hh) > 2 or len(mm) > 2:
+        return None
+    hour, minute = int(hh), int(mm)
+    if hour > 23 or minute > 59:
+        return None
+    return hour * 60 + minute
+
+
+def format_time_of_day(minute: int | None) -> str:
+    """``"HH:MM"`` for a minute of the day; empty for ``None``."""
+    if minute is None:
+        return ""
+    return f"{minute // 60:02d}:{minute % 60:02d}"
+
+
+def count_working_days(start: date, end: date) -> int:
+    """Number of Monday–Friday days in ``start..end`` (inclusive)."""
+    if end < start:
+        return 0
+    full_weeks, rest = divmod((end - start).days + 1, 7)
+    first = start.weekday()
+    return full_weeks * 5 + sum(1 for i in range(rest) if (first + i) % 7 < 5)
@@ -0,0 +1,130 @@
+"""Per-action cProfile capture, to reproduce "X is slow" reports."""
+
+from __future__ import annotations
+
+import cProfile
+import functools
+import inspect
+import io
+import pstats
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+
+def _positional_limit(func: Callable) -> int | None:
+    """Positional parameters ``func`` takes, or ``None`` if it takes ``*args``."""
+    params = inspect.signature(func).parameters.values()
+    if any(p.kind is p.VAR_POSITIONAL for p in params):
+        return None
+    return sum(p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD) for p in params)
+
+
+class ActionProfiler:
+    """Profiles user actions with cProfile, one ``.pstats`` file per call.
+
+    ``install`` wraps methods of a class so that every call is profiled
+    under an action name; without an installed profiler nothing is wrapped
+    and nothing is paid. Files are written to ``directory`` as
+    ``<session>-<sequence>-<action>.pstats``; beyond ``max_files`` files or
+    ``max_bytes`` in total the oldest are deleted. ``write_summary`` rolls
+    all calls up per action into ``summary.txt``.
+
+    Only the GUI thread's work is profiled. An action triggered while
+    another one is being profiled (e.g. from a modal dialog) counts
+    towards the outer one.
+    """
+
+    def __init__(self, directory: Path, top_n: int = 25, max_files: int = 500, max_bytes: int = 100_000_000):
+        self.directory = directory
+        self.top_n = top_n
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._session = datetime.now().strftime("%Y%m%d-%H%M%S")
+        self._sequence = 0
+        self._active = False
+        self._installed: list[tuple[type, str, Callable]] = []
+        self._timings: dict[str, list[float]] = {}
+        self._merged: dict[str, pstats.Stats] = {}
+
+    def install(self, cls: type, actions: dict[str, str]):
+        """Profile calls of ``cls``'s methods; ``actions`` maps method names to action names.
+
+        Install before the instances are created, so signal connections
+        made in their constructors pick up the wrapped methods.
+        """
+        for method_name, action in actions.items():
+            original = getattr(cls, method_name)
+            self._installed.append((cls, method_name, original))
+            setattr(cls, method_name, self._wrap(action, original))
+
+    def uninstall(self):
+        while self._installed:
+            cls, method_name, original = self._installed.pop()
+            setattr(cls, method_name, original)
+
+    def _wrap(self, action: str, method: Callable) -> Callable:
+        # Qt passes signal arguments a slot can take; the wrapper takes all of them
+        limit = _positional_limit(method)
+
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            return self.profile(action, method, *args[:limit], **kwargs)
+
+        return wrapper
+
+    def profile(self, action: str, func: Callable, *args, **kwargs):
+        """Call ``func``, profiled as ``action`` unless a profile is already running."""
+        if self._active:
+            return func(*args, **kwargs)
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            return func(*args, **kwargs)  # another profiler, e.g. ``python -m cProfile``, is active
+        self._active = True
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler.disable()
+            self._active = False
+            self._record(action, profiler, (time.perf_counter() - started) * 1000)
+
+    def _record(self, action: str, profiler: cProfile.Profile, elapsed_ms: float):
+        self._sequence += 1
+        profiler.dump_stats(self.directory / f"{self._session}-{self._sequence:05d}-{action}.pstats")
+        self._prune()
+        self._timings.setdefault(action, []).append(elapsed_ms)
+        if action in self._merged:
+            self._merged[action].add(profiler)
+        else:
+            self._merged[action] = pstats.Stats(profiler)
+
+    def _prune(self):
+        files = sorted(self.directory.glob("*.pstats"), key=lambda path: path.stat().st_mtime)
+        total = sum(path.stat().st_size for path in files)
+        while files and (len(files) > self.max_files or total > self.max_bytes):
+            oldest = files.pop(0)
+            total -= oldest.stat().st_size
+            oldest.unlink()
+
+    def write_summary(self) -> Path:
+        """Write per-action timings and top functions to ``summary.txt``; returns its path."""
+        out = io.StringIO()
+        out.write(f"TimeTrac profile, session {self._session}\n\n")
+        out.write(f"{'action':<24}{'calls':>7}{'total ms':>12}{'mean ms':>10}{'max ms':>10}\n")
+        ranked = sorted(self._timings.items(), key=lambda item: sum(item[1]), reverse=True)
+        for action, timings in ranked:
+            out.write(f"{action:<24}{len(timings):>7}{sum(timings):>12.1f}"
+                      f"{sum(timings) / len(timings):>10.1f}{max(timings):>10.1f}\n")
+        for action, _timings in ranked:
+            out.write(f"\n=== {action}: top {self.top_n} by cumulative time ===\n")
+            stats = self._merged[action]
+            stats.stream = out
+            stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top_n)
+        path = self.directory / "summary.txt"
+        path.write_text(out.getvalue(), encoding="utf-8")
+        return path
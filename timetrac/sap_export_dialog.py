@@ -6,7 +6,6 @@ import threading
 import time
 from datetime import date
 
-from pynput import keyboard
 from PySide6.QtCore import Qt, QTimer
 from PySide6.QtGui import QKeySequence, QShortcut
 from PySide6.QtWidgets import (
@@ -28,9 +27,7 @@ from PySide6.QtWidgets import (
 
 from . import theme
 from .database import Database
-
-# ITP limits
-KURZTEXT_MAX_LENGTH = 40
+from .models import KURZTEXT_MAX_LENGTH
 
 GERMAN_DAYS_SHORT = ["Mo", "Di", "Mi", "Do", "Fr"]
 GERMAN_DAYS_FULL = [
@@ -478,7 +475,6 @@ class SapExportDialog(QDialog):
 
     def _run_automation(self):
         """Execute the keyboard automation sequence (runs in background thread)."""
-        keyboard_controller = keyboard.Controller()
         weekday_index = self._selected_date.weekday()
 
         # Calculate tabs needed to reach day column
@@ -488,6 +484,11 @@ class SapExportDialog(QDialog):
             return  # Weekend, no entries
 
         try:
+            # pynput loads its platform backend on import; only automation needs it
+            from pynput import keyboard
+
+            keyboard_controller = keyboard.Controller()
+
             # Countdown before starting
             for i in range(self.START_DELAY, 0, -1):
                 if not self._automation_running:
@@ -561,7 +562,9 @@ class SapExportDialog(QDialog):
             self._finish_automation()
 
         except Exception as e:
-            QTimer.singleShot(0, lambda: self._show_automation_error(str(e)))
+            # ``e`` is unbound once the except block ends, before the timer fires
+            msg = str(e)
+            QTimer.singleShot(0, lambda msg=msg: self._show_automation_error(msg))
             self._finish_automation()
 
     def _update_automation_status(self, index: int, desc: str):
@@ -0,0 +1,165 @@
+"""Full-text search over all time entries, queried off the GUI thread."""
+
+from __future__ import annotations
+
+from PySide6.QtCore import Qt, QTimer, Signal
+from PySide6.QtWidgets import (
+    QHeaderView,
+    QLabel,
+    QLineEdit,
+    QTreeWidget,
+    QTreeWidgetItem,
+    QVBoxLayout,
+    QWidget,
+)
+
+from .database import Database
+from .jobs import DatabaseJob, JobCancelled, LatestJobRunner
+from .models import TimeEntry
+
+
+class EntrySearchJob(DatabaseJob):
+    """One page of ``Database.search_entries`` as a ``DatabaseJob``."""
+
+    def __init__(self, db: Database, query: str, limit: int, after: TimeEntry | None):
+        super().__init__(db)
+        self.query = query
+        self.limit = limit
+        self.after = after
+
+    def work(self) -> list[TimeEntry]:
+        with self.db.interruptible(self.is_cancelled):
+            return self.db.search_entries(self.query, self.limit, self.after)
+
+
+class SearchPanel(QWidget):
+    """Search field with a result list, most recently entered hits first.
+
+    Results are fetched a page at a time off the GUI thread; scrolling to
+    the end of the list loads the next page. A new search drops the pages
+    still coming for the previous one. Double-clicking a hit emits
+    ``entry_activated``.
+    """
+
+    entry_activated = Signal(object)  # emits TimeEntry
+
+    PAGE_SIZE = 50
+    DEBOUNCE_MS = 150
+
+    def __init__(self, db: Database, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self._query = ""
+        self._hits: list[TimeEntry] = []
+        self._exhausted = True
+        self._runner = LatestJobRunner(self)
+        self._runner.finished.connect(self._on_page)
+
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(self.DEBOUNCE_MS)
+        self._debounce.timeout.connect(lambda: self.search(self.search_edit.text()))
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 10, 0, 0)
+
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("Beschreibung, PSP oder Leistungsart suchen …")
+        self.search_edit.setClearButtonEnabled(True)
+        self.search_edit.textChanged.connect(lambda: self._debounce.start())
+        self.search_edit.returnPressed.connect(lambda: self.search(self.search_edit.text()))
+        layout.addWidget(self.search_edit)
+
+        self.result_tree = QTreeWidget()
+        self.result_tree.setHeaderLabels(["Datum", "PSP", "Leistungsart", "Beschreibung", "Stunden"])
+        self.result_tree.setRootIsDecorated(False)
+        self.result_tree.setUniformRowHeights(True)
+        self.result_tree.setAlternatingRowColors(True)
+        self.result_tree.header().setStretchLastSection(False)
+        self.result_tree.header().setSectionResizeMode(3, QHeaderView.Stretch)
+        self.result_tree.header().setSectionResizeMode(4, QHeaderView.ResizeToContents)
+        self.result_tree.itemDoubleClicked.connect(self._on_item_double_clicked)
+        self.result_tree.verticalScrollBar().valueChanged.connect(self._on_scrolled)
+        layout.addWidget(self.result_tree, 1)
+
+        self.status_label = QLabel("")
+        self.status_label.setObjectName("subtitle")
+        layout.addWidget(self.status_label)
+
+    @property
+    def hits(self) -> list[TimeEntry]:
+        return list(self._hits)
+
+    def search(self, query: str):
+        """Show the first page of hits for ``query``."""
+        self._debounce.stop()
+        self._runner.cancel()
+        self._query = query.strip()
+        self._hits = []
+        self._exhausted = False
+        self.result_tree.clear()
+        self.load_more()
+
+    def refresh(self):
+        """Re-run the current search, e.g. after entries changed."""
+        if self._query:
+            self.search(self._query)
+
+    def load_more(self):
+        """Start fetching the next page of hits, if any."""
+        if self._exhausted or self._runner.is_running():
+            return
+        if not self._query:
+            self._exhausted = True
+            self._update_status()
+            return
+        after = self._hits[-1] if self._hits else None
+        self._runner.start(EntrySearchJob(self.db, self._query, self.PAGE_SIZE, after))
+
+    def is_searching(self) -> bool:
+        return self._debounce.isActive() or self._runner.is_running()
+
+    def shutdown(self):
+        """Stop pending work; call before the database is closed."""
+        self._debounce.stop()
+        self._runner.shutdown()
+
+    def _on_page(self, _job: EntrySearchJob, outcome):
+        if isinstance(outcome, JobCancelled):
+            return
+        if isinstance(outcome, Exception):
+            self._exhausted = True
+            self.status_label.setText(f"Suche fehlgeschlagen: {outcome}")
+            return
+        page: list[TimeEntry] = outcome
+        self._exhausted = len(page) < self.PAGE_SIZE
+        self._hits.extend(page)
+        for entry in page:
+            item = QTreeWidgetItem([
+                entry.date.strftime("%d.%m.%Y"),
+                entry.psp,
+                entry.activity_type,
+                entry.description,
+                f"{entry.hours:.2f}",
+            ])
+            item.setTextAlignment(4, Qt.AlignRight | Qt.AlignVCenter)
+            item.setData(0, Qt.UserRole, entry)
+            self.result_tree.addTopLevelItem(item)
+        self._update_status()
+
+    def _update_status(self):
+        if not self._query:
+            self.status_label.setText("")
+        elif not self._hits:
+            self.status_label.setText("Keine Treffer")
+        elif self._exhausted:
+            self.status_label.setText(f"{len(self._hits)} Treffer")
+        else:
+            self.status_label.setText(f"{len(self._hits)}+ Treffer – weiterscrollen für mehr")
+
+    def _on_scrolled(self, value: int):
+        if value == self.result_tree.verticalScrollBar().maximum():
+            self.load_more()
+
+    def _on_item_double_clicked(self, item: QTreeWidgetItem, _column: int):
+        self.entry_activated.emit(item.data(0, Qt.UserRole))
@@ -0,0 +1,108 @@
+"""Immutable view snapshot the main window renders from."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+
+from .cache import WeekCache, week_start
+from .models import TimeEntry, hours_to_seconds, seconds_to_hours
+
+RECENT_FIELDS = ("psp", "activity_type", "description")
+
+GroupKey = tuple[str, str, str]  # (psp, activity_type, description)
+
+
+@dataclass(frozen=True)
+class DayGroup:
+    """Entries of one day sharing the same (psp, activity type, description)."""
+
+    key: GroupKey
+    entries: tuple[TimeEntry, ...]
+    hours: float
+
+
+@dataclass(frozen=True)
+class WeekRow:
+    """One (psp, activity type, description) row of the weekly pivot."""
+
+    key: GroupKey
+    daily_hours: tuple[float, ...]  # Mo..So
+    total: float
+
+
+@dataclass(frozen=True)
+class ViewSnapshot:
+    """Everything the day view, week view, combos and totals display.
+
+    Built in one pass by ``build_snapshot`` so a refresh reads the data
+    source once and every view renders from the same consistent state.
+    """
+
+    day: date
+    week_start: date
+    day_entries: tuple[TimeEntry, ...]
+    day_groups: tuple[DayGroup, ...]
+    week_rows: tuple[WeekRow, ...]
+    week_day_totals: tuple[float, ...]  # Mo..So
+    recents: tuple[tuple[str, ...], ...]  # aligned with RECENT_FIELDS
+
+    @property
+    def day_total(self) -> float:
+        return self.week_day_totals[self.day.weekday()]
+
+    @property
+    def week_total(self) -> float:
+        return seconds_to_hours(sum(hours_to_seconds(h) for h in self.week_day_totals))
+
+    def recent(self, field: str) -> tuple[str, ...]:
+        return self.recents[RECENT_FIELDS.index(field)]
+
+    def find_entry(self, entry_id: int) -> TimeEntry | None:
+        return next((e for e in self.day_entries if e.id == entry_id), None)
+
+
+def build_snapshot(cache: WeekCache, day: date) -> ViewSnapshot:
+    """Assemble the snapshot for ``day`` from the cache in a single pass."""
+    start = week_start(day)
+    week = cache.week(day)
+
+    day_entries = tuple(week.get(day, ()))
+    groups: dict[GroupKey, list[TimeEntry]] = {}
+    for entry in day_entries:
+        groups.setdefault((entry.psp, entry.activity_type, entry.description), []).append(entry)
+
+    # Sum in whole seconds so totals carry no float drift
+    aggregated: dict[GroupKey, list[int]] = {}
+    day_totals = [0] * 7
+    for d, entries in sorted(week.items()):
+        day_index = (d - start).days
+        for entry in entries:
+            key = (entry.psp, entry.activity_type, entry.description)
+            seconds = hours_to_seconds(entry.hours)
+            aggregated.setdefault(key, [0] * 7)[day_index] += seconds
+            day_totals[day_index] += seconds
+
+    return ViewSnapshot(
+        day=day,
+        week_start=start,
+        day_entries=day_entries,
+        day_groups=tuple(
+            DayGroup(
+                key=key,
+                entries=tuple(entries),
+                hours=seconds_to_hours(sum(hours_to_seconds(e.hours) for e in entries)),
+            )
+            for key, entries in groups.items()
+        ),
+        week_rows=tuple(
+            WeekRow(
+                key=key,
+                daily_hours=tuple(seconds_to_hours(s) for s in seconds),
+                total=seconds_to_hours(sum(seconds)),
+            )
+            for key, seconds in aggregated.items()
+        ),
+        week_day_totals=tuple(seconds_to_hours(s) for s in day_totals),
+        recents=tuple(tuple(cache.recent_values(field)) for field in RECENT_FIELDS),
+    )
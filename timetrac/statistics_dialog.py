@@ -2,18 +2,21 @@
 
 from __future__ import annotations
 
+import time
 from datetime import date, timedelta
 
-from PySide6.QtCore import Qt, QPropertyAnimation, QEasingCurve, QRect
+from PySide6.QtCore import Qt, QPropertyAnimation, QEasingCurve, QRect, Signal
 from PySide6.QtGui import QColor, QPainter, QPen, QBrush, QFont
 from PySide6.QtWidgets import (
     QComboBox,
     QDateEdit,
     QDialog,
     QFrame,
+    QGraphicsOpacityEffect,
     QHBoxLayout,
     QHeaderView,
     QLabel,
+    QMessageBox,
     QPushButton,
     QSizePolicy,
     QTreeWidget,
@@ -24,6 +27,8 @@ from PySide6.QtWidgets import (
 
 from . import theme
 from .database import Database
+from .jobs import JobCancelled, LatestJobRunner
+from .statistics_worker import StatisticsJob, StatisticsResult
 
 
 # ── Horizontal bar chart widget (pure QPainter, no external deps) ──
@@ -187,12 +192,26 @@ class DonutWidget(QWidget):
 # ── Main statistics dialog ──
 
 class StatisticsDialog(QDialog):
-    """Dialog showing time statistics by PSP with billable breakdown."""
+    """Dialog showing time statistics by PSP with billable breakdown.
+
+    Statistics are computed by a ``StatisticsJob`` off the GUI thread.
+    A new request cancels the one in flight; until its result arrives the
+    previous one stays visible, greyed out.
+    """
+
+    stats_refreshed = Signal(float)  # emits request-to-display time in milliseconds
+
+    PERIOD_WEEK, PERIOD_MONTH, PERIOD_YEAR, PERIOD_CUSTOM = range(4)
 
     def __init__(self, db: Database, current_date: date, parent=None):
         super().__init__(parent)
         self.db = db
         self._current_date = current_date
+        self._runner = LatestJobRunner(self)
+        self._runner.finished.connect(self._on_stats_finished)
+        self._job_started = 0.0
+        self.last_result: StatisticsResult | None = None
+        self.last_refresh_ms = 0.0
         self.setWindowTitle("Statistik")
         self.setMinimumSize(900, 620)
         self.resize(1000, 700)
@@ -218,7 +237,7 @@ class StatisticsDialog(QDialog):
 
         period_layout.addWidget(QLabel("Zeitraum:"))
         self.period_combo = QComboBox()
-        self.period_combo.addItems(["Diese Woche", "Dieser Monat", "Benutzerdefiniert"])
+        self.period_combo.addItems(["Diese Woche", "Dieser Monat", "Dieses Jahr", "Benutzerdefiniert"])
         self.period_combo.currentIndexChanged.connect(self._on_period_changed)
         period_layout.addWidget(self.period_combo)
 
@@ -240,7 +259,13 @@ class StatisticsDialog(QDialog):
         layout.addWidget(period_frame)
 
         # Stats content: chart + donut side by side
-        content = QHBoxLayout()
+        self._content = QWidget()
+        self._stale_effect = QGraphicsOpacityEffect(self._content)
+        self._stale_effect.setOpacity(0.45)
+        self._stale_effect.setEnabled(False)
+        self._content.setGraphicsEffect(self._stale_effect)
+        content = QHBoxLayout(self._content)
+        content.setContentsMargins(0, 0, 0, 0)
         content.setSpacing(16)
 
         # Left: bar chart + table
@@ -297,7 +322,7 @@ class StatisticsDialog(QDialog):
         right.addStretch()
 
         content.addLayout(right, 1)
-        layout.addLayout(content, 1)
+        layout.addWidget(self._content, 1)
 
         # Close button
         close_layout = QHBoxLayout()
@@ -326,40 +351,36 @@ class StatisticsDialog(QDialog):
 
         return card
 
-    def _get_date_range(self) -> tuple[date, date]:
-        idx = self.period_combo.currentIndex()
-        if idx == 0:  # This week
-            start = self._current_date - timedelta(days=self._current_date.weekday())
-            end = start + timedelta(days=6)
-        elif idx == 1:  # This month
-            start = self._current_date.replace(day=1)
+    def _period_range(self, idx: int) -> tuple[date, date]:
+        """Date range of the preset period at combo index ``idx`` (week for custom)."""
+        today = self._current_date
+        if idx == self.PERIOD_MONTH:
+            start = today.replace(day=1)
             # Last day of month
-            if self._current_date.month == 12:
-                end = self._current_date.replace(year=self._current_date.year + 1, month=1, day=1) - timedelta(days=1)
+            if today.month == 12:
+                end = today.replace(year=today.year + 1, month=1, day=1) - timedelta(days=1)
             else:
-                end = self._current_date.replace(month=self._current_date.month + 1, day=1) - timedelta(days=1)
-        else:  # Custom
-            start = self.start_date.date().toPython()
-            end = self.end_date.date().toPython()
+                end = today.replace(month=today.month + 1, day=1) - timedelta(days=1)
+        elif idx == self.PERIOD_YEAR:
+            start = date(today.year, 1, 1)
+            end = date(today.year, 12, 31)
+        else:  # This week
+            start = today - timedelta(days=today.weekday())
+            end = start + timedelta(days=6)
         return start, end
 
+    def _get_date_range(self) -> tuple[date, date]:
+        idx = self.period_combo.currentIndex()
+        if idx == self.PERIOD_CUSTOM:
+            return self.start_date.date().toPython(), self.end_date.date().toPython()
+        return self._period_range(idx)
+
     def _on_period_changed(self):
         idx = self.period_combo.currentIndex()
-        is_custom = idx == 2
+        is_custom = idx == self.PERIOD_CUSTOM
 
         # Set default dates for non-custom modes
-        if idx == 0:
-            start = self._current_date - timedelta(days=self._current_date.weekday())
-            end = start + timedelta(days=6)
-        elif idx == 1:
-            start = self._current_date.replace(day=1)
-            if self._current_date.month == 12:
-                end = self._current_date.replace(year=self._current_date.year + 1, month=1, day=1) - timedelta(days=1)
-            else:
-                end = self._current_date.replace(month=self._current_date.month + 1, day=1) - timedelta(days=1)
-        else:
-            start = self._current_date - timedelta(days=self._current_date.weekday())
-            end = start + timedelta(days=6)
+        start, end = self._period_range(idx)
 
         self.start_date.blockSignals(True)
         self.end_date.blockSignals(True)
@@ -373,20 +394,36 @@ class StatisticsDialog(QDialog):
         self._refresh_stats()
 
     def _on_custom_date_changed(self):
-        if self.period_combo.currentIndex() == 2:
+        if self.period_combo.currentIndex() == self.PERIOD_CUSTOM:
             self._refresh_stats()
 
     def _refresh_stats(self):
         start, end = self._get_date_range()
+        self._job_started = time.perf_counter()
+        self._stale_effect.setEnabled(self.last_result is not None)
+        self._runner.start(StatisticsJob(self.db, start, end))
+
+    def is_refreshing(self) -> bool:
+        return self._runner.is_running()
+
+    def _on_stats_finished(self, _job: StatisticsJob, outcome):
+        self._stale_effect.setEnabled(False)
+        if isinstance(outcome, JobCancelled):
+            return
+        if isinstance(outcome, Exception):
+            QMessageBox.warning(self, "Fehler", f"Statistik konnte nicht berechnet werden:\n{outcome}")
+            return
+        self._show_result(outcome)
+        self.last_refresh_ms = (time.perf_counter() - self._job_started) * 1000
+        self.stats_refreshed.emit(self.last_refresh_ms)
 
-        # Get merged data for chart
-        merged = self.db.get_hours_by_psp_merged(start, end)
-        self.bar_chart.set_data(merged)
+    def _show_result(self, result: StatisticsResult):
+        self.last_result = result
+        stats = result.stats
+        self.bar_chart.set_data(stats.merged)
 
-        # Get detailed data for table
-        detailed = self.db.get_hours_by_psp(start, end)
         self.detail_tree.clear()
-        for item_data in detailed:
+        for item_data in stats.detailed:
             billable_text = "Ja" if item_data["billable"] else "Nein"
             item = QTreeWidgetItem([
                 item_data["psp"] or "(kein PSP)",
@@ -396,24 +433,19 @@ class StatisticsDialog(QDialog):
             ])
             self.detail_tree.addTopLevelItem(item)
 
-        # Calculate summaries
-        total_hours = sum(d["hours"] for d in merged)
-        billable_hours = sum(d["hours"] for d in merged if d["billable"])
-        non_billable_hours = sum(d["hours"] for d in merged if not d["billable"])
-
-        # Count working days in range
-        days = (end - start).days + 1
-        working_days = sum(1 for i in range(days) if (start + timedelta(days=i)).weekday() < 5)
-        avg = total_hours / working_days if working_days > 0 else 0
-
         # Update summary cards
-        self._set_summary_value(self.total_label, f"{total_hours:.2f} h")
-        self._set_summary_value(self.billable_label, f"{billable_hours:.2f} h")
-        self._set_summary_value(self.non_billable_label, f"{non_billable_hours:.2f} h")
-        self._set_summary_value(self.avg_label, f"{avg:.2f} h")
+        self._set_summary_value(self.total_label, f"{stats.total_hours:.2f} h")
+        self._set_summary_value(self.billable_label, f"{stats.billable_hours:.2f} h")
+        self._set_summary_value(self.non_billable_label, f"{stats.non_billable_hours:.2f} h")
+        self._set_summary_value(self.avg_label, f"{stats.average:.2f} h")
+        self.avg_label.setToolTip(f"Berechnet in {result.elapsed_ms:.1f} ms")
 
         # Update donut
-        self.donut.set_data(billable_hours, non_billable_hours)
+        self.donut.set_data(stats.billable_hours, stats.non_billable_hours)
+
+    def done(self, result: int):
+        self._runner.shutdown()
+        super().done(result)
 
     def _set_summary_value(self, card: QFrame, text: str):
         value_label = card.findChild(QLabel, "summaryValue")
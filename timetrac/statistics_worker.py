@@ -0,0 +1,56 @@
+"""Statistics computation for ``StatisticsDialog``, run off the GUI thread."""
+
+from __future__ import annotations
+
+import sqlite3
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import Callable
+
+from .database import Database
+from .jobs import DatabaseJob, JobCancelled
+from .models import PeriodStatistics
+
+
+class StatisticsCancelled(JobCancelled):
+    """Raised inside a job when a newer request has superseded it."""
+
+
+@dataclass(frozen=True)
+class StatisticsResult:
+    stats: PeriodStatistics
+    elapsed_ms: float
+
+
+def compute_statistics(
+    db: Database, start: date, end: date, cancelled: Callable[[], bool] = lambda: False,
+) -> StatisticsResult:
+    """Run ``Database.get_statistics`` for ``start..end``, timed and cancellable.
+
+    ``cancelled`` is polled while SQLite executes; once it returns true the
+    running query is aborted and ``StatisticsCancelled`` is raised.
+    """
+    started = time.perf_counter()
+    try:
+        with db.interruptible(cancelled):
+            stats = db.get_statistics(start, end)
+    except sqlite3.OperationalError:
+        if cancelled():
+            raise StatisticsCancelled from None
+        raise
+    if cancelled():
+        raise StatisticsCancelled
+    return StatisticsResult(stats=stats, elapsed_ms=(time.perf_counter() - started) * 1000.0)
+
+
+class StatisticsJob(DatabaseJob):
+    """``compute_statistics`` as a ``DatabaseJob``; its result is a ``StatisticsResult``."""
+
+    def __init__(self, db: Database, start: date, end: date):
+        super().__init__(db)
+        self.start = start
+        self.end = end
+
+    def work(self) -> StatisticsResult:
+        return compute_statistics(self.db, self.start, self.end, self.is_cancelled)
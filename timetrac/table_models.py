@@ -0,0 +1,217 @@
+"""Item models for the main window's day and week tables.
+
+Both models are fed from a ``ViewSnapshot`` and update themselves by diffing
+the new rows against the current ones, so saving one entry results in a few
+row-level ``rowsInserted``/``rowsRemoved``/``dataChanged`` signals instead of a
+full reset. Views keep their selection and scroll position across edits, and
+all styling comes from ``data()`` roles instead of per-item fonts and brushes.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+from difflib import SequenceMatcher
+from typing import Hashable, Sequence
+
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt
+from PySide6.QtGui import QBrush, QColor, QFont
+
+from . import theme
+from .snapshot import DayGroup, WeekRow
+
+GERMAN_DAYS_SHORT = ["Mo", "Di", "Mi", "Do", "Fr", "Sa", "So"]
+
+
+@dataclass(frozen=True)
+class TableRow:
+    key: Hashable
+    cells: tuple[str, ...]
+    entry_id: int | None = None
+    summary: bool = False
+
+
+class DiffedTableModel(QAbstractTableModel):
+    """Flat table model whose rows are replaced via ``set_rows`` with a keyed diff."""
+
+    headers: Sequence[str] = ()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows: list[TableRow] = []
+        self._bold = QFont()
+        self._bold.setBold(True)
+
+    # --- Qt model interface ---
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.headers)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole and 0 <= section < len(self.headers):
+            return self.headers[section]
+        return None
+
+    def data(self, index: QModelIndex, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._rows[index.row()]
+        if role == Qt.DisplayRole:
+            return row.cells[index.column()]
+        if role == Qt.UserRole:
+            return row.entry_id
+        return self.style_data(row, index.column(), role)
+
+    def style_data(self, row: TableRow, column: int, role: int):
+        return None
+
+    # --- Row access ---
+
+    def row_at(self, index: QModelIndex) -> TableRow | None:
+        if not index.isValid() or index.row() >= len(self._rows):
+            return None
+        return self._rows[index.row()]
+
+    def entry_id(self, index: QModelIndex) -> int | None:
+        row = self.row_at(index)
+        return row.entry_id if row else None
+
+    def set_rows(self, rows: Sequence[TableRow]):
+        """Replace the model's rows, emitting only the signals for what changed."""
+        old_keys = [r.key for r in self._rows]
+        new_keys = [r.key for r in rows]
+        matcher = SequenceMatcher(None, old_keys, new_keys, autojunk=False)
+        # Left to right: after handling old[:i1] the model holds exactly new[:j1]
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == "equal":
+                self._update_range(rows, j1, j2)
+                continue
+            if tag in ("delete", "replace"):
+                self.beginRemoveRows(QModelIndex(), j1, j1 + (i2 - i1) - 1)
+                del self._rows[j1:j1 + (i2 - i1)]
+                self.endRemoveRows()
+            if tag in ("insert", "replace"):
+                self.beginInsertRows(QModelIndex(), j1, j2 - 1)
+                self._rows[j1:j1] = rows[j1:j2]
+                self.endInsertRows()
+
+    def _update_range(self, rows: Sequence[TableRow], start: int, end: int):
+        changed_from = None
+        for i in range(start, end + 1):
+            changed = i < end and self._rows[i] != rows[i]
+            if changed:
+                self._rows[i] = rows[i]
+                if changed_from is None:
+                    changed_from = i
+            elif changed_from is not None:
+                self.dataChanged.emit(
+                    self.index(changed_from, 0), self.index(i - 1, self.columnCount() - 1)
+                )
+                changed_from = None
+
+
+class DayTableModel(DiffedTableModel):
+    """Entries of the selected day, with a bold summary row per repeated group."""
+
+    headers = ("PSP", "Leistungsart", "Beschreibung", "Zeit", "Stunden")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._group_brush = QBrush(QColor(theme.GROUP_ROW))
+
+    def set_groups(self, groups: Sequence[DayGroup]):
+        rows: list[TableRow] = []
+        for group in groups:
+            for entry in group.entries:
+                time_info = ""
+                if entry.start_time and entry.end_time:
+                    time_info = f"{entry.start_time}\u2013{entry.end_time}"
+                rows.append(TableRow(
+                    key=("entry", entry.id),
+                    cells=(
+                        entry.psp,
+                        entry.activity_type,
+                        entry.description,
+                        time_info if time_info else "\u2013",
+                        f"{entry.hours:.2f}",
+                    ),
+                    entry_id=entry.id,
+                ))
+            # Group summary row only when 2+ entries share the same key
+            if len(group.entries) > 1:
+                rows.append(TableRow(
+                    key=("summary", group.key),
+                    cells=("", "", f"Summe: {group.key[2]}", "", f"{group.hours:.2f}"),
+                    summary=True,
+                ))
+        self.set_rows(rows)
+
+    def flags(self, index: QModelIndex):
+        row = self.row_at(index)
+        if row is not None and row.summary:
+            return Qt.ItemIsEnabled
+        return super().flags(index)
+
+    def style_data(self, row: TableRow, column: int, role: int):
+        if not row.summary:
+            return None
+        if role == Qt.FontRole:
+            return self._bold
+        if role == Qt.BackgroundRole:
+            return self._group_brush
+        return None
+
+
+class WeekTableModel(DiffedTableModel):
+    """Weekly pivot of (psp, activity type, description) × weekday plus a totals row."""
+
+    headers = ("PSP", "Leistungsart", "Beschreibung", *GERMAN_DAYS_SHORT, "Summe")
+    TOTAL_COLUMN = 10
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._week_start: date | None = None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if (orientation == Qt.Horizontal and role == Qt.DisplayRole
+                and self._week_start is not None and 3 <= section < 10):
+            d = self._week_start + timedelta(days=section - 3)
+            return f"{GERMAN_DAYS_SHORT[section - 3]}\n{d.day:02d}.{d.month:02d}"
+        return super().headerData(section, orientation, role)
+
+    def set_week(
+        self, week_start: date, week_rows: Sequence[WeekRow], day_totals: Sequence[float], week_total: float,
+    ):
+        if week_start != self._week_start:
+            self._week_start = week_start
+            self.headerDataChanged.emit(Qt.Horizontal, 3, 9)
+
+        rows = [
+            TableRow(
+                key=row.key,
+                cells=(
+                    *row.key,
+                    *(f"{h:.2f}" if h > 0 else "" for h in row.daily_hours),
+                    f"{row.total:.2f}",
+                ),
+            )
+            for row in week_rows
+        ]
+        rows.append(TableRow(
+            key=("total",),
+            cells=(
+                "", "", "Summe",
+                *(f"{h:.2f}" if h > 0 else "" for h in day_totals),
+                f"{week_total:.2f}",
+            ),
+            summary=True,
+        ))
+        self.set_rows(rows)
+
+    def style_data(self, row: TableRow, column: int, role: int):
+        if role == Qt.FontRole and (row.summary or column == self.TOTAL_COLUMN):
+            return self._bold
+        return None
@@ -306,7 +306,7 @@ STYLESHEET = f"""
     }}
 
     /* Table / Tree */
-    QTreeWidget, QTableWidget {{
+    QTreeView, QTableWidget {{
         background-color: {BG_SECONDARY};
         alternate-background-color: {BG_TERTIARY};
         border: 1px solid {BORDER};
@@ -315,16 +315,16 @@ STYLESHEET = f"""
         gridline-color: {BORDER};
     }}
 
-    QTreeWidget::item, QTableWidget::item {{
+    QTreeView::item, QTableWidget::item {{
         padding: 6px 8px;
         border: none;
     }}
 
-    QTreeWidget::item:selected, QTableWidget::item:selected {{
+    QTreeView::item:selected, QTableWidget::item:selected {{
         background-color: {SELECTED_ROW};
     }}
 
-    QTreeWidget::item:hover, QTableWidget::item:hover {{
+    QTreeView::item:hover, QTableWidget::item:hover {{
         background-color: {BG_HOVER};
     }}
 
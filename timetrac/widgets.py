@@ -23,6 +23,8 @@ from PySide6.QtWidgets import (
 )
 
 from . import theme
+from .completer import HistoryCompleter
+from .database import Database
 
 
 GERMAN_DAYS = ["Mo", "Di", "Mi", "Do", "Fr", "Sa", "So"]
@@ -256,13 +258,24 @@ class TimePickerDialog(QDialog):
 
 
 class EditableComboBox(QComboBox):
-    """Editable combobox with recent values."""
+    """Editable combobox with recent values.
+
+    The dropdown lists the recent values; ``enable_history`` additionally
+    completes typed text from every value in the database.
+    """
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setEditable(True)
         self.setInsertPolicy(QComboBox.NoInsert)
         self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+        self.history_completer: HistoryCompleter | None = None
+
+    def enable_history(self, db: Database, field: str):
+        # Installed on the line edit, not via QComboBox.setCompleter: the
+        # combobox would map completions onto its own (recent) items
+        self.history_completer = HistoryCompleter(db, field, self)
+        self.history_completer.attach(self.lineEdit())
 
     @property
     def text(self) -> str: